@@ -0,0 +1,392 @@
+"""
+Offline bulk screening: score a directory or tarball of PDF resumes against
+many job descriptions, without the web server.
+
+    python -m app.bulk_screen archive/ --jd jds/ --output results.csv
+    python -m app.bulk_screen resumes.tar.gz --jd senior_python.txt --jd data_engineer.txt \\
+        --output results.parquet --threshold 40 --csv-top-k 50
+
+Files are read in batches (tarballs are streamed member by member, never
+unpacked) and parsed and skill-tagged in the ingestion process pool
+(app/ingest.py) while the previous batch is embedded; each resume is encoded
+once and scored against every job description with one matrix product.
+Nothing is copied to uploads/.
+
+Results are written after every batch: appended to a CSV file, or as one
+part file per batch in a Parquet dataset directory (needs pyarrow). A
+progress file next to the output records the files of every written batch,
+so an interrupted run picks up where it stopped when started again with the
+same arguments; output written after the last recorded batch is discarded.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tarfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app import config
+from app.csv_loader import CSVResumeDatabase
+from app.ingest import process_uploads, shutdown_pool
+from app.utils import format_score, format_scores, generate_embeddings, similarity_matrix
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# One row per (job description, resume) pair; files that could not be read
+# get a single row with an empty job_id and the error
+COLUMNS = ["job_id", "source", "resume", "match_score", "skills", "warning", "error"]
+
+
+def load_job_descriptions(paths: List[str]) -> Dict[str, str]:
+    """
+    Read job descriptions from text files (or directories of .txt files).
+
+    Returns:
+        Job ID (the file name without extension) -> job description text
+    """
+    jobs = {}
+    for path in map(Path, paths):
+        files = sorted(path.glob("*.txt")) if path.is_dir() else [path]
+        for file in files:
+            if file.stem in jobs:
+                raise ValueError(f"Two job descriptions are named '{file.stem}'")
+            text = file.read_text(encoding="utf-8").strip()
+            if not text:
+                raise ValueError(f"Job description {file} is empty")
+            jobs[file.stem] = text
+    if not jobs:
+        raise ValueError("No job descriptions found")
+    return jobs
+
+
+def iter_pdfs(source: str, skip: Set[str] = frozenset()) -> Iterator[Tuple[str, bytes]]:
+    """
+    Stream (name, content) for every PDF in a directory tree or tarball, in a stable order.
+
+    Args:
+        source: Directory or tarball
+        skip: Names not to read (already screened)
+
+    Names are paths relative to the directory, or tar member names.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                key = Path(os.path.relpath(path, source)).as_posix()
+                if name.lower().endswith(".pdf") and key not in skip:
+                    with open(path, "rb") as f:
+                        yield key, f.read()
+        return
+
+    # Stream mode reads members in order without seeking, so compressed archives are not decompressed twice
+    with tarfile.open(source, mode="r|*") as archive:
+        for member in archive:
+            if member.isfile() and member.name.lower().endswith(".pdf") and member.name not in skip:
+                yield member.name, archive.extractfile(member).read()
+
+
+def iter_batches(source: str, batch_size: int, done: Set[str]) -> Iterator[List[Tuple[str, bytes]]]:
+    """Group the PDFs not screened yet into batches."""
+    batch = []
+    for name, content in iter_pdfs(source, done):
+        batch.append((name, content))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ResultWriter:
+    """Appends result batches to a CSV file or a directory of Parquet part files."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.lower().endswith(".parquet")
+        self.parts = 0
+        if self.parquet:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise ValueError(f"Parquet output needs pyarrow (pip install pyarrow), or write a .csv: {e}")
+
+    def write(self, frame: pd.DataFrame) -> int:
+        """
+        Durably write one batch of results.
+
+        Returns:
+            Position after the batch (CSV bytes or Parquet part count), for restore()
+        """
+        if self.parquet:
+            os.makedirs(self.path, exist_ok=True)
+            part_path = os.path.join(self.path, f"part-{self.parts:05d}.parquet")
+            frame.to_parquet(part_path + ".tmp", index=False)
+            os.replace(part_path + ".tmp", part_path)
+            self.parts += 1
+            return self.parts
+
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            frame.to_csv(f, header=f.tell() == 0, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    def restore(self, position: int):
+        """Drop anything written after `position` (an interrupted batch)."""
+        if self.parquet:
+            self.parts = position
+            if os.path.isdir(self.path):
+                for name in os.listdir(self.path):
+                    if not name.startswith("part-") or int(name[5:10]) >= position:
+                        os.remove(os.path.join(self.path, name))
+        elif os.path.exists(self.path):
+            os.truncate(self.path, position)
+
+    def remove(self):
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ProgressLog:
+    """
+    JSON-lines record of a run: a header with the run settings, then one line per written batch.
+    """
+
+    def __init__(self, path: str, settings: Dict):
+        self.path = path
+        self.settings = settings
+        self.done: Set[str] = set()
+        self.position = 0
+        self.batches = 0
+
+    def load(self) -> bool:
+        """
+        Read an earlier run's progress.
+
+        Returns:
+            True when there was one to resume
+
+        Raises:
+            ValueError: The earlier run used different settings
+        """
+        if not os.path.exists(self.path):
+            return False
+
+        entries = []
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break  # a line cut off by the interruption
+                valid_bytes += len(line)
+        os.truncate(self.path, valid_bytes)
+        if not entries:
+            return False
+
+        if entries[0] != self.settings:
+            raise ValueError(f"{self.path} belongs to a run with different job descriptions or settings; "
+                             f"pass --restart to discard it")
+        for entry in entries[1:]:
+            self.done.update(entry["files"])
+            self.position = entry["position"]
+            self.batches += 1
+        return True
+
+    def start(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.settings) + "\n")
+
+    def record(self, files: List[str], position: int):
+        """Mark a batch as written (call after ResultWriter.write returned)."""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"files": files, "position": position}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(files)
+        self.position = position
+        self.batches += 1
+
+
+def score_batch(processed: List[Dict], job_ids: List[str], jd_embeddings: np.ndarray, threshold: float) -> pd.DataFrame:
+    """
+    Score one batch of processed PDFs against every job description.
+
+    Args:
+        processed: Results of app.ingest.process_uploads
+        job_ids: Job IDs, in the order of jd_embeddings
+        jd_embeddings: (n_jobs, dim) job description embeddings
+        threshold: Keep pairs scoring at least this (0-100)
+
+    Returns:
+        Result rows (see COLUMNS)
+    """
+    rows = []
+    usable = [result for result in processed if not result["error"]]
+    for result in processed:
+        if result["error"]:
+            rows.append({"job_id": "", "source": "pdf", "resume": result["filename"], "match_score": np.nan,
+                         "skills": "", "warning": "", "error": result["error"]})
+
+    # Threshold the whole (resume, job) score matrix at once; only qualifying pairs become rows
+    texts = [result["text"] for result in usable]
+    match_scores = format_scores(similarity_matrix(jd_embeddings, texts, use_cache=False, scheduled=False))
+    for i, j in zip(*np.nonzero(match_scores >= threshold)):
+        result = usable[i]
+        warning = f"Only part of the PDF was read: {result['truncated']}" if result["truncated"] else ""
+        rows.append({"job_id": job_ids[j], "source": "pdf", "resume": result["filename"],
+                     "match_score": float(match_scores[i, j]), "skills": "; ".join(result["skills"]),
+                     "warning": warning, "error": ""})
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def screen_csv_database(csv_path: str, job_ids: List[str], jd_embeddings: np.ndarray, top_k: int,
+                        threshold: float) -> pd.DataFrame:
+    """Rank the CSV resume database for every job description (top_k per job)."""
+    database = CSVResumeDatabase(csv_path=csv_path)
+    database.build_index()
+    if database.index is None or database.index.ntotal == 0:
+        print("Warning: the CSV resume database is empty; skipping it.")
+        return pd.DataFrame(columns=COLUMNS)
+
+    rows = []
+    for job_id, (scores, resume_rows) in zip(job_ids, database.rank_batch(jd_embeddings, top_k)):
+        for result in database.fetch_results(scores, resume_rows):
+            match_score = format_score(result["score"])
+            if match_score >= threshold:
+                rows.append({"job_id": job_id, "source": "csv", "resume": result["filename"],
+                             "match_score": match_score, "skills": "; ".join(result.get("skills") or []),
+                             "warning": "", "error": ""})
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+async def run(source: str, jobs: Dict[str, str], output: str, batch_size: int = 64, threshold: float = 0.0,
+              csv_top_k: int = 0, csv_path: Optional[str] = None, restart: bool = False) -> Dict[str, float]:
+    """
+    Screen every PDF under `source` against `jobs`, resuming an interrupted run.
+
+    Args:
+        source: Directory or tarball of PDF resumes
+        jobs: Job ID -> job description
+        output: .csv file or .parquet dataset directory
+        batch_size: PDFs parsed, embedded and written per batch
+        threshold: Keep pairs scoring at least this (0-100)
+        csv_top_k: Also rank the CSV resume database, keeping this many per job (0 = skip it)
+        csv_path: CSV resume database (default: Resume.csv)
+        restart: Discard the output of an earlier run instead of resuming it
+
+    Returns:
+        Resumes screened and unreadable in this run, elapsed seconds and resumes per minute
+    """
+    writer = ResultWriter(output)
+    progress = ProgressLog(output + ".progress", {
+        "jobs": jobs, "threshold": threshold, "csv_top_k": csv_top_k, "model": config.EMBEDDING_MODEL,
+    })
+    if restart:
+        writer.remove()
+        if os.path.exists(progress.path):
+            os.remove(progress.path)
+
+    job_ids = list(jobs)
+    jd_embeddings = generate_embeddings(list(jobs.values()), scheduled=False)
+
+    if progress.load():
+        print(f"Resuming: {len(progress.done)} resumes already screened")
+    else:
+        progress.start()
+    writer.restore(progress.position)
+
+    # The CSV database is ranked first, as the run's first batch
+    if csv_top_k and not progress.batches:
+        frame = screen_csv_database(csv_path or str(BASE_DIR / "Resume.csv"), job_ids, jd_embeddings,
+                                    csv_top_k, threshold)
+        progress.record([], writer.write(frame))
+        print(f"✅ Ranked the CSV resume database ({len(frame)} matches)")
+
+    loop = asyncio.get_running_loop()
+    batches = iter_batches(source, batch_size, progress.done)
+    screened = errors = 0
+    start = time.time()
+
+    async def parse_next():
+        # Reading the next batch and parsing it overlap with embedding the current one
+        batch = await loop.run_in_executor(None, next, batches, None)
+        return await process_uploads(batch) if batch else None
+
+    try:
+        pending = asyncio.ensure_future(parse_next())
+        while True:
+            processed = await pending
+            if processed is None:
+                break
+            pending = asyncio.ensure_future(parse_next())
+
+            frame = await loop.run_in_executor(None, score_batch, processed, job_ids, jd_embeddings, threshold)
+            position = await loop.run_in_executor(None, writer.write, frame)
+            progress.record([result["filename"] for result in processed], position)
+
+            screened += len(processed)
+            errors += sum(bool(result["error"]) for result in processed)
+            elapsed = time.time() - start
+            print(f"Screened {screened} resumes ({errors} unreadable), {screened / elapsed * 60:.0f} resumes/min")
+    finally:
+        shutdown_pool()
+
+    elapsed = time.time() - start
+    return {
+        "screened": screened,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 1),
+        "resumes_per_minute": round(screened / elapsed * 60, 1) if screened else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen a directory or tarball of PDF resumes against job descriptions.")
+    parser.add_argument("source", help="Directory of PDFs (searched recursively) or a .tar/.tar.gz of PDFs")
+    parser.add_argument("--jd", action="append", required=True,
+                        help="Job description .txt file, or a directory of them (repeatable); the file name is the job ID")
+    parser.add_argument("--output", required=True, help="Results file: .csv, or .parquet (a directory of part files)")
+    parser.add_argument("--threshold", type=float, default=0.0, help="Only write matches scoring at least this (0-100)")
+    parser.add_argument("--batch-size", type=int, default=64, help="PDFs per batch (and per checkpoint)")
+    parser.add_argument("--workers", type=int, default=config.INGEST_WORKERS,
+                        help="PDF parsing processes (default: INGEST_WORKERS, 0 = one per CPU core)")
+    parser.add_argument("--csv-top-k", type=int, default=0,
+                        help="Also rank the CSV resume database, keeping this many per job")
+    parser.add_argument("--csv", default=str(BASE_DIR / "Resume.csv"), help="CSV resume database for --csv-top-k")
+    parser.add_argument("--restart", action="store_true", help="Discard the results of an interrupted run")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        parser.error(f"{args.source} does not exist")
+    try:
+        jobs = load_job_descriptions(args.jd)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    config.INGEST_WORKERS = args.workers
+
+    print(f"Screening {args.source} against {len(jobs)} job descriptions...")
+    try:
+        stats = asyncio.run(run(args.source, jobs, args.output, args.batch_size, args.threshold,
+                                args.csv_top_k, args.csv, args.restart))
+    except ValueError as e:
+        parser.exit(1, f"Error: {e}\n")
+    print(f"✅ Screened {stats['screened']} resumes ({stats['errors']} unreadable) in {stats['elapsed_s']}s: "
+          f"{stats['resumes_per_minute']} resumes/min. Results: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
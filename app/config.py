@@ -0,0 +1,114 @@
+"""
+Runtime settings. Every value can be overridden with an environment variable
+of the same name, so deployments can tune the app without code changes.
+"""
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.environ.get(name, default)
+
+
+# Sentence-Transformer model used for all embeddings
+EMBEDDING_MODEL = _env_str("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# Encoder inference backend: torch, int8, onnx or onnx_int8 (see app/encoder_backends.py),
+# and where ONNX exports are kept
+EMBEDDING_BACKEND = _env_str("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_DIR = _env_str("EMBEDDING_ONNX_DIR", "models")
+
+# Shared embedding process (see app/embedding_server.py): "host:port" or a socket
+# path, and the key clients authenticate with; empty = load the encoder in-process
+EMBEDDING_SERVER = _env_str("EMBEDDING_SERVER", "")
+EMBEDDING_SERVER_AUTHKEY = _env_str("EMBEDDING_SERVER_AUTHKEY", "")
+
+# PDF ingestion process pool (0 = one worker per CPU core)
+INGEST_WORKERS = _env_int("INGEST_WORKERS", 0)
+
+# Skill taxonomy JSON (canonical name -> synonyms); empty = bundled app/skill_taxonomy.json
+SKILL_TAXONOMY_PATH = _env_str("SKILL_TAXONOMY_PATH", "")
+
+# spaCy NER for skill extraction: model name or path, texts per nlp.pipe batch,
+# nlp.pipe worker processes for bulk tagging (CSV index builds), and characters
+# of each text passed to the model (longer texts are cut; taxonomy matching
+# still sees the whole text)
+SPACY_MODEL = _env_str("SPACY_MODEL", "en_core_web_sm")
+SPACY_BATCH_SIZE = _env_int("SPACY_BATCH_SIZE", 64)
+SPACY_N_PROCESS = _env_int("SPACY_N_PROCESS", 1)
+SPACY_MAX_CHARS = _env_int("SPACY_MAX_CHARS", 20000)
+
+# PDF extraction budgets: largest accepted file, and early stop after this many
+# pages, characters or seconds per file (0 = no limit)
+PDF_MAX_BYTES = _env_int("PDF_MAX_BYTES", 20 * 1024 * 1024)
+PDF_MAX_PAGES = _env_int("PDF_MAX_PAGES", 50)
+PDF_MAX_CHARS = _env_int("PDF_MAX_CHARS", 100000)
+PDF_TIME_BUDGET_S = _env_int("PDF_TIME_BUDGET_S", 30)
+# Files of at least PDF_SPLIT_MIN_BYTES with more than PDF_PAGES_PER_TASK pages are
+# split into page ranges extracted in parallel by the ingestion pool (0 = never split)
+PDF_SPLIT_MIN_BYTES = _env_int("PDF_SPLIT_MIN_BYTES", 256 * 1024)
+PDF_PAGES_PER_TASK = _env_int("PDF_PAGES_PER_TASK", 8)
+# Extracted text cached by file content hash (0 disables the cache)
+PDF_TEXT_CACHE_SIZE = _env_int("PDF_TEXT_CACHE_SIZE", 1000)
+
+# Embedding cache: in-memory LRU size (0 disables the cache) and optional SQLite file
+EMBEDDING_CACHE_SIZE = _env_int("EMBEDDING_CACHE_SIZE", 10000)
+EMBEDDING_CACHE_DB = _env_str("EMBEDDING_CACHE_DB", "")
+
+# Embedding scheduler: most texts per micro-batch (0 = call the model directly)
+# and how long a batch waits for texts from other requests (0 = only take
+# texts that are already queued, which adds no latency at low load)
+EMBED_SCHEDULER_BATCH = _env_int("EMBED_SCHEDULER_BATCH", 64)
+EMBED_SCHEDULER_WAIT_MS = _env_int("EMBED_SCHEDULER_WAIT_MS", 0)
+
+# Long-text chunking: words per window (0 = encode whole texts, which the model
+# truncates at 256 word pieces, roughly 180 words), words shared by
+# neighbouring windows, most windows per text, and how chunks are combined:
+# "max" scores a resume by its best-matching chunk, "mean" averages the chunk vectors
+EMBED_CHUNK_WORDS = _env_int("EMBED_CHUNK_WORDS", 0)
+EMBED_CHUNK_OVERLAP = _env_int("EMBED_CHUNK_OVERLAP", 32)
+EMBED_MAX_CHUNKS = _env_int("EMBED_MAX_CHUNKS", 16)
+EMBED_CHUNK_POOLING = _env_str("EMBED_CHUNK_POOLING", "max")
+
+# Most CSV resumes one query ranks: caps top_k and threshold-mode results
+CSV_MAX_RESULTS = _env_int("CSV_MAX_RESULTS", 10000)
+
+# CSV screening query cache: most cached queries (0 disables it) and seconds an entry stays valid
+QUERY_CACHE_SIZE = _env_int("QUERY_CACHE_SIZE", 256)
+QUERY_CACHE_TTL_S = _env_int("QUERY_CACHE_TTL_S", 300)
+
+# Keep every parsed upload in the searchable talent pool (see app/talent_pool.py). Off by
+# default: it stores uploaded resumes on disk, so operators opt in with 1
+TALENT_POOL = _env_int("TALENT_POOL", 0)
+# Seconds between background writes of newly pooled uploads (0 = write them during the request)
+TALENT_POOL_FLUSH_S = _env_int("TALENT_POOL_FLUSH_S", 5)
+
+# Split the CSV database into independently built and searched shards (see
+# app/sharded_database.py): "category", or a number of ID-hash shards; empty =
+# one index. Threads searching shards in parallel (0 = Python's default pool size)
+CSV_SHARDS = _env_str("CSV_SHARDS", "")
+CSV_SHARD_THREADS = _env_int("CSV_SHARD_THREADS", 0)
+
+# CSV index build: rows read per chunk, texts per encoder batch, rows between checkpoints
+CSV_CHUNK_ROWS = _env_int("CSV_CHUNK_ROWS", 1000)
+EMBED_BATCH_SIZE = _env_int("EMBED_BATCH_SIZE", 32)
+CSV_CHECKPOINT_ROWS = _env_int("CSV_CHECKPOINT_ROWS", 20000)
+
+# FAISS index type for new builds: flat, ivf_flat, ivf_pq or hnsw (see app/faiss_index.py)
+FAISS_INDEX_TYPE = _env_str("FAISS_INDEX_TYPE", "flat")
+FAISS_TRAIN_SIZE = _env_int("FAISS_TRAIN_SIZE", 50000)
+FAISS_NLIST = _env_int("FAISS_NLIST", 1024)
+FAISS_PQ_M = _env_int("FAISS_PQ_M", 48)
+FAISS_HNSW_M = _env_int("FAISS_HNSW_M", 32)
+FAISS_EF_CONSTRUCTION = _env_int("FAISS_EF_CONSTRUCTION", 80)
+# Memory-map the loaded index read-only, so server workers share one copy (0 = read it into memory)
+FAISS_MMAP = _env_int("FAISS_MMAP", 0)
+# Query-time accuracy/speed knobs
+FAISS_NPROBE = _env_int("FAISS_NPROBE", 16)
+FAISS_EF_SEARCH = _env_int("FAISS_EF_SEARCH", 64)
+# Skill-filtered HNSW searches over at most this many resumes are scored exactly
+FAISS_EXACT_SUBSET_ROWS = _env_int("FAISS_EXACT_SUBSET_ROWS", 20000)
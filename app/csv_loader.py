@@ -1,178 +1,899 @@
 """
 CSV Resume Database with FAISS vector search.
 """
+import json
 import os
 import pickle
+import shutil
+import threading
 import faiss
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple
-from app.utils import load_model, generate_embeddings
+from typing import List, Dict, Optional, Tuple
+from app import config
+from app.faiss_index import (add_vectors, create_index, make_mutable, range_search, read_index, search_params,
+                             search_subset, supports_removal, train_index)
+from app.file_lock import FileLock
+from app.metadata_store import STORE_VERSION, MetadataStore, MetadataWriter, content_hash, replace_store, write_store
+from app.metrics import timed
+from app.query_cache import QueryResultCache
+from app.skill_extractor import skill_extractor
+from app.skill_index import SkillIndex
+from app.text_preprocessor import TextPreprocessor
+from app.utils import chunk_documents, chunk_pooling, chunking_enabled, generate_embeddings, load_model, mean_pool
 
 
 class CSVResumeDatabase:
-    """FAISS-based vector database for CSV resume search."""
+    """
+    FAISS-based vector database for CSV resume search.
     
-    def __init__(self, csv_path: str = "Resume.csv", index_path: str = "resume_index.faiss", metadata_path: str = "resume_metadata.pkl"):
+    Index labels are metadata row numbers. Besides full builds, resumes can be
+    upserted, deleted, or synced against the CSV (see upsert/delete/sync),
+    which only embeds new or changed rows. Skills are extracted once when a
+    row is written and stored with its metadata, so searches only decode them.
+    Searches can be restricted to resumes with required/optional skills via an
+    inverted skill index, and to some categories (see search_batch).
+    
+    With chunked embeddings and max pooling (config.EMBED_CHUNK_WORDS,
+    config.EMBED_CHUNK_POOLING), every chunk of a resume is indexed under the
+    label row * label_stride + chunk, and searches fold chunk hits back into
+    their resume, scored by its best chunk. Mean pooling stores one averaged
+    vector per resume.
+    """
+    
+    def __init__(self, csv_path: str = "Resume.csv", index_path: str = "resume_index.faiss", metadata_path: str = "resume_metadata",
+                 index_type: Optional[str] = None):
         """
         Initialize the CSV resume database.
         
         Args:
             csv_path: Path to the CSV file containing resumes
             index_path: Path to save/load FAISS index
-            metadata_path: Path to save/load resume metadata
+            metadata_path: Directory to save/load the resume metadata store
+                (a legacy "<name>.pkl" file next to it is migrated on load)
+            index_type: FAISS index type for new builds (default: config.FAISS_INDEX_TYPE);
+                an existing index file is loaded as whatever type it was built with
         """
+        if metadata_path.endswith(".pkl"):
+            metadata_path = metadata_path[:-len(".pkl")]
         self.csv_path = csv_path
         self.index_path = index_path
         self.metadata_path = metadata_path
+        self.legacy_metadata_path = metadata_path + ".pkl"
+        self.index_type = index_type or config.FAISS_INDEX_TYPE
         self.index = None
-        self.metadata = []
+        self.metadata = []  # MetadataStore once loaded
         self.model = None
+        # Build/load progress, reported by /readyz: phase is idle, waiting (for another
+        # process's build), loading, building or done
+        self.progress = {"phase": "idle", "rows_processed": 0, "resumes_indexed": 0}
+        self._skill_index = None  # built on the first skill-filtered search
+        self._category_index = None  # (store, category -> rows), built on the first category-filtered search
+        # Bumped whenever the index is built, loaded or mutated; part of every query cache key
+        self.index_version = 0
+        self.query_cache = QueryResultCache(config.QUERY_CACHE_SIZE, config.QUERY_CACHE_TTL_S)
+        # Guards the index and metadata while they are searched or mutated
+        self._lock = threading.RLock()
+        # Lets one process at a time build or change the index files; taken before _lock
+        self._file_lock = FileLock(index_path + ".lock")
+        # Identity of the index file that was loaded, to notice when another process replaces it
+        self._index_stamp = None
+        self._mmapped = False
         
     def build_index(self):
-        """Build or load the FAISS index from CSV data."""
-        # Load the model
-        self.model = load_model()
-        
-        # Check if index already exists
-        if os.path.exists(self.index_path) and os.path.exists(self.metadata_path):
-            print("Loading existing FAISS index...")
-            self._load_index()
-            return
+        """Build or load the FAISS index from CSV data (other processes wait while one builds)."""
+        if not self._file_lock.acquire(blocking=False):
+            print("Another process is building the index; waiting for it...")
+            self.progress["phase"] = "waiting"
+            self._file_lock.acquire()
+        try:
+            # Check if index already exists (loading it does not need the model)
+            if os.path.exists(self.index_path) and os.path.exists(self.legacy_metadata_path) \
+                    and not MetadataStore.exists(self.metadata_path):
+                self.progress["phase"] = "loading"
+                self._migrate_legacy_metadata()
+            if os.path.exists(self.index_path) and MetadataStore.exists(self.metadata_path):
+                print("Loading existing FAISS index...")
+                self.progress["phase"] = "loading"
+                self._load_index()
+                return
+            
+            print("Building FAISS index from CSV...")
+            
+            # Read CSV
+            if not os.path.exists(self.csv_path):
+                print(f"Warning: CSV file '{self.csv_path}' not found. Creating empty index.")
+                self.index = None
+                self.metadata = []
+                return
+            
+            # Load the model
+            self.progress["phase"] = "building"
+            self.model = load_model()
+            self._build_streaming()
+        finally:
+            self.progress["phase"] = "done"
+            self._index_changed()
+            if self.index is not None:
+                self.progress["resumes_indexed"] = self.metadata.live_count
+            self._file_lock.release()
+    
+    def _build_streaming(self):
+        """
+        Build the index chunk by chunk so memory stays bounded by the chunk size.
         
-        print("Building FAISS index from CSV...")
+        Vectors are appended to the FAISS index as each chunk is embedded, and
+        metadata rows are appended to the on-disk metadata store. Every
+        config.CSV_CHECKPOINT_ROWS rows the partial index, metadata and the
+        number of CSV rows consumed are checkpointed, so an interrupted build
+        resumes from the last checkpoint instead of starting over.
         
-        # Read CSV
-        if not os.path.exists(self.csv_path):
-            print(f"Warning: CSV file '{self.csv_path}' not found. Creating empty index.")
-            self.index = None
-            self.metadata = []
-            return
+        IVF index types buffer the first config.FAISS_TRAIN_SIZE vectors, train
+        on them, and then add vectors incrementally like the other types.
+        """
+        partial_index_path = self.index_path + ".partial"
+        partial_metadata_path = self.metadata_path + ".partial"
+        checkpoint_path = self.index_path + ".checkpoint.json"
+        csv_stat = os.stat(self.csv_path)
+        source = {"csv_path": os.path.abspath(self.csv_path), "csv_size": csv_stat.st_size, "csv_mtime": csv_stat.st_mtime}
         
-        df = pd.read_csv(self.csv_path)
+        # Resume from a checkpoint taken on the same CSV file
+        index = None
+        rows_done = 0
+        metadata_rows = 0
+        checkpoint = self._read_checkpoint(checkpoint_path)
+        if (checkpoint and checkpoint.get("source") == source
+                and os.path.exists(partial_index_path) and MetadataStore.exists(partial_metadata_path)):
+            index = faiss.read_index(partial_index_path)
+            rows_done = checkpoint["rows_done"]
+            metadata_rows = checkpoint["metadata_rows"]
+            print(f"Resuming index build from row {rows_done} ({index.ntotal} resumes embedded)...")
         
-        # Extract resume texts and metadata
-        resume_texts = []
-        metadata_list = []
+        metadata_writer = MetadataWriter(partial_metadata_path, resume_rows=metadata_rows,
+                                         skills_vocabulary=skill_extractor.vocabulary(),
+                                         label_stride=self._build_label_stride())
+        label_stride = metadata_writer.label_stride  # a resumed build keeps its stride
         
-        # Use Resume_str column if available, otherwise try Resume_html
+        pending = []  # vectors waiting for the index to be trained
+        pending_count = 0
         text_column = None
-        if "Resume_str" in df.columns:
-            text_column = "Resume_str"
-        elif "Resume_html" in df.columns:
-            text_column = "Resume_html"
-        else:
-            print("Warning: No resume text column found in CSV")
-            self.index = None
-            self.metadata = []
-            return
+        rows_seen = 0
+        rows_since_checkpoint = 0
+        total_resumes = index.ntotal if index is not None else 0
         
-        for idx, row in df.iterrows():
-            resume_text = str(row.get(text_column, ""))
-            if not resume_text or resume_text.strip() == "":
-                continue
-            
-            resume_texts.append(resume_text)
+        try:
+            for chunk in pd.read_csv(self.csv_path, chunksize=config.CSV_CHUNK_ROWS):
+                if text_column is None:
+                    text_column = self._text_column(chunk.columns)
+                    if text_column is None:
+                        break
+                
+                # Skip rows already covered by the checkpoint (parsing is cheap, embedding is not)
+                chunk_start = rows_seen
+                rows_seen += len(chunk)
+                if rows_seen <= rows_done:
+                    continue
+                if chunk_start < rows_done:
+                    chunk = chunk.iloc[rows_done - chunk_start:]
+                
+                resume_texts, metadata_list = self._chunk_records(chunk, text_column, metadata_writer)
+                self._tag_skills(metadata_list)
+                embeddings, labels = self._embed_rows(resume_texts, metadata_writer.count, label_stride)
+                
+                if resume_texts:
+                    if index is not None:
+                        add_vectors(index, embeddings, labels)
+                    else:
+                        pending.append((embeddings, labels))
+                        pending_count += len(labels)
+                        if self.index_type in ("flat", "hnsw") or pending_count >= config.FAISS_TRAIN_SIZE:
+                            index = self._new_index(*self._stack(pending), labelled=label_stride > 1)
+                            pending, pending_count = [], 0
+                
+                metadata_writer.append(metadata_list)
+                total_resumes += len(metadata_list)
+                rows_since_checkpoint += len(chunk)
+                print(f"Processed {rows_seen} CSV rows ({total_resumes} resumes embedded)...")
+                self.progress.update(rows_processed=rows_seen, resumes_indexed=total_resumes)
+                
+                if rows_since_checkpoint >= config.CSV_CHECKPOINT_ROWS and index is not None:
+                    self._write_checkpoint(index, metadata_writer, checkpoint_path, source, rows_seen)
+                    rows_since_checkpoint = 0
             
-            # Store metadata
-            metadata_list.append({
-                "id": str(row.get("ID", idx)),
-                "filename": f"resume_{row.get('ID', idx)}.csv",
-                "category": str(row.get("Category", "Unknown")),
-                "text": resume_text[:500] + "..." if len(resume_text) > 500 else resume_text,  # Preview
-                "full_text": resume_text
-            })
+            if pending:
+                # Corpus smaller than the training sample: train on everything
+                index = self._new_index(*self._stack(pending), labelled=label_stride > 1)
+        finally:
+            metadata_writer.close()
         
-        if not resume_texts:
+        if index is None or index.ntotal == 0:
             print("Warning: No valid resume texts found in CSV")
             self.index = None
             self.metadata = []
+            self._remove_files(partial_index_path, checkpoint_path)
+            shutil.rmtree(partial_metadata_path, ignore_errors=True)
             return
         
-        print(f"Generating embeddings for {len(resume_texts)} resumes...")
+        # Publish the finished index and metadata, then drop the checkpoint
+        faiss.write_index(index, partial_index_path)
+        os.replace(partial_index_path, self.index_path)
+        replace_store(partial_metadata_path, self.metadata_path)
+        self._remove_files(checkpoint_path)
+        print(f"Index saved to {self.index_path}")
         
-        # Generate embeddings in batches
-        batch_size = 32
-        all_embeddings = []
+        self._load_index()
+        print(f"✅ FAISS index built successfully with {len(self.metadata)} resumes!")
+    
+    def _new_index(self, sample: np.ndarray, labels: np.ndarray, labelled: bool = False) -> faiss.Index:
+        """Create an index of the configured type, train it on `sample` and add it."""
+        index = create_index(self.index_type, sample.shape[1], n_train=len(sample), labelled=labelled)
+        if not index.is_trained:
+            print(f"Training {self.index_type} index on {len(sample)} vectors...")
+            train_index(index, sample)
+        add_vectors(index, sample, labels)
+        return index
+    
+    @staticmethod
+    def _stack(pending: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+        return np.vstack([e for e, _ in pending]), np.concatenate([l for _, l in pending])
+    
+    @staticmethod
+    def _embed(texts: List[str]) -> np.ndarray:
+        """Embed texts in config.EMBED_BATCH_SIZE batches and L2-normalize them."""
+        batches = []
+        for i in range(0, len(texts), config.EMBED_BATCH_SIZE):
+            batch = texts[i:i + config.EMBED_BATCH_SIZE]
+            # Straight to the model: a build must not crowd requests out of the shared scheduler
+            batches.append(generate_embeddings(batch, use_cache=False, scheduled=False).astype('float32'))
+        if not batches:
+            return np.zeros((0, 0), dtype='float32')
+        embeddings = np.vstack(batches)
         
-        for i in range(0, len(resume_texts), batch_size):
-            batch = resume_texts[i:i + batch_size]
-            embeddings = generate_embeddings(batch)
-            all_embeddings.append(embeddings)
-            print(f"Processed {min(i + batch_size, len(resume_texts))}/{len(resume_texts)} resumes...")
+        # Normalize embeddings for cosine similarity (Inner Product)
+        faiss.normalize_L2(embeddings)
+        return embeddings
+    
+    @staticmethod
+    def _build_label_stride() -> int:
+        """Labels per row for a new build: one per chunk with max pooling, otherwise one."""
+        if chunking_enabled() and chunk_pooling() == "max":
+            return config.EMBED_MAX_CHUNKS
+        return 1
+    
+    @classmethod
+    def _embed_rows(cls, texts: List[str], first_row: int, label_stride: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Embed the resumes for rows first_row, first_row + 1, ... and label the vectors.
         
-        # Concatenate all embeddings
-        embeddings_array = np.vstack(all_embeddings).astype('float32')
+        Returns:
+            Normalized vectors and their index labels: one vector per chunk
+            labelled row * label_stride + chunk, or (label_stride 1) one
+            vector per row, mean-pooled over its chunks
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype='float32'), np.zeros(0, dtype='int64')
+        chunks, parents = chunk_documents(texts, max_chunks=label_stride if label_stride > 1 else None)
+        embeddings = cls._embed(chunks)
+        if label_stride == 1:
+            if len(chunks) != len(texts):
+                embeddings = mean_pool(embeddings, parents, len(texts))
+            return embeddings, np.arange(first_row, first_row + len(texts), dtype='int64')
+        chunk_numbers = np.arange(len(parents)) - np.searchsorted(parents, parents)
+        return embeddings, (first_row + parents) * label_stride + chunk_numbers
+    
+    def _row_labels(self, rows) -> np.ndarray:
+        """Every index label a metadata row may own."""
+        rows = np.asarray(rows, dtype='int64')
+        stride = self.metadata.label_stride
+        return (rows[:, None] * stride + np.arange(stride)).ravel()
+    
+    @staticmethod
+    def _tag_skills(records: List[Dict]) -> List[Dict]:
+        """Extract and attach skills to records that do not have them yet (one batched spaCy pass)."""
+        pending = [record for record in records if "skills" not in record]
+        clean_texts = [TextPreprocessor.preprocess(record.get("full_text", "")) for record in pending]
+        for record, skills in zip(pending, skill_extractor.extract_many(clean_texts)):
+            record["skills"] = skills
+        return records
+    
+    @staticmethod
+    def _text_column(columns) -> Optional[str]:
+        """Use Resume_str column if available, otherwise try Resume_html."""
+        if "Resume_str" in columns:
+            return "Resume_str"
+        if "Resume_html" in columns:
+            return "Resume_html"
+        print("Warning: No resume text column found in CSV")
+        return None
+    
+    @staticmethod
+    def _chunk_records(chunk: pd.DataFrame, text_column: str,
+                       writer: MetadataWriter) -> Tuple[List[str], List[Dict]]:
+        """
+        Extract resume texts and metadata from one CSV chunk.
         
-        # Normalize embeddings for cosine similarity (Inner Product)
-        faiss.normalize_L2(embeddings_array)
+        Rows whose ID or category does not fit `writer`'s columns are skipped
+        with a warning before anything is embedded, so one bad row does not
+        abort the build, nor every build resumed from its checkpoint.
+        """
+        resume_texts = []
+        metadata_list = []
         
-        # Create FAISS index (Inner Product for cosine similarity)
-        dimension = embeddings_array.shape[1]
-        self.index = faiss.IndexFlatIP(dimension)
-        self.index.add(embeddings_array)
+        for idx, row in chunk.iterrows():
+            resume_text = str(row.get(text_column, ""))
+            if not resume_text or resume_text.strip() == "":
+                continue
+            
+            # Store metadata (the preview and filename are derived on read)
+            record = {
+                "id": str(row.get("ID", idx)),
+                "category": str(row.get("Category", "Unknown")),
+                "full_text": resume_text
+            }
+            try:
+                writer.validate(record)
+            except ValueError as e:
+                print(f"Warning: Skipping CSV row {idx}: {e}")
+                continue
+            
+            resume_texts.append(resume_text)
+            metadata_list.append(record)
         
-        self.metadata = metadata_list
+        return resume_texts, metadata_list
+    
+    def _write_checkpoint(self, index, metadata_writer: MetadataWriter, checkpoint_path: str, source: Dict, rows_done: int):
+        """Persist the partial index and metadata plus the number of CSV rows they cover."""
+        partial_index_path = self.index_path + ".partial"
+        faiss.write_index(index, partial_index_path + ".tmp")
+        os.replace(partial_index_path + ".tmp", partial_index_path)
         
-        # Save index and metadata
-        self._save_index()
+        metadata_rows = metadata_writer.flush()
         
-        print(f"✅ FAISS index built successfully with {len(metadata_list)} resumes!")
+        checkpoint = {"source": source, "rows_done": rows_done, "metadata_rows": metadata_rows}
+        with open(checkpoint_path + ".tmp", "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(checkpoint_path + ".tmp", checkpoint_path)
+        print(f"Checkpoint saved at CSV row {rows_done}")
+    
+    @staticmethod
+    def _read_checkpoint(checkpoint_path: str) -> Optional[Dict]:
+        """Read a build checkpoint, or return None if there is none."""
+        try:
+            with open(checkpoint_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    @staticmethod
+    def _remove_files(*paths: str):
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
     
-    def _save_index(self):
-        """Save FAISS index and metadata to disk."""
-        if self.index is not None:
-            faiss.write_index(self.index, self.index_path)
-            with open(self.metadata_path, 'wb') as f:
-                pickle.dump(self.metadata, f)
-            print(f"Index saved to {self.index_path}")
+    def _migrate_legacy_metadata(self):
+        """Convert a legacy pickled metadata list into the memory-mapped store."""
+        print(f"Migrating {self.legacy_metadata_path} to {self.metadata_path}...")
+        records = []
+        with open(self.legacy_metadata_path, 'rb') as f:
+            # Older streaming builds wrote one pickle frame per CSV chunk
+            while True:
+                try:
+                    records.extend(pickle.load(f))
+                except EOFError:
+                    break
+        partial_metadata_path = self.metadata_path + ".partial"
+        shutil.rmtree(partial_metadata_path, ignore_errors=True)
+        write_store(partial_metadata_path, self._tag_skills(records), skill_extractor.vocabulary())
+        replace_store(partial_metadata_path, self.metadata_path)
+        os.remove(self.legacy_metadata_path)
     
     def _load_index(self):
-        """Load FAISS index and metadata from disk."""
+        """Load FAISS index (memory-mapped with config.FAISS_MMAP) and memory-map the metadata store from disk."""
         try:
-            self.index = faiss.read_index(self.index_path)
-            with open(self.metadata_path, 'rb') as f:
-                self.metadata = pickle.load(f)
-            print(f"✅ Loaded index with {len(self.metadata)} resumes from disk")
+            self._index_stamp = self._file_stamp()
+            self._mmapped = bool(config.FAISS_MMAP)
+            self.index = read_index(self.index_path, mmap=self._mmapped)
+            self.metadata = MetadataStore(self.metadata_path)
+            if self.metadata.version < STORE_VERSION:
+                self._upgrade_metadata()
+            print(f"✅ Loaded index with {self.metadata.live_count} resumes from disk")
         except Exception as e:
             print(f"Error loading index: {e}")
             self.index = None
             self.metadata = []
     
-    def search(self, query_vector: np.ndarray, top_k: int = 5) -> List[Dict]:
+    @property
+    def ready(self) -> bool:
+        """True once a non-empty index is loaded."""
+        return self.index is not None and self.index.ntotal > 0
+    
+    def search(self, query_vector: np.ndarray, top_k: int = 5,
+               nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+               required_skills: Optional[List[str]] = None, optional_skills: Optional[List[str]] = None,
+               categories: Optional[List[str]] = None) -> List[Dict]:
         """
         Search the database for similar resumes.
         
         Args:
             query_vector: Query embedding vector (normalized)
             top_k: Number of top results to return
+            nprobe: IVF lists to visit (default: config.FAISS_NPROBE)
+            ef_search: HNSW search depth (default: config.FAISS_EF_SEARCH)
+            required_skills: Only return resumes that have all of these skills
+            optional_skills: Only return resumes that have at least one of these skills
+            categories: Only return resumes in one of these categories (case-insensitive)
             
         Returns:
             List of dictionaries with candidate metadata and scores
         """
-        if self.index is None or len(self.metadata) == 0:
-            return []
-        
-        # Ensure query vector is normalized and correct shape
-        query_vector = query_vector.astype('float32')
         if query_vector.ndim == 1:
             query_vector = query_vector.reshape(1, -1)
+        return self.search_batch(query_vector[:1], top_k, nprobe=nprobe, ef_search=ef_search,
+                                 required_skills=required_skills, optional_skills=optional_skills,
+                                 categories=categories)[0]
+    
+    def search_batch(self, query_vectors: np.ndarray, top_k: int = 5,
+                     nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                     required_skills: Optional[List[str]] = None,
+                     optional_skills: Optional[List[str]] = None,
+                     categories: Optional[List[str]] = None) -> List[List[Dict]]:
+        """
+        Search the database for several queries with one FAISS call.
         
-        faiss.normalize_L2(query_vector)
+        With skill filters, the matching rows are looked up in the inverted
+        skill index first and FAISS only ranks those rows, so a selective
+        filter still returns up to top_k results. Skill names are matched
+        case-insensitively against SkillExtractor's canonical names; an
+        unknown required skill matches nothing. A category filter works the
+        same way, through a category -> rows index.
         
-        # Search
-        scores, indices = self.index.search(query_vector, min(top_k, len(self.metadata)))
+        Args:
+            query_vectors: Query embeddings, shape (n_queries, dim)
+            top_k: Number of top results to return per query
+            nprobe: IVF lists to visit (default: config.FAISS_NPROBE)
+            ef_search: HNSW search depth (default: config.FAISS_EF_SEARCH)
+            required_skills: Only return resumes that have all of these skills
+            optional_skills: Only return resumes that have at least one of these skills
+            categories: Only return resumes in one of these categories (case-insensitive)
+            
+        Returns:
+            One list of result dictionaries per query, in query order
+        """
+        rankings = self.rank_batch(query_vectors, top_k, nprobe=nprobe, ef_search=ef_search,
+                                   required_skills=required_skills, optional_skills=optional_skills,
+                                   categories=categories)
+        return [self.fetch_results(scores, rows) for scores, rows in rankings]
+    
+    @timed("vector_search")
+    def rank_batch(self, query_vectors: np.ndarray, top_k: int = 5, min_score: Optional[float] = None,
+                   nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                   required_skills: Optional[List[str]] = None,
+                   optional_skills: Optional[List[str]] = None,
+                   categories: Optional[List[str]] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Rank resumes for several queries without reading their metadata.
         
-        # Format results
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < len(self.metadata):
-                result = self.metadata[idx].copy()
-                # Convert inner product to similarity score (0-1 range)
-                # Inner product of normalized vectors = cosine similarity
-                similarity = float(score)
-                result["score"] = max(0.0, min(1.0, similarity))  # Clamp to [0, 1]
-                results.append(result)
+        Without min_score this is a top-k search. With min_score, every resume
+        whose best score reaches it is returned, up to top_k (see
+        faiss_index.range_search; exact for flat indexes). Only
+        scores and row numbers are kept, so a long ranking costs
+        12 bytes per resume and is read page by page with fetch_results.
+        Skill and category filters work as in search_batch.
+        
+        Args:
+            query_vectors: Query embeddings, shape (n_queries, dim)
+            top_k: Most resumes to return per query
+            min_score: Cosine similarity cutoff (threshold mode), or None
+            nprobe: IVF lists to visit (default: config.FAISS_NPROBE)
+            ef_search: HNSW search depth (default: config.FAISS_EF_SEARCH)
+            required_skills: Only return resumes that have all of these skills
+            optional_skills: Only return resumes that have at least one of these skills
+            categories: Only return resumes in one of these categories (case-insensitive)
+            
+        Returns:
+            One (scores, rows) pair of arrays per query, best first
+        """
+        return self._rank_batch(query_vectors, top_k, min_score, nprobe, ef_search,
+                                required_skills, optional_skills, categories)
+    
+    def _rank_batch(self, query_vectors: np.ndarray, top_k: int, min_score: Optional[float],
+                    nprobe: Optional[int], ef_search: Optional[int], required_skills: Optional[List[str]],
+                    optional_skills: Optional[List[str]],
+                    categories: Optional[List[str]]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """rank_batch without the stage timer (ShardedResumeDatabase times the whole fan-out instead)."""
+        self._reload_if_changed()
+        if self.index is None or self.index.ntotal == 0:
+            return [(np.zeros(0, dtype='float32'), np.zeros(0, dtype='int64')) for _ in range(len(query_vectors))]
+        
+        # Ensure query vectors are normalized (copy: the caller's array is left untouched)
+        query_vectors = np.array(query_vectors, dtype='float32', ndmin=2)
+        faiss.normalize_L2(query_vectors)
         
+        with self._lock:
+            stride = self.metadata.label_stride
+            rows = self._filter_rows(required_skills or [], optional_skills or [], categories or [])
+            labels = None
+            fraction = None
+            if rows is not None:
+                labels = self._row_labels(rows) if stride > 1 else rows
+                fraction = len(rows) / max(self.metadata.live_count, 1)
+            
+            if min_score is not None:
+                # Every chunk of the best top_k resumes is among the top top_k * stride vectors
+                hits = range_search(self.index, query_vectors, min_score, top_k * stride, labels, nprobe=nprobe,
+                                    ef_search=ef_search, fraction=fraction)
+            else:
+                # With chunked vectors, fetch enough hits for top_k distinct resumes
+                k = top_k * stride
+                if labels is None:
+                    params = search_params(self.index, nprobe=nprobe, ef_search=ef_search)
+                    scores, indices = self.index.search(query_vectors, min(k, self.index.ntotal), params=params)
+                else:
+                    scores, indices = search_subset(self.index, query_vectors, k, labels, nprobe=nprobe,
+                                                    ef_search=ef_search, fraction=fraction)
+                hits = list(zip(scores, indices))
+        
+        return [self._best_rows(scores, indices, stride, top_k) for scores, indices in hits]
+    
+    def fetch_results(self, scores: np.ndarray, rows: np.ndarray) -> List[Dict]:
+        """
+        Read ranked rows (e.g. one page of a rank_batch ranking) into result dictionaries.
+        
+        Args:
+            scores: Similarity scores, as returned by rank_batch
+            rows: Metadata rows, as returned by rank_batch
+            
+        Returns:
+            Candidate metadata with a "score" in [0, 1], in the given order;
+            rows deleted (or replaced by an update) since the ranking was made are skipped
+        """
+        results = []
+        with self._lock:
+            if not len(self.metadata):
+                return results
+            rows = np.asarray(rows, dtype=np.int64)
+            live = ~np.isin(rows, self.metadata.deleted)
+            for score, row, is_live in zip(scores, rows, live):
+                # Only the returned rows are read from the memory-mapped store
+                if is_live and row < len(self.metadata):
+                    result = self.metadata[int(row)]
+                    # Inner product of normalized vectors = cosine similarity, clamped to [0, 1]
+                    result["score"] = max(0.0, min(1.0, float(score)))
+                    results.append(result)
         return results
+    
+    @staticmethod
+    def _best_rows(scores: np.ndarray, labels: np.ndarray, stride: int, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Fold score-sorted vector hits into distinct rows, each scored by its best chunk, best first."""
+        found = labels >= 0
+        scores, rows = scores[found], labels[found] // stride
+        # Hits are sorted by score, so a resume's first chunk hit is its best one
+        _, first = np.unique(rows, return_index=True)
+        first = np.sort(first)[:limit]
+        return scores[first], rows[first]
+    
+    def _filter_rows(self, required_skills: List[str], optional_skills: List[str],
+                     categories: List[str]) -> Optional[np.ndarray]:
+        """Rows passing the skill and category filters, or None when there are no filters."""
+        skill_rows = self._skill_rows(required_skills, optional_skills)
+        category_rows = self._category_rows(categories)
+        if skill_rows is None or category_rows is None:
+            return category_rows if skill_rows is None else skill_rows
+        return np.intersect1d(skill_rows, category_rows, assume_unique=True)
+    
+    def _category_rows(self, categories: List[str]) -> Optional[np.ndarray]:
+        """Sorted live rows in any of `categories` (case-insensitive), or None when there is no filter."""
+        categories = {category.strip().lower() for category in categories if category.strip()}
+        if not categories:
+            return None
+        # Rebuild the category -> rows index whenever the store was replaced, like the skill index
+        if self._category_index is None or self._category_index[0] is not self.metadata:
+            names, inverse = np.unique(self.metadata.categories, return_inverse=True)
+            live_rows = np.flatnonzero(self.metadata.live_mask())
+            inverse = inverse[live_rows]
+            order = np.argsort(inverse, kind="stable")
+            postings = np.split(live_rows[order], np.cumsum(np.bincount(inverse, minlength=len(names)))[:-1])
+            index = {}
+            for name, rows in zip(names, postings):
+                key = name.decode("utf-8", errors="ignore").lower()
+                index[key] = np.union1d(index[key], rows) if key in index else rows
+            self._category_index = (self.metadata, index)
+        index = self._category_index[1]
+        matched = [index[category] for category in categories if category in index]
+        return np.sort(np.concatenate(matched)) if matched else np.zeros(0, dtype=np.int64)
+    
+    def _skill_rows(self, required_skills: List[str], optional_skills: List[str]) -> Optional[np.ndarray]:
+        """Rows passing the skill filters, or None when there are no filters."""
+        if not required_skills and not optional_skills:
+            return None
+        if self.metadata.version < STORE_VERSION:
+            self._upgrade_metadata()
+        # Rebuild the inverted index whenever the store was replaced (build, upsert, delete, sync)
+        if self._skill_index is None or self._skill_index.store is not self.metadata:
+            self._skill_index = SkillIndex(self.metadata, skill_extractor.taxonomy)
+        return self._skill_index.filter_rows(required_skills, optional_skills)
+    
+    def upsert(self, records: List[Dict]) -> Dict[str, int]:
+        """
+        Insert new resumes or replace existing ones, matched on ID.
+        
+        Only records whose content changed are embedded. The index is written
+        to disk once per call, so pass many records at a time.
+        
+        Args:
+            records: Dicts with "id", "category" and "full_text" keys
+            
+        Returns:
+            Counts of added, updated and unchanged records
+            
+        Raises:
+            ValueError: If an ID or category is too long for the metadata
+                store (see app.metadata_store); nothing is changed then
+        """
+        with self._file_lock, self._lock:
+            self._require_index()
+            counts = {"added": 0, "updated": 0, "unchanged": 0}
+            # Last record wins when the same ID is passed twice
+            records = list({str(r["id"]): dict(r, id=str(r["id"])) for r in records}.values())
+            changed, old_rows = self._diff(records, self.metadata.id_rows(), counts)
+            self._apply(changed, old_rows)
+            return counts
+    
+    def delete(self, ids: List[str]) -> int:
+        """
+        Remove resumes by ID.
+        
+        Returns:
+            Number of resumes deleted (unknown IDs are ignored)
+        """
+        with self._file_lock, self._lock:
+            self._require_index()
+            id_rows = self.metadata.id_rows()
+            rows = [id_rows[str(i)] for i in set(map(str, ids)) if str(i) in id_rows]
+            self._apply([], rows)
+            return len(rows)
+    
+    def sync(self) -> Dict[str, int]:
+        """
+        Bring the index in line with the CSV without a full rebuild.
+        
+        The CSV is streamed in chunks and compared with the stored content
+        hashes: new and changed rows are embedded, unchanged rows are skipped,
+        and IDs missing from the CSV are deleted.
+        
+        Returns:
+            Counts of added, updated, deleted and unchanged resumes
+        """
+        with self._file_lock, self._lock:
+            if self.index is None:
+                self.build_index()
+                return {"added": self.metadata.live_count if self.index is not None else 0,
+                        "updated": 0, "deleted": 0, "unchanged": 0}
+            self._require_index()
+            
+            counts = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+            id_rows = self.metadata.id_rows()
+            seen = set()
+            text_column = None
+            # One writer for the whole sync: its rows are published once, after the index is written
+            writer = self._open_writer()
+            
+            try:
+                for chunk in pd.read_csv(self.csv_path, chunksize=config.CSV_CHUNK_ROWS):
+                    if text_column is None:
+                        text_column = self._text_column(chunk.columns)
+                        if text_column is None:
+                            writer.discard()
+                            return counts
+                    
+                    _, records = self._chunk_records(chunk, text_column, writer)
+                    seen.update(record["id"] for record in records)
+                    changed, old_rows = self._diff(records, id_rows, counts)
+                    if changed:
+                        self._apply(changed, old_rows, writer)
+                        print(f"Synced {len(changed)} new or changed resumes...")
+                
+                gone = [row for resume_id, row in id_rows.items() if resume_id not in seen]
+                counts["deleted"] = len(gone)
+                self._apply([], gone, writer)
+                self._publish(writer)
+            except BaseException:
+                self._abandon(writer)
+                raise
+            print(f"✅ Sync complete: {counts}")
+            return counts
+    
+    def _diff(self, records: List[Dict], id_rows: Dict[str, int], counts: Dict[str, int]) -> Tuple[List[Dict], List[int]]:
+        """Split records into new/changed ones (plus the rows they replace) and count them."""
+        changed = []
+        old_rows = []
+        for record in records:
+            row = id_rows.get(record["id"])
+            if row is None:
+                counts["added"] += 1
+                changed.append(record)
+            elif self.metadata.get_hash(row) != content_hash(record):
+                counts["updated"] += 1
+                changed.append(record)
+                old_rows.append(row)
+            else:
+                counts["unchanged"] += 1
+        return changed, old_rows
+    
+    def _apply(self, records: List[Dict], remove_rows: List[int], writer: Optional[MetadataWriter] = None):
+        """
+        Append `records` as new rows and retire `remove_rows` in both metadata and index.
+        
+        The index file is written before the metadata header that publishes
+        the new rows, so a crash in between never leaves live metadata rows
+        without vectors: the unpublished rows are dropped when the store is
+        next opened for writing, and their vectors by _require_index.
+        
+        Args:
+            records: New rows (dicts with id, category and full_text keys)
+            remove_rows: Rows to mark deleted
+            writer: Writer of a larger update (sync) to append to; the caller
+                then publishes it with _publish. Without one, the change is
+                written and published now.
+        """
+        if not records and not remove_rows:
+            return
+        if remove_rows and not supports_removal(self.index):
+            raise ValueError("This index type cannot delete vectors; rebuild the index instead")
+        
+        own_writer = writer is None
+        if own_writer:
+            writer = self._open_writer()
+        try:
+            embeddings, labels = self._embed_rows([r["full_text"] for r in records], writer.count,
+                                                  self.metadata.label_stride)
+            self._tag_skills(records)
+            
+            # Row data only; readers see the rows once the writer publishes its header
+            writer.append(records)
+            writer.mark_deleted(remove_rows)
+            
+            if remove_rows:
+                self.index.remove_ids(self._row_labels(remove_rows))
+            if records:
+                add_vectors(self.index, embeddings, labels)
+            if own_writer:
+                self._publish(writer)
+        except BaseException:
+            if own_writer:
+                self._abandon(writer)
+            raise
+    
+    def _open_writer(self) -> MetadataWriter:
+        """Writer appending to the loaded store, with its column widths, skills vocabulary and label stride."""
+        # Passed explicitly: with resume_rows=0 (an empty store) the writer would start a fresh store
+        return MetadataWriter(self.metadata_path, resume_rows=len(self.metadata),
+                              skills_vocabulary=self.metadata.skills_vocabulary,
+                              id_width=self.metadata.header["id_width"],
+                              category_width=self.metadata.header["category_width"],
+                              label_stride=self.metadata.label_stride)
+    
+    def _publish(self, writer: MetadataWriter):
+        """Write the index, then publish the writer's rows in the metadata header."""
+        self._persist_index()
+        writer.close()
+        self.metadata = MetadataStore(self.metadata_path)
+        self._index_changed()
+    
+    def _abandon(self, writer: MetadataWriter):
+        """Drop an unpublished update: close its writer and reload the index from disk."""
+        writer.discard()
+        self._load_index()
+        self._index_changed()
+    
+    def refresh(self) -> int:
+        """
+        Pick up index files another process rewrote since they were loaded.
+        
+        Call before using index_version in a query cache key, so that cached
+        results from before another worker's update are not served.
+        
+        Returns:
+            The current index version
+        """
+        self._reload_if_changed()
+        return self.index_version
+    
+    def _require_index(self):
+        """Make sure an up-to-date, mutable index is loaded before changing it (call with the file lock held)."""
+        self._reload_if_changed(blocking=True)
+        if self.index is None:
+            raise ValueError("The index is not loaded; call build_index() first")
+        if self._mmapped:
+            # Memory-mapped arrays are read-only; changes need a private copy
+            self.index = faiss.read_index(self.index_path)
+            self._mmapped = False
+        self.index = make_mutable(self.index)
+        if self.metadata.version < STORE_VERSION:
+            self._upgrade_metadata()
+        if supports_removal(self.index):
+            # Vectors of rows that an interrupted update wrote to the index but never published (see _apply)
+            self.index.remove_ids(faiss.IDSelectorRange(len(self.metadata) * self.metadata.label_stride, 2 ** 62))
+    
+    def _persist_index(self):
+        # Replace (never overwrite) the file: other processes may have the old one memory-mapped
+        faiss.write_index(self.index, self.index_path + ".tmp")
+        os.replace(self.index_path + ".tmp", self.index_path)
+        self._index_stamp = self._file_stamp()
+    
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Inode, modification time and size of the index file (None if it is missing)."""
+        try:
+            stat = os.stat(self.index_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+    
+    def _reload_if_changed(self, blocking: bool = False):
+        """
+        Reload the index and metadata after another process replaced the index file.
+        
+        With several server workers, an upsert, delete or sync in one process
+        rewrites the files; the others notice on their next search (one stat
+        call) and reload, which also invalidates their query caches.
+        
+        Args:
+            blocking: Wait for a writer that is still publishing; otherwise
+                keep serving the loaded index and retry on the next search
+        """
+        if self._index_stamp is None or self._file_stamp() in (self._index_stamp, None):
+            return
+        if not self._file_lock.acquire(blocking=blocking):
+            return
+        try:
+            with self._lock:
+                if self._file_stamp() not in (self._index_stamp, None):
+                    print("Index files changed on disk; reloading...")
+                    self._load_index()
+                    self._index_changed()
+        finally:
+            self._file_lock.release()
+    
+    def _upgrade_metadata(self):
+        """Rewrite an older metadata store (no content hashes or skills) in the current format."""
+        print(f"Upgrading metadata store {self.metadata_path}...")
+        old = self.metadata
+        partial_metadata_path = self.metadata_path + ".partial"
+        shutil.rmtree(partial_metadata_path, ignore_errors=True)
+        
+        # Row numbers (= index labels) and deletions are preserved
+        writer = MetadataWriter(partial_metadata_path, skills_vocabulary=skill_extractor.vocabulary(),
+                                label_stride=old.label_stride)
+        for start in range(0, len(old), config.CSV_CHUNK_ROWS):
+            batch = []
+            for row in range(start, min(start + config.CSV_CHUNK_ROWS, len(old))):
+                record = old[row]
+                batch.append({key: record[key] for key in ("id", "category", "full_text")})
+            writer.append(self._tag_skills(batch))
+        writer.mark_deleted(old.deleted)
+        writer.close()
+        
+        replace_store(partial_metadata_path, self.metadata_path)
+        self.metadata = MetadataStore(self.metadata_path)
+        self._index_changed()
+    
+    def _index_changed(self):
+        """Invalidate cached query results after the index or metadata changed."""
+        with self._lock:
+            self.index_version += 1
+            self.query_cache.clear()
 
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Build or incrementally sync the CSV resume index.")
+    parser.add_argument("command", choices=["build", "sync"], help="build: full build if no index exists; sync: embed only new/changed rows")
+    parser.add_argument("--csv", default="Resume.csv")
+    parser.add_argument("--index", default="resume_index.faiss")
+    parser.add_argument("--metadata", default="resume_metadata")
+    args = parser.parse_args()
+    
+    database = CSVResumeDatabase(csv_path=args.csv, index_path=args.index, metadata_path=args.metadata)
+    database.build_index()
+    if args.command == "sync":
+        database.sync()
@@ -0,0 +1,112 @@
+"""
+Dynamic micro-batching for the sentence encoder.
+
+Concurrent requests used to call model.encode separately, so under load the
+model ran many small forward passes that competed for the same CPU threads.
+The scheduler queues texts from every caller and encodes them on one worker
+thread in batches of up to `max_batch_size` texts. A batch is closed when it
+is full, or `max_wait_ms` after its first text arrived. Texts that arrive
+while a batch is encoding are picked up together by the next one, so batches
+grow with load even with max_wait_ms=0, and a lone request is not delayed.
+
+Bulk work (CSV index builds, bulk screening, talent pool writes) bypasses
+the scheduler (generate_embeddings(scheduled=False)) and encodes in
+config.EMBED_BATCH_SIZE batches of its own, so thousands of queued texts
+never hold up interactive requests.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from app.metrics import EMBED_BATCH_SIZES, observe_stage
+
+
+class EmbeddingScheduler:
+    """Batches encode calls from many threads onto one worker thread."""
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], max_batch_size: int = 64,
+                 max_wait_ms: float = 0.0):
+        """
+        Start the worker thread.
+
+        Args:
+            encode_fn: Encodes a list of texts into an (n, dim) array
+            max_batch_size: Most texts per encode_fn call
+            max_wait_ms: Longest time a batch waits for more texts
+        """
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="embedding-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> List[Future]:
+        """Queue texts for encoding; each future resolves to one embedding vector."""
+        if self._closed:
+            raise RuntimeError("EmbeddingScheduler is closed")
+        futures = []
+        for text in texts:
+            future: Future = Future()
+            self._queue.put((text, future))
+            futures.append(future)
+        return futures
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts through the shared batches, blocking until all are done."""
+        futures = self.submit(texts)
+        return np.vstack([future.result() for future in futures])
+
+    def close(self):
+        """Stop the worker after the queued texts are encoded."""
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _next_batch(self) -> List[Tuple[str, Future]]:
+        """Block for the first item, then gather more until the batch is full or the deadline passes."""
+        item = self._queue.get()
+        if item is None:
+            return []
+        batch = [item]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                # Items that are already queued are taken without waiting
+                item = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # finish this batch, then stop
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            # Drop texts whose caller gave up, then sort by length to reduce padding
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            batch.sort(key=lambda item: len(item[0]))
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                vectors = self.encode_fn([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            observe_stage("encode_batch", time.perf_counter() - start)
+            EMBED_BATCH_SIZES.observe(len(batch))
+
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
@@ -0,0 +1,151 @@
+"""
+Shared embedding process for multi-worker deployments.
+
+Every uvicorn worker would otherwise load its own copy of the sentence
+encoder (hundreds of MB each, plus torch). With EMBEDDING_SERVER set, one
+process started by run.py --production loads the encoder and the workers
+send it texts over a local socket (multiprocessing.connection, authenticated
+with EMBEDDING_SERVER_AUTHKEY). Workers never import sentence-transformers
+or torch. Requests from all workers go through the server's embedding
+scheduler and cache, so they also share encoder batches and cached vectors.
+
+Protocol: the client sends ("encode", texts) or ("dimension", None) and
+receives ("ok", result) or ("error", message).
+"""
+import os
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import List, Tuple, Union
+
+import numpy as np
+
+# How long a client keeps retrying while the server process starts
+CONNECT_TIMEOUT_S = 60
+
+
+def parse_address(address: str) -> Union[str, Tuple[str, int]]:
+    """"host:port" -> (host, port); anything else is a Unix socket path or Windows pipe name."""
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit() and not address.startswith("\\\\"):
+        return host, int(port)
+    return address
+
+
+def default_address() -> str:
+    """A per-launch socket path (named pipe on Windows) for run.py."""
+    if os.name == "nt":
+        return rf"\\.\pipe\resume-ranker-embed-{os.getpid()}"
+    return os.path.join(tempfile.gettempdir(), f"resume-ranker-embed-{os.getpid()}.sock")
+
+
+def serve(address: str, authkey: str):
+    """
+    Load the encoder and answer encode requests until the process is stopped.
+
+    Args:
+        address: "host:port" or a socket path
+        authkey: Shared secret clients must present
+    """
+    from app import config
+    from app.utils import generate_embeddings, load_model
+
+    if not authkey:
+        raise ValueError("EMBEDDING_SERVER_AUTHKEY must be set")
+    # The environment run.py sets for the workers is inherited here too; this
+    # process loads the real encoder rather than calling itself
+    config.EMBEDDING_SERVER = ""
+    if isinstance(parse_address(address), str) and os.name != "nt" and os.path.exists(address):
+        os.remove(address)  # socket left behind by a killed server
+    listener = Listener(parse_address(address), authkey=authkey.encode())
+    print(f"Embedding server listening on {address}")
+    # Accept connections while the model loads; requests wait for it in load_model
+    threading.Thread(target=load_model, name="load-model", daemon=True).start()
+
+    def handle(connection: Connection):
+        with connection:
+            while True:
+                try:
+                    operation, payload = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if operation == "encode":
+                        result = generate_embeddings(payload)
+                    elif operation == "dimension":
+                        result = load_model().get_sentence_embedding_dimension()
+                    else:
+                        raise ValueError(f"Unknown operation '{operation}'")
+                    connection.send(("ok", result))
+                except Exception as e:
+                    connection.send(("error", str(e)))
+
+    while True:
+        try:
+            connection = listener.accept()
+        except Exception as e:  # e.g. a client with the wrong authkey
+            print(f"Embedding server: rejected connection: {e}")
+            continue
+        threading.Thread(target=handle, args=(connection,), name="embedding-client", daemon=True).start()
+
+
+class RemoteEncoder:
+    """Stands in for the SentenceTransformer, forwarding encode() to the shared embedding process."""
+
+    def __init__(self, address: str, authkey: str):
+        if not authkey:
+            raise ValueError("EMBEDDING_SERVER_AUTHKEY must be set when EMBEDDING_SERVER is used")
+        self.address = parse_address(address)
+        self.authkey = authkey.encode()
+        # One connection per calling thread, so concurrent requests do not wait on each other
+        self._local = threading.local()
+        self._dimension = None
+
+    def _connect(self) -> Connection:
+        deadline = time.time() + CONNECT_TIMEOUT_S
+        while True:
+            try:
+                return Client(self.address, authkey=self.authkey)
+            except (ConnectionRefusedError, FileNotFoundError):
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.2)
+
+    def _call(self, operation: str, payload=None):
+        for attempt in range(2):
+            connection = getattr(self._local, "connection", None)
+            if connection is None:
+                connection = self._local.connection = self._connect()
+            try:
+                connection.send((operation, payload))
+                status, result = connection.recv()
+                break
+            except (EOFError, OSError):
+                # Server restarted or connection dropped: reconnect once
+                self._local.connection = None
+                if attempt:
+                    raise
+        if status != "ok":
+            raise RuntimeError(f"Embedding server error: {result}")
+        return result
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dimension is None:
+            self._dimension = self._call("dimension")
+        return self._dimension
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        """Encode sentences into an (n, dim) float32 array (same contract as SentenceTransformer.encode)."""
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+        if not sentences:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype="float32")
+        return self._call("encode", list(sentences))
+
+
+if __name__ == "__main__":
+    from app import config
+
+    serve(config.EMBEDDING_SERVER or default_address(), config.EMBEDDING_SERVER_AUTHKEY)
@@ -0,0 +1,189 @@
+"""
+Inference backends for the sentence encoder.
+
+    torch      SentenceTransformer in fp32 (default)
+    int8       SentenceTransformer with int8 dynamic quantization of its Linear
+               layers (PyTorch, CPU only)
+    onnx       the transformer exported to ONNX and run with ONNX Runtime
+    onnx_int8  the ONNX export with int8 dynamically quantized weights
+
+Every backend provides the two SentenceTransformer methods the app uses,
+encode() and get_sentence_embedding_dimension(), so generate_embeddings and
+the CSV index build work unchanged whichever backend is loaded. ONNX exports
+are written once to config.EMBEDDING_ONNX_DIR and reused on later starts.
+
+ONNX backends need the optional onnxruntime package.
+"""
+import os
+from typing import TYPE_CHECKING, Dict, List, Union
+
+import numpy as np
+
+from app import config
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+BACKENDS = ("torch", "int8", "onnx", "onnx_int8")
+
+ONNX_OPSET = 14
+
+
+def load_encoder(model_name: str, backend: str = "torch"):
+    """
+    Load the sentence encoder with the requested inference backend.
+
+    Args:
+        model_name: Sentence-Transformer model name
+        backend: One of BACKENDS
+
+    Returns:
+        A SentenceTransformer (torch, int8) or an OnnxEncoder (onnx, onnx_int8)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}', expected one of {BACKENDS}")
+    # Imported here so processes using a shared embedding server never load torch
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    model = SentenceTransformer(model_name, device="cpu")
+    if backend == "int8":
+        import torch
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    path = export_onnx(model, onnx_path(model_name))
+    if backend == "onnx_int8":
+        path = quantize_onnx(path, onnx_path(model_name, quantized=True))
+    return OnnxEncoder(model, path)
+
+
+def onnx_path(model_name: str, quantized: bool = False) -> str:
+    """Where the ONNX export of a model is stored."""
+    suffix = "_int8" if quantized else ""
+    return os.path.join(config.EMBEDDING_ONNX_DIR, f"{model_name.replace('/', '_')}{suffix}.onnx")
+
+
+def export_onnx(model: "SentenceTransformer", path: str) -> str:
+    """Export the model's transformer to ONNX (skipped when `path` already exists)."""
+    if os.path.exists(path):
+        return path
+
+    import torch
+
+    print(f"Exporting encoder to ONNX: {path}...")
+    transformer = model[0].auto_model.eval()
+    sample = model.tokenizer(["An example sentence for tracing the graph."], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class _LastHiddenState(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(input_names, inputs)), return_dict=False)[0]
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            _LastHiddenState(), tuple(sample[name] for name in input_names), path + ".tmp",
+            input_names=input_names, output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes, opset_version=ONNX_OPSET,
+        )
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def quantize_onnx(source: str, path: str) -> str:
+    """Write an int8 dynamically quantized copy of an ONNX model (skipped when it exists)."""
+    if not os.path.exists(path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        print(f"Quantizing ONNX encoder to int8: {path}...")
+        quantize_dynamic(source, path + ".tmp", weight_type=QuantType.QInt8)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+class OnnxEncoder:
+    """Runs an exported transformer with ONNX Runtime, pooling like the SentenceTransformer it came from."""
+
+    def __init__(self, model: "SentenceTransformer", path: str):
+        """
+        Create an inference session.
+
+        Args:
+            model: The SentenceTransformer the graph was exported from (its
+                tokenizer, pooling and normalization settings are reused)
+            path: ONNX file
+        """
+        import onnxruntime
+        from sentence_transformers.models import Normalize
+
+        pooling = model[1]
+        if not (pooling.pooling_mode_mean_tokens or pooling.pooling_mode_cls_token):
+            raise ValueError("ONNX backends support mean or CLS pooling only")
+
+        self.path = path
+        self.tokenizer = model.tokenizer
+        self.max_seq_length = model.max_seq_length
+        self.cls_pooling = bool(pooling.pooling_mode_cls_token)
+        self.normalize = any(isinstance(module, Normalize) for module in model)
+        self.dimension = model.get_sentence_embedding_dimension()
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [node.name for node in self.session.get_inputs()]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        """Encode sentences into an (n, dim) float32 array (same contract as SentenceTransformer.encode)."""
+        if isinstance(sentences, str):
+            return self.encode([sentences], batch_size)[0]
+
+        embeddings = np.zeros((len(sentences), self.dimension), dtype="float32")
+        # Longest first, so each batch pads to similar lengths
+        order = np.argsort([-len(sentence) for sentence in sentences], kind="stable")
+        for start in range(0, len(sentences), batch_size):
+            batch = order[start:start + batch_size]
+            tokens = self.tokenizer(
+                [sentences[i] for i in batch], padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors="np",
+            )
+            feeds = {name: tokens[name].astype("int64") for name in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+
+            if self.cls_pooling:
+                pooled = hidden[:, 0]
+            else:
+                mask = tokens["attention_mask"][..., None].astype("float32")
+                pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.normalize:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings[batch] = pooled
+        return embeddings
+
+
+def cosine_drift(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """
+    Compare embeddings of the same texts from two backends.
+
+    Returns:
+        Mean and minimum row-wise cosine similarity, and the largest drift
+        (1 - cosine) of any text
+    """
+    reference = reference / np.clip(np.linalg.norm(reference, axis=1, keepdims=True), 1e-12, None)
+    candidate = candidate / np.clip(np.linalg.norm(candidate, axis=1, keepdims=True), 1e-12, None)
+    cosines = (reference * candidate).sum(axis=1)
+    return {
+        "mean_cosine": float(cosines.mean()),
+        "min_cosine": float(cosines.min()),
+        "max_drift": float(1 - cosines.min()),
+    }
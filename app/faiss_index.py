@@ -0,0 +1,338 @@
+"""
+FAISS index factory for the resume databases.
+
+Supported index types (all use inner product on L2-normalized vectors, i.e.
+cosine similarity):
+
+    flat      exact scan (IndexFlatIP wrapped in an IndexIDMap)
+    ivf_flat  inverted lists over full vectors; tune with nprobe
+    ivf_pq    inverted lists over product-quantized vectors; tune with nprobe
+    hnsw      graph search; tune with ef_search
+
+IVF types have to be trained on a sample of vectors before anything is added.
+
+search_subset() restricts a search to a set of labels (e.g. resumes matching a
+skill filter) with a FAISS ID selector, widening the IVF/HNSW search so that
+selective filters still fill the top-k. range_search() returns the vectors
+above a score cutoff (up to a cap) instead of a fixed number of results; on
+HNSW indexes it raises efSearch to the cap, since graph search returns at
+most efSearch results.
+
+Vectors are labelled with their metadata row number (or, for chunked
+embeddings, row * stride + chunk; see app/metadata_store.py). Flat and IVF
+indexes support removing labels, so rows can be updated in place; HNSW graphs
+cannot delete nodes and only support appending. A plain HNSW index labels
+vectors by position, so chunked builds wrap it in an IndexIDMap.
+"""
+import math
+from typing import List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from app import config
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+# FAISS warns below ~39 training points per IVF list; PQ needs 2**nbits points
+MIN_POINTS_PER_LIST = 39
+PQ_NBITS = 8
+
+
+def create_index(
+    index_type: str,
+    dimension: int,
+    n_train: int = 0,
+    nlist: Optional[int] = None,
+    pq_m: Optional[int] = None,
+    hnsw_m: Optional[int] = None,
+    labelled: bool = False,
+) -> faiss.Index:
+    """
+    Create an empty index of the requested type.
+
+    Args:
+        index_type: One of INDEX_TYPES
+        dimension: Embedding dimension
+        n_train: Number of vectors available for training; nlist is reduced
+            so each list gets enough training points
+        nlist: Number of IVF lists (default: config.FAISS_NLIST)
+        pq_m: PQ sub-quantizers, must divide the dimension (default: config.FAISS_PQ_M)
+        hnsw_m: HNSW neighbours per node (default: config.FAISS_HNSW_M)
+        labelled: Accept arbitrary labels (only changes HNSW, which is then
+            wrapped in an IndexIDMap)
+
+    Returns:
+        An untrained (IVF) or ready-to-use (flat, HNSW) FAISS index
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS index type '{index_type}', expected one of {INDEX_TYPES}")
+
+    if index_type == "flat":
+        return faiss.IndexIDMap(faiss.IndexFlatIP(dimension))
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, hnsw_m or config.FAISS_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = config.FAISS_EF_CONSTRUCTION
+        return faiss.IndexIDMap(index) if labelled else index
+
+    nlist = nlist or config.FAISS_NLIST
+    if n_train:
+        nlist = max(1, min(nlist, n_train // MIN_POINTS_PER_LIST))
+    quantizer = faiss.IndexFlatIP(dimension)
+
+    if index_type == "ivf_pq" and n_train >= 2 ** PQ_NBITS:
+        pq_m = pq_m or config.FAISS_PQ_M
+        if dimension % pq_m:
+            raise ValueError(f"FAISS_PQ_M={pq_m} must divide the embedding dimension {dimension}")
+        return faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, PQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+
+    if index_type == "ivf_pq":
+        print(f"Warning: {n_train} vectors are too few to train PQ codes. Using ivf_flat instead.")
+    return faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+
+
+def train_index(index: faiss.Index, sample: np.ndarray):
+    """Train an IVF index on a sample of normalized vectors (no-op for other types)."""
+    if not index.is_trained:
+        index.train(np.ascontiguousarray(sample, dtype="float32"))
+
+
+def add_vectors(index: faiss.Index, vectors: np.ndarray, labels: np.ndarray):
+    """Add normalized vectors under the given metadata row labels."""
+    labels = np.asarray(labels, dtype="int64")
+    if isinstance(faiss.downcast_index(index), faiss.IndexHNSW):
+        # HNSW assigns sequential labels itself
+        if len(labels) and labels[0] != index.ntotal:
+            raise ValueError("HNSW indexes only support appending rows in order")
+        index.add(vectors)
+    else:
+        index.add_with_ids(vectors, labels)
+
+
+def supports_removal(index: faiss.Index) -> bool:
+    return not _is_hnsw(index)
+
+
+def read_index(path: str, mmap: bool = False) -> faiss.Index:
+    """
+    Load an index from disk.
+
+    With mmap, the vector/code arrays are memory-mapped read-only instead of
+    copied into the process, so every server worker shares one copy in the OS
+    page cache. FAISS 1.7.x can only map IVF lists (IO_FLAG_MMAP); flat and
+    HNSW storage is mapped from the FAISS release that added IO_FLAG_MMAP_IFC.
+    A memory-mapped index must not be modified: reload it without mmap first.
+    """
+    if not mmap:
+        return faiss.read_index(path)
+    return faiss.read_index(path, getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY)
+
+
+def make_mutable(index: faiss.Index) -> faiss.Index:
+    """
+    Return an index whose labels survive removals.
+
+    A bare IndexFlatIP (built before indexes were labelled) uses positional
+    labels that shift when vectors are removed, so it is copied into an
+    IndexIDMap with the same labels. Other indexes are returned unchanged.
+    """
+    flat = faiss.downcast_index(index)
+    if not isinstance(flat, faiss.IndexFlat):
+        return index
+    mutable = faiss.IndexIDMap(faiss.IndexFlatIP(flat.d))
+    if flat.ntotal:
+        mutable.add_with_ids(flat.reconstruct_n(0, flat.ntotal), np.arange(flat.ntotal, dtype="int64"))
+    return mutable
+
+
+def _unwrap(index: faiss.Index) -> Tuple[faiss.Index, Optional[np.ndarray]]:
+    """The index inside an IndexIDMap and its labels, or (index, None) for other indexes."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index), faiss.vector_to_array(index.id_map)
+    return index, None
+
+
+def _is_hnsw(index: faiss.Index) -> bool:
+    return isinstance(_unwrap(index)[0], faiss.IndexHNSW)
+
+
+def search_params(
+    index: faiss.Index,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+) -> Optional[faiss.SearchParameters]:
+    """
+    Build per-query search parameters for approximate indexes.
+
+    Parameters are passed to index.search() rather than set on the index, so
+    concurrent queries with different settings do not interfere.
+
+    Args:
+        index: The index that will be searched
+        nprobe: IVF lists to visit (default: config.FAISS_NPROBE)
+        ef_search: HNSW candidate list size (default: config.FAISS_EF_SEARCH)
+
+    Returns:
+        SearchParameters for IVF/HNSW indexes, None for exact indexes
+    """
+    if faiss.try_extract_index_ivf(index) is not None:
+        return faiss.SearchParametersIVF(nprobe=nprobe or config.FAISS_NPROBE)
+    if _is_hnsw(index):
+        return faiss.SearchParametersHNSW(efSearch=ef_search or config.FAISS_EF_SEARCH)
+    return None
+
+
+def search_subset(
+    index: faiss.Index,
+    queries: np.ndarray,
+    k: int,
+    subset: np.ndarray,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    fraction: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Search only the vectors whose labels are in `subset`.
+
+    Filtering happens inside the search (IDSelectorBatch), not on its output,
+    so results are not lost when few vectors pass the filter. Approximate
+    indexes are searched more widely in proportion to the filter's
+    selectivity: IVF visits nprobe / fraction lists (all lists for very
+    selective filters), HNSW uses efSearch / fraction. HNSW graph search
+    degrades badly on small subsets, so subsets of up to
+    config.FAISS_EXACT_SUBSET_ROWS vectors are scored exactly instead.
+
+    Args:
+        index: The index to search
+        queries: Normalized query vectors, shape (n_queries, dim)
+        k: Results per query
+        subset: Allowed labels (metadata rows)
+        nprobe: Base IVF lists to visit (default: config.FAISS_NPROBE)
+        ef_search: Base HNSW candidate list size (default: config.FAISS_EF_SEARCH)
+        fraction: Share of the indexed vectors that pass the filter (default:
+            len(subset) / ntotal; pass it when `subset` lists labels that may
+            not exist, such as every possible chunk label of a row)
+
+    Returns:
+        (scores, labels) arrays of shape (n_queries, min(k, len(subset))),
+        padded with label -1 like index.search()
+    """
+    subset = np.asarray(subset, dtype="int64")
+    k = min(k, len(subset))
+    if k == 0:
+        return np.zeros((len(queries), 0), dtype="float32"), np.zeros((len(queries), 0), dtype="int64")
+
+    if _is_hnsw(index) and len(subset) <= config.FAISS_EXACT_SUBSET_ROWS:
+        scores, subset = _exact_subset_scores(index, queries, subset)
+        top = np.argsort(-scores, axis=1)[:, :min(k, len(subset))]
+        return np.take_along_axis(scores, top, axis=1), subset[top]
+
+    # `selector` must stay referenced until the search returns
+    params, selector = _subset_params(index, subset, k, nprobe, ef_search, fraction)
+    return index.search(queries, k, params=params)
+
+
+def range_search(
+    index: faiss.Index,
+    queries: np.ndarray,
+    min_score: float,
+    k: int,
+    subset: Optional[np.ndarray] = None,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    fraction: Optional[float] = None,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Find the vectors scoring at least `min_score` against each query, at most k of them.
+
+    A top-k search cut at the score cutoff, so the output is bounded by k
+    however low the cutoff is (a FAISS range search materializes every
+    vector above it first). Flat indexes are exact, IVF indexes search the
+    visited lists. HNSW indexes are searched through the graph with efSearch
+    of at least k, so their cost grows with the cap rather than the corpus;
+    like any HNSW search, this may miss some vectors above the cutoff. With
+    a subset, the search is restricted and widened as in search_subset(),
+    which scores small HNSW subsets exactly.
+
+    Args:
+        index: The index to search
+        queries: Normalized query vectors, shape (n_queries, dim)
+        min_score: Inner-product (cosine) cutoff
+        k: Most vectors returned per query
+        subset: Allowed labels, or None to search everything
+        nprobe: Base IVF lists to visit (default: config.FAISS_NPROBE)
+        ef_search: Base HNSW candidate list size (default: config.FAISS_EF_SEARCH)
+        fraction: Share of the indexed vectors that pass the filter (see search_subset)
+
+    Returns:
+        One (scores, labels) pair of arrays per query, best first
+    """
+    if subset is None:
+        k = max(0, min(k, index.ntotal))
+        params = search_params(index, nprobe=nprobe, ef_search=ef_search)
+        if _is_hnsw(index):
+            # Graph search returns at most efSearch results
+            params.efSearch = max(params.efSearch, k)
+        scores, labels = index.search(queries, k, params=params)
+    else:
+        scores, labels = search_subset(index, queries, k, subset, nprobe=nprobe, ef_search=ef_search,
+                                       fraction=fraction)
+
+    hits = []
+    for query_scores, query_labels in zip(scores, labels):
+        # Results are sorted, so the ones above the cutoff are a prefix
+        keep = (query_labels >= 0) & (query_scores >= min_score)
+        hits.append((query_scores[keep], query_labels[keep]))
+    return hits
+
+
+def _subset_positions(labels: Optional[np.ndarray], subset: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Storage positions of the subset's labels in an HNSW index, and the labels present.
+
+    Plain HNSW labels are positions; a wrapped HNSW maps labels to positions
+    through its (append-only, sorted) id map.
+    """
+    if labels is None:
+        return subset, subset
+    positions = np.searchsorted(labels, subset).clip(max=max(len(labels) - 1, 0))
+    present = labels[positions] == subset if len(labels) else np.zeros(len(subset), dtype=bool)
+    return positions[present], subset[present]
+
+
+def _exact_subset_scores(index: faiss.Index, queries: np.ndarray, subset: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score the subset's vectors of an HNSW index exactly.
+
+    Returns:
+        (scores of shape (n_queries, n_present), labels present in the index)
+    """
+    hnsw, labels = _unwrap(index)
+    positions, subset = _subset_positions(labels, subset)
+    return queries @ hnsw.reconstruct_batch(positions).T, subset
+
+
+def _subset_params(
+    index: faiss.Index,
+    subset: np.ndarray,
+    k: int,
+    nprobe: Optional[int],
+    ef_search: Optional[int],
+    fraction: Optional[float],
+) -> Tuple[faiss.SearchParameters, faiss.IDSelector]:
+    """Search parameters restricted to `subset`, widened by the filter's selectivity; also returns the selector."""
+    fraction = max(fraction or len(subset) / max(index.ntotal, 1), 1e-9)
+    params = search_params(index, nprobe=nprobe, ef_search=ef_search)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        params.nprobe = min(ivf.nlist, math.ceil(params.nprobe / fraction))
+    elif params is not None:
+        params.efSearch = max(k, min(len(subset), math.ceil(params.efSearch / fraction)))
+    else:
+        params = faiss.SearchParameters()
+
+    selector = faiss.IDSelectorBatch(subset)
+    params.sel = selector  # the caller must keep `selector` referenced until the search returns
+    return params, selector
@@ -0,0 +1,329 @@
+"""
+Process-pool ingestion stage for uploaded resumes.
+
+PDF parsing, text cleaning and spaCy skill extraction are CPU-bound and used to
+run one file at a time on the event loop. They now run in a pool of worker
+processes; each worker loads the spaCy model once, when it starts. Stage
+timings measured in a worker are returned with its result and recorded in
+the server's metrics (see app/metrics.py).
+
+Long PDFs (see PDF_SPLIT_MIN_BYTES / PDF_PAGES_PER_TASK) are split into page
+ranges extracted by several workers at once (ranges past the character
+budget are cancelled), and text already extracted from an identical file is
+taken from the content-hash cache, so only skill tagging runs again.
+process_uploads defers skill tagging until a whole batch is parsed and then
+tags one batch per worker with spaCy's nlp.pipe.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app import config
+from app.metrics import BYTES, FILES, PDF_CACHE_LOOKUPS, record_trace, start_trace
+from app.pdf_extractor import (budget_deadline, count_pages, extract_document, extract_pages, join_pages,
+                               page_ranges, pdf_text_cache, size_error)
+
+logger = logging.getLogger(__name__)
+
+# Shared pool used by the web app (created on first use)
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _init_worker():
+    """Load spaCy once per worker, through the shared SkillExtractor."""
+    from app.skill_extractor import skill_extractor
+    skill_extractor.load()
+
+
+def process_resume(content: bytes, filename: str, tag: bool = True) -> Dict:
+    """
+    Extract, clean and tag one uploaded resume. Runs inside a worker process.
+
+    Args:
+        content: Raw PDF bytes
+        filename: Original filename
+        tag: Extract skills too (False leaves them to a batched tag_texts call)
+
+    Returns:
+        Dictionary with filename, raw text, skills, an error message
+        (None when the file was usable), the budget that cut the text short
+        (None when the whole file was read) and per-stage timings
+    """
+    timings = start_trace()
+
+    # Extract text from PDF
+    text, truncated = extract_document(content, filename)
+    logger.debug(f"Raw text ({filename}): {text[:200]!r}")
+
+    result = _tag(text, filename, truncated, tag)
+    result["timings"] = timings
+    return result
+
+
+def extract_page_range(content: bytes, filename: str, start: int, stop: int, deadline: Optional[float]) -> Dict:
+    """
+    Extract pages [start, stop) of a long PDF. Runs inside a worker process.
+
+    Returns:
+        Dictionary with the text, the budget that cut it short and timings
+    """
+    timings = start_trace()
+    text, truncated = extract_pages(content, filename, start, stop, config.PDF_MAX_CHARS, deadline)
+    return {"text": text, "truncated": truncated, "timings": timings}
+
+
+def analyze_text(text: str, filename: str, truncated: Optional[str] = None, tag: bool = True) -> Dict:
+    """
+    Clean and tag extracted resume text. Runs inside a worker process.
+
+    Args:
+        text: Extracted text, or an "[Error ...]" / "[Warning ...]" message
+        filename: Original filename
+        truncated: Budget that cut the text short, if any
+        tag: Extract skills too
+
+    Returns:
+        Dictionary in the same format as process_resume
+    """
+    timings = start_trace()
+    result = _tag(text, filename, truncated, tag)
+    result["timings"] = timings
+    return result
+
+
+def tag_texts(texts: List[str]) -> Dict:
+    """
+    Clean and skill-tag a batch of resume texts in one nlp.pipe pass.
+
+    Runs inside a worker process, or in the server if the pool broke (see process_uploads).
+
+    Returns:
+        Dictionary with one skill list per text and timings
+    """
+    from app.skill_extractor import skill_extractor
+    from app.text_preprocessor import TextPreprocessor
+
+    timings = start_trace()
+    clean_texts = [TextPreprocessor.preprocess(text) for text in texts]
+    # Pool workers cannot start spaCy processes of their own
+    skills = skill_extractor.extract_many(clean_texts, n_process=1)
+    return {"skills": skills, "timings": timings}
+
+
+def _tag(text: str, filename: str, truncated: Optional[str], tag: bool = True) -> Dict:
+    """Check, clean and skill-tag extracted text (shared by process_resume and analyze_text)."""
+    from app.skill_extractor import skill_extractor
+    from app.text_preprocessor import TextPreprocessor
+
+    result = {"filename": filename, "text": "", "skills": [], "error": None, "truncated": truncated}
+
+    # Check if extraction was successful
+    if text.startswith("[Error") or text.startswith("[Warning"):
+        result["error"] = text
+        return result
+
+    if len(text.strip()) < 20:
+        result["error"] = f"[Warning: Too little text extracted from {filename}]"
+        return result
+
+    result["text"] = text
+    if not tag:
+        return result
+
+    # Preprocess text to clean encoding artifacts
+    clean_text = TextPreprocessor.preprocess(text)
+    logger.debug(f"Clean text ({filename}): {clean_text[:200]!r}")
+
+    result["skills"] = skill_extractor.extract(clean_text)
+    return result
+
+
+def create_pool(max_workers: int = 0) -> ProcessPoolExecutor:
+    """
+    Create an ingestion process pool.
+
+    Args:
+        max_workers: Number of worker processes (0 = one per CPU core)
+    """
+    workers = max_workers or os.cpu_count() or 1
+    # "spawn" keeps workers independent of the server's threads and loaded models
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return the shared ingestion pool, sized by config.INGEST_WORKERS."""
+    global _pool
+    if _pool is None:
+        _pool = create_pool(config.INGEST_WORKERS)
+    return _pool
+
+
+def _ping(_=None) -> int:
+    return os.getpid()
+
+
+def warm_pool():
+    """Start every worker of the shared pool (loading spaCy) before the first upload."""
+    pool = get_pool()
+    workers = config.INGEST_WORKERS or os.cpu_count() or 1
+    # Workers are spawned on demand; one pending task per worker starts them all
+    list(pool.map(_ping, range(workers)))
+
+
+def shutdown_pool():
+    """Stop the shared ingestion pool (called on app shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def _leading_parts(futures: List[asyncio.Future]) -> List[Dict]:
+    """
+    Collect extract_page_range results in page order until the text is complete.
+
+    Once a range was cut short or PDF_MAX_CHARS characters were read, later
+    pages cannot make it into the text (see join_pages), so the remaining
+    ranges are cancelled: queued ones never start, running ones are ignored.
+    """
+    parts = []
+    chars = 0
+    try:
+        for future in futures:
+            part = await future
+            record_trace(part["timings"])
+            parts.append(part)
+            chars += len(part["text"]) + 1
+            if part["truncated"] or part["text"].startswith("[Error") or (
+                    config.PDF_MAX_CHARS and chars >= config.PDF_MAX_CHARS):
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+    return parts
+
+
+async def iter_processed(uploads: List[Tuple[str, bytes]], tag: bool = True) -> AsyncIterator[Dict]:
+    """
+    Process uploads in parallel and yield each result as soon as it is ready.
+
+    Args:
+        uploads: List of (filename, content) pairs
+        tag: Extract skills per file (False leaves "skills" empty, for process_uploads)
+
+    Yields:
+        Result dictionaries from process_resume, in completion order, with the
+        position of their upload in `uploads` under "index" (filenames need not be unique)
+    """
+    if not uploads:
+        return
+
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+
+    async def extract(filename: str, content: bytes) -> Dict:
+        """Run one upload through the pool: cached text, split page ranges or a single task."""
+        key = pdf_text_cache.make_key(content)
+        cached = pdf_text_cache.get(key)
+        PDF_CACHE_LOOKUPS.inc(1, "hit" if cached else "miss")
+        if cached and not tag:
+            return {**_tag(cached[0], filename, cached[1], tag=False), "timings": {}}
+        if cached:
+            return await loop.run_in_executor(pool, analyze_text, cached[0], filename, cached[1])
+
+        page_count = 0
+        if config.PDF_PAGES_PER_TASK and len(content) >= config.PDF_SPLIT_MIN_BYTES and not size_error(content, filename):
+            # Only large files are worth counting pages for; this reads the page tree, not page content
+            page_count = await loop.run_in_executor(None, count_pages, content)
+
+        if page_count > config.PDF_PAGES_PER_TASK:
+            # pypdf is pure Python: spread the pages of a long document over the worker processes
+            deadline = budget_deadline()
+            pages = min(page_count, config.PDF_MAX_PAGES or page_count)
+            futures = [
+                loop.run_in_executor(pool, extract_page_range, content, filename, start, stop, deadline)
+                for start, stop in page_ranges(pages, config.PDF_PAGES_PER_TASK)
+            ]
+            parts = await _leading_parts(futures)
+            text, truncated = join_pages([(part["text"], part["truncated"]) for part in parts], filename)
+            result = await loop.run_in_executor(pool, analyze_text, text, filename, truncated, tag)
+        else:
+            result = await loop.run_in_executor(pool, process_resume, content, filename, tag)
+
+        if result["text"]:
+            pdf_text_cache.put(key, result["text"], result["truncated"])
+        return result
+
+    async def run_one(index: int, filename: str, content: bytes) -> Dict:
+        global _pool
+        try:
+            result = await extract(filename, content)
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM on a pathological PDF); start fresh next time
+            logger.error(f"Ingestion pool broke while processing {filename}: {e}")
+            if _pool is pool:
+                _pool = None
+            result = {"filename": filename, "text": "", "skills": [], "timings": {}, "truncated": None,
+                      "error": f"[Error extracting text from {filename}: worker crashed]"}
+
+        result["index"] = index
+        record_trace(result["timings"])
+        FILES.inc(1, "error" if result["error"] else "ok")
+        BYTES.inc(len(content))
+        return result
+
+    tasks = [run_one(index, filename, content) for index, (filename, content) in enumerate(uploads)]
+    for next_done in asyncio.as_completed(tasks):
+        yield await next_done
+
+
+async def process_uploads(uploads: List[Tuple[str, bytes]]) -> List[Dict]:
+    """
+    Process a whole upload batch: parse every file in parallel, then tag skills in batches.
+
+    spaCy is far faster over a batch (nlp.pipe) than one document at a time,
+    so instead of tagging each file in its own task, the parsed texts are
+    split into one batch per worker and tagged with tag_texts. If the pool
+    breaks while tagging, the batch is tagged in this process instead.
+
+    Args:
+        uploads: List of (filename, content) pairs
+
+    Returns:
+        Result dictionaries in the same format as iter_processed, in completion order
+    """
+    global _pool
+    results = [result async for result in iter_processed(uploads, tag=False)]
+    usable = [result for result in results if not result["error"]]
+    if not usable:
+        return results
+
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    workers = min(len(usable), config.INGEST_WORKERS or os.cpu_count() or 1)
+    batches = [usable[i::workers] for i in range(workers)]
+    try:
+        tagged = await asyncio.gather(*[
+            loop.run_in_executor(pool, tag_texts, [result["text"] for result in batch]) for batch in batches
+        ])
+    except BrokenProcessPool as e:
+        logger.error(f"Ingestion pool broke while tagging skills, tagging in the server process instead: {e}")
+        if _pool is pool:
+            _pool = None
+        # The texts are already parsed; only the tagging is lost, so redo it here (off the event loop)
+        batches = [usable]
+        tagged = [await loop.run_in_executor(None, tag_texts, [result["text"] for result in usable])]
+
+    for batch, output in zip(batches, tagged):
+        record_trace(output["timings"])
+        for result, skills in zip(batch, output["skills"]):
+            result["skills"] = skills
+    return results
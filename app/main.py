@@ -2,17 +2,22 @@
 THE SERVER. This file runs the website and connects the Frontend to the AI.
 """
 from fastapi import FastAPI, File, UploadFile, Form, Request, HTTPException
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from typing import Dict, List, Optional, Tuple
+import base64
+import binascii
+import bisect
+import json
 import os
 import logging
 import time
+import numpy as np
 from pathlib import Path
 import tempfile
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 
 # Robust Path Setup
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,48 +37,320 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 # Import logic
 from app.utils import (
     load_model,
-    extract_text_from_pdf,
-    calculate_similarity_scores,
+    score_resumes,
+    rank_scores,
     format_score,
+    format_scores,
     generate_embeddings,
 )
 from app.csv_loader import CSVResumeDatabase
+from app.sharded_database import ShardedResumeDatabase
+from app.talent_pool import TalentPool
 from app.text_preprocessor import TextPreprocessor
 from app.skill_extractor import skill_extractor
+from app.ingest import iter_processed, process_uploads, shutdown_pool, warm_pool
+from app import config, metrics
+from app.startup import StartupManager
 
 # Create uploads directory if it doesn't exist
 UPLOADS_DIR = BASE_DIR / "uploads"
 os.makedirs(UPLOADS_DIR, exist_ok=True)
 
+# Characters of resume text in compact (streamed) results
+SNIPPET_CHARS = 300
+
+# CSV search modes: the top_k best resumes, or every resume scoring at least the threshold
+SEARCH_MODES = ("top_k", "threshold")
+
 # Global instances
-csv_database: CSVResumeDatabase = None
+csv_database: CSVResumeDatabase = None  # a ShardedResumeDatabase with config.CSV_SHARDS
+talent_pool: TalentPool = None  # None when config.TALENT_POOL is off
+startup_manager = StartupManager()
 
 @app.on_event("startup")
 async def startup_event():
-    global csv_database
+    global csv_database, talent_pool
     
-    # Load Sentence-Transformer model
-    load_model()
+    # Load everything concurrently in the background; /readyz reports progress
+    csv_path = str(BASE_DIR / "Resume.csv")
+    if config.CSV_SHARDS:
+        csv_database = ShardedResumeDatabase(csv_path=csv_path, shard_dir=str(BASE_DIR / "resume_shards"))
+    else:
+        csv_database = CSVResumeDatabase(csv_path=csv_path)
+    startup_manager.register("model", load_model)
+    startup_manager.register("skill_extractor", skill_extractor.load)
+    startup_manager.register("ingest_workers", warm_pool, required=False)
+    startup_manager.register("csv_index", csv_database.build_index, required=False,
+                             progress=lambda: dict(csv_database.progress))
+    if config.TALENT_POOL:
+        talent_pool = TalentPool(index_path=str(BASE_DIR / "talent_pool.faiss"),
+                                 metadata_path=str(BASE_DIR / "talent_pool_metadata"))
+        startup_manager.register("talent_pool", talent_pool.build_index, required=False)
+    startup_manager.start()
     
-    # Initialize CSV database (non-blocking - build in background thread)
+    logger.info("🚀 Resume Ranker Pro is accepting requests (components warming up)")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    startup_manager.shutdown()
+    shutdown_pool()
+    if isinstance(csv_database, ShardedResumeDatabase):
+        csv_database.close()
+    if talent_pool is not None:
+        try:
+            talent_pool.close()
+        except Exception as e:
+            logger.error(f"Error storing queued uploads in the talent pool: {e}")
+
+def csv_database_ready() -> bool:
+    """True once the CSV database has a non-empty index loaded."""
+    return csv_database is not None and csv_database.ready
+
+def csv_status() -> str:
+    """CSV database state reported to clients: ready, index_loading, index_building or unavailable."""
+    if csv_database_ready():
+        return "ready"
+    if csv_database is not None and startup_manager.state("csv_index") in ("pending", "loading"):
+        return "index_building" if csv_database.progress["phase"] in ("building", "waiting") else "index_loading"
+    return "unavailable"
+
+def csv_shards_skipped(categories: Optional[List[str]] = None) -> List[str]:
+    """Shards a CSV search had to skip because their index is not loaded (always empty without sharding)."""
+    if isinstance(csv_database, ShardedResumeDatabase):
+        return csv_database.skipped_shards(categories)
+    return []
+
+def talent_pool_status() -> str:
+    """Talent pool state reported to clients: ready, empty, loading or disabled."""
+    if talent_pool is None:
+        return "disabled"
+    if talent_pool.index is None:
+        return "loading" if startup_manager.state("talent_pool") in ("pending", "loading") else "unavailable"
+    return "ready" if talent_pool.index.ntotal > 0 else "empty"
+
+def add_to_talent_pool(uploads: List[Tuple[bytes, Dict]]):
+    """Keep parsed uploads ((content, processed upload) pairs) in the talent pool, if it is loaded."""
+    if not uploads or talent_pool is None or talent_pool.index is None:
+        return
     try:
-        csv_path = str(BASE_DIR / "Resume.csv")
-        csv_database = CSVResumeDatabase(csv_path=csv_path)
-        # Check if index exists, if not build in background
-        if not os.path.exists(csv_database.index_path):
-            logger.info("CSV index not found. Building in background...")
-            loop = asyncio.get_event_loop()
-            executor = ThreadPoolExecutor(max_workers=1)
-            loop.run_in_executor(executor, csv_database.build_index)
-        else:
-            # Load existing index (fast)
-            csv_database.build_index()
-        logger.info("✅ CSV Database ready!")
+        counts = talent_pool.add(uploads)
+        logger.info(f"Talent pool: {counts['added']} resumes queued, {counts['unchanged']} already pooled")
     except Exception as e:
-        logger.warning(f"⚠️ CSV Database initialization failed: {e}")
-        csv_database = None
-    
-    logger.info("🚀 Resume Ranker Pro is ready!")
+        logger.error(f"Error adding uploads to the talent pool: {e}")
+
+def warming_up_response(component: str, status: str = "warming_up") -> JSONResponse:
+    """503 telling the client which component is not ready yet and how far along it is."""
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": "5"},
+        content={
+            "detail": f"{component} is not ready yet",
+            "status": status,
+            "component": startup_manager.components[component].to_dict() if component in startup_manager.components else None,
+        },
+    )
+
+def parse_skill_list(value: str) -> List[str]:
+    """Split a comma-separated form field into names (skills, categories)."""
+    return [skill.strip() for skill in value.split(",") if skill.strip()]
+
+def canonical_skill(skill: str) -> str:
+    """Case-folded canonical name of a skill, so synonyms compare equal ("k8s" == "Kubernetes")."""
+    return (skill_extractor.taxonomy.canonical(skill) or skill.strip()).lower()
+
+def matches_skills(skills: List[str], required_skills: List[str], optional_skills: List[str]) -> bool:
+    """Same filter semantics as CSVResumeDatabase.search, for uploaded resumes."""
+    have = {canonical_skill(skill) for skill in skills}
+    if any(canonical_skill(skill) not in have for skill in required_skills):
+        return False
+    return not optional_skills or any(canonical_skill(skill) in have for skill in optional_skills)
+
+def format_csv_results(csv_results: List[Dict], source: str = "csv") -> List[Dict]:
+    """Turn CSV (or talent pool, source="pool") search hits, already ranked and thresholded, into API results."""
+    database_results = []
+    for csv_result in csv_results:
+        try:
+            filename = csv_result.get("filename", "Unknown")
+            full_text = csv_result.get("full_text", "")
+
+            # Skills are precomputed at index time; older stores fall back to extraction
+            skills = csv_result.get("skills")
+            if skills is None:
+                clean_full_text = TextPreprocessor.preprocess(full_text) if full_text else ""
+                skills = skill_extractor.extract(clean_full_text) if clean_full_text else []
+
+            match_score = format_score(csv_result.get("score", 0.0))
+            database_results.append({
+                "rank": 0,  # Set from the position in the ranking
+                "filename": filename,
+                "source": source,
+                "candidate_name": filename.replace('.pdf', '') if source == "pool" else filename.replace('.csv', '').replace('resume_', ''),
+                "match_score": round(match_score, 1),
+                "skills": skills,
+                "resume_text": full_text,
+            })
+        except Exception as e:
+            logger.error(f"Error processing CSV result: {e}")
+            continue
+    return database_results
+
+def search_limits(search_mode: str, top_k: int, threshold: float) -> Tuple[int, Optional[float]]:
+    """
+    Ranking size and cosine cutoff of a CSV search.
+
+    Top-k mode ranks the top_k best resumes; threshold mode ranks every resume
+    scoring at least the threshold (see faiss_index.range_search). Both are
+    capped at config.CSV_MAX_RESULTS.
+    """
+    if search_mode == "threshold":
+        # format_score rounds to 0.01 points, so include scores that round up to the threshold
+        return config.CSV_MAX_RESULTS, max(0.0, threshold / 100 - 0.00005)
+    return min(top_k, config.CSV_MAX_RESULTS), None
+
+def csv_ranking(job_description: str, top_k: int, min_score: Optional[float], required: List[str], optional: List[str],
+                index_version: int, database: Optional[CSVResumeDatabase] = None,
+                categories: Optional[List[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (scores, rows) ranking of CSV resumes for a job description, from the query cache when possible.
+
+    On a miss the JD is embedded and ranked, and the ranking is cached under
+    `index_version` (read before the search), so any later build or update of
+    the index makes the entry unreachable. `database` selects another index
+    with the same interface (the talent pool); default: the CSV database.
+    `categories` restricts the search to resumes in those categories.
+    """
+    database = database or csv_database
+    query_cache = database.query_cache
+    key = query_cache.make_key(job_description, top_k, min_score, required, optional, index_version, categories)
+    ranking = query_cache.get(key)
+    if ranking is None:
+        jd_embeddings = generate_embeddings([job_description])
+        [ranking] = database.rank_batch(jd_embeddings, top_k, min_score=min_score,
+                                        required_skills=required, optional_skills=optional, categories=categories)
+        query_cache.put(key, ranking)
+    return ranking
+
+def csv_results_page(ranking: Tuple[np.ndarray, np.ndarray], threshold: float, offset: int = 0, page_size: int = 0,
+                     database: Optional[CSVResumeDatabase] = None) -> Tuple[List[Dict], int]:
+    """
+    Format one page of a CSV ranking; only the page's rows are read from the metadata store.
+
+    Args:
+        ranking: (scores, rows) from csv_ranking, best first
+        threshold: Minimum match score
+        offset: Qualified results to skip
+        page_size: Results per page (0 = all remaining)
+        database: Index the ranking came from (default: the CSV database)
+
+    Returns:
+        (ranked API results of the page, number of results above the threshold)
+    """
+    scores, rows = ranking
+    # Scores are sorted, so the qualified results are a prefix of the ranking
+    total = len(scores)
+    while total and format_score(float(scores[total - 1])) < threshold:
+        total -= 1
+    stop = min(total, offset + page_size) if page_size else total
+    database = database or csv_database
+    source = "pool" if isinstance(database, TalentPool) else "csv"
+    database_results = format_csv_results(database.fetch_results(scores[offset:stop], rows[offset:stop]), source)
+    for rank, result in enumerate(database_results, start=offset + 1):
+        result["rank"] = rank
+    return database_results, total
+
+def csv_database_page(job_description: str, threshold: float, search_mode: str, top_k: int, required: List[str],
+                      optional: List[str], index_version: int, offset: int = 0, page_size: int = 0,
+                      database: Optional[CSVResumeDatabase] = None,
+                      categories: Optional[List[str]] = None) -> Tuple[List[Dict], int]:
+    """Rank (or look up) a CSV (or talent pool) search and format one page of it; see csv_results_page."""
+    limit, min_score = search_limits(search_mode, top_k, threshold)
+    ranking = csv_ranking(job_description, limit, min_score, required, optional, index_version, database, categories)
+    return csv_results_page(ranking, threshold, offset, page_size, database)
+
+def encode_cursor(offset: int, index_version: int) -> str:
+    """Opaque pagination cursor: the next offset and the index version it is valid for."""
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset, "version": index_version}).encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """(offset, index_version) of a cursor; raises ValueError when it is malformed or its offset is negative."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        offset, index_version = int(data["offset"]), int(data["version"])
+    except (binascii.Error, KeyError, TypeError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset, index_version
+
+async def read_uploads(files: List[UploadFile]) -> List[Tuple[str, bytes]]:
+    """Read uploaded files into (filename, content) pairs, skipping unnamed and empty ones."""
+    uploads = []
+    for file in files:
+        if not file.filename:
+            continue
+        content = await file.read()
+        if len(content) == 0:
+            continue
+        uploads.append((file.filename, content))
+    return uploads
+
+def save_upload(filename: str, content: bytes) -> str:
+    """Save an uploaded file for /download and return its path."""
+    temp_path = os.path.join(str(UPLOADS_DIR), filename)
+    with open(temp_path, "wb") as f:
+        f.write(content)
+    return temp_path
+
+def format_upload_result(filename: str, text: str, score: float, skills: List[str], truncated: Optional[str]) -> Dict:
+    """Turn a scored upload into an API result (unranked)."""
+    # Basic safety check for very short resumes
+    warnings = []
+    if len(text.strip()) < 50:
+        warnings.append("Scanned/Empty PDF detected")
+    if truncated:
+        warnings.append(f"Only part of the PDF was read: {truncated}")
+
+    return {
+        "rank": 0,  # Will be re-ranked
+        "filename": filename,
+        "source": "pdf",
+        "candidate_name": filename.replace('.pdf', ''),
+        "match_score": round(format_score(score), 1),
+        "skills": skills,
+        "resume_text": text,
+        "warnings": warnings,
+    }
+
+def make_snippet(text: str, length: int = SNIPPET_CHARS) -> str:
+    """Start of a resume with whitespace collapsed, for compact results."""
+    snippet = " ".join(text[:length * 2].split())
+    return snippet[:length] + ("..." if len(snippet) > length or len(text) > length * 2 else "")
+
+def compact_result(result: Dict, include_text: bool) -> Dict:
+    """Result with a snippet in place of the full resume text (kept only when include_text is set)."""
+    compact = {key: value for key, value in result.items() if key != "resume_text"}
+    compact["snippet"] = make_snippet(result.get("resume_text", ""))
+    if include_text:
+        compact["resume_text"] = result.get("resume_text", "")
+    return compact
+
+def stream_event(event: str, data: Dict, sse: bool) -> str:
+    """Encode one streaming event as a server-sent event or an NDJSON line."""
+    if sse:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, **data}) + "\n"
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving HTTP."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: per-component load state and progress; 503 until required components are loaded."""
+    report = startup_manager.snapshot()
+    report["csv_status"] = csv_status()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -84,64 +361,79 @@ async def screen_resumes(
     job_description: str = Form(...),
     files: List[UploadFile] = File(default=[]),
     threshold: float = Form(70.0),
-    include_csv: bool = Form(True)
+    include_csv: bool = Form(True),
+    include_pool: bool = Form(False),
+    required_skills: str = Form(""),
+    optional_skills: str = Form(""),
+    include_timings: bool = Form(False),
+    top_k: int = Form(10),
+    search_mode: str = Form("top_k"),
+    page_size: int = Form(0),
+    offset: int = Form(0),
+    cursor: str = Form(""),
+    categories: str = Form("")
 ):
     start_time = time.time()
+    trace = metrics.start_trace()
+    metrics.REQUESTS.inc(1, "screen-resumes")
+    
+    # Comma-separated skill filters: all required skills, at least one optional skill
+    required = parse_skill_list(required_skills)
+    optional = parse_skill_list(optional_skills)
+    # Comma-separated CSV categories to search (empty = all)
+    category_filter = parse_skill_list(categories)
     
     if not job_description.strip():
         return JSONResponse(status_code=400, content={"detail": "Job description cannot be empty"})
+    if search_mode not in SEARCH_MODES:
+        return JSONResponse(status_code=400, content={"detail": "search_mode must be 'top_k' or 'threshold'"})
+    if top_k < 1 or page_size < 0 or offset < 0:
+        return JSONResponse(status_code=400, content={"detail": "top_k must be positive; page_size and offset cannot be negative"})
+    
+    # A cursor from a previous page overrides offset, and is only valid for the index version it was issued for
+    if cursor:
+        try:
+            offset, cursor_version = decode_cursor(cursor)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"detail": str(e)})
+        if csv_database_ready() and cursor_version != await run_in_threadpool(csv_database.refresh):
+            return JSONResponse(status_code=409, content={"detail": "The CSV index changed since this cursor was issued; start again from the first page"})
+    if not startup_manager.is_ready("model"):
+        return warming_up_response("model")
     
     uploaded_results = []
     database_results = []
+    database_total = 0
+    next_cursor = None
+    shards_skipped = []
+    pool_results = []
+    pool_total = 0
+    pooled_uploads = []
     temp_files = []
     
     try:
-        # 1. Generate JD embedding
-        jd_embedding = generate_embeddings([job_description])[0]
-        
-        # 2. PDF Processing (Optional)
+        # 1. PDF Processing (Optional)
         if files:
             pdf_resume_data = []
             
-            for file in files:
-                if not file.filename:
-                    continue
-                
+            uploads = await read_uploads(files)
+            
+            # Parse, clean and extract skills in the ingestion process pool (skills in batches)
+            for processed in await process_uploads(uploads):
                 try:
-                    # Read file content
-                    content = await file.read()
-                    
-                    if len(content) == 0:
-                        continue
-                    
-                    # Extract text from PDF
-                    text = extract_text_from_pdf(content, file.filename)
-                    print(f"DEBUG RAW TEXT ({file.filename}): {text[:200]!r}")
-                    
-                    # Check if extraction was successful
-                    if text.startswith("[Error") or text.startswith("[Warning"):
-                        continue
-                    
-                    if len(text.strip()) < 20:
+                    if processed["error"]:
                         continue
                     
                     # Save file temporarily for download
-                    temp_path = os.path.join(str(UPLOADS_DIR), file.filename)
-                    with open(temp_path, "wb") as f:
-                        f.write(content)
-                    temp_files.append(temp_path)
-                    
-                    # Preprocess text to clean encoding artifacts
-                    clean_text = TextPreprocessor.preprocess(text)
-                    print(f"DEBUG CLEAN TEXT ({file.filename}): {clean_text[:200]!r}")
-
-                    # Extract skills from cleaned text
-                    skills = skill_extractor.extract(clean_text)
+                    content = uploads[processed["index"]][1]
+                    temp_files.append(save_upload(processed["filename"], content))
+                    pooled_uploads.append((content, processed))
 
                     pdf_resume_data.append({
-                        "filename": file.filename,
-                        "text": text,
-                        "skills": skills,
+                        "filename": processed["filename"],
+                        "text": processed["text"],
+                        "skills": processed["skills"],
+                        "truncated": processed["truncated"],
                     })
                     
                 except Exception as e:
@@ -149,90 +441,80 @@ async def screen_resumes(
                     continue
             
             if pdf_resume_data:
-                # Calculate similarity scores for PDFs
-                resume_texts = [r["text"] for r in pdf_resume_data]
-                resume_filenames = [r["filename"] for r in pdf_resume_data]
-                
-                pdf_results = calculate_similarity_scores(
+                # Score every PDF with one encode call and one matrix product
+                scores = await run_in_threadpool(
+                    score_resumes,
                     job_description,
-                    resume_texts,
-                    resume_filenames
+                    [r["text"] for r in pdf_resume_data]
                 )
                 
-                for rank, (filename, text, score) in enumerate(pdf_results, start=1):
-                    match_score = format_score(score)
-
-                    # Retrieve precomputed skills for this filename
-                    pdf_data = next((r for r in pdf_resume_data if r["filename"] == filename), None)
-                    skills = pdf_data["skills"] if pdf_data else []
-
-                    # Basic safety check for very short resumes
-                    warnings = []
-                    if len(text.strip()) < 50:
-                        warnings.append("Scanned/Empty PDF detected")
-                    
-                    # Apply threshold filter
-                    if match_score >= threshold:
-                        uploaded_results.append({
-                            "rank": 0,  # Will be re-ranked
-                            "filename": filename,
-                            "source": "pdf",
-                            "candidate_name": filename.replace('.pdf', ''),
-                            "match_score": round(match_score, 1),
-                            "skills": skills,
-                            "resume_text": text,
-                            "warnings": warnings,
-                        })
+                # Apply threshold and skill filters as a mask; results are looked up by position, not filename
+                qualified = format_scores(scores) >= threshold
+                qualified &= np.array([matches_skills(r["skills"], required, optional) for r in pdf_resume_data], dtype=bool)
+                for i in rank_scores(scores, mask=qualified):
+                    pdf_data = pdf_resume_data[i]
+                    uploaded_results.append(format_upload_result(
+                        pdf_data["filename"], pdf_data["text"], float(scores[i]), pdf_data["skills"], pdf_data["truncated"]
+                    ))
         
-        # 3. CSV Search (if enabled and database is ready)
-        if include_csv and csv_database and csv_database.index is not None and csv_database.index.ntotal > 0:
+        # 2. CSV Search (if enabled and database is ready; repeated queries and later pages come from the query cache)
+        database_status = csv_status() if include_csv else "disabled"
+        if database_status == "ready":
             try:
-                csv_results = csv_database.search(jd_embedding, top_k=10)
-                
-                for csv_result in csv_results:
-                    try:
-                        full_text = csv_result.get("full_text", "")
-                        clean_full_text = TextPreprocessor.preprocess(full_text) if full_text else ""
-
-                        # Extract skills from cleaned CSV text
-                        skills = skill_extractor.extract(clean_full_text) if clean_full_text else []
-
-                        match_score = format_score(csv_result.get("score", 0.0))
-
-                        # Apply threshold filter
-                        if match_score >= threshold:
-                            database_results.append({
-                                "rank": 0,  # Will be re-ranked
-                                "filename": csv_result.get("filename", "Unknown"),
-                                "source": "csv",
-                                "candidate_name": csv_result.get("filename", "Unknown").replace('.csv', '').replace('resume_', ''),
-                                "match_score": round(match_score, 1),
-                                "skills": skills,
-                                "resume_text": full_text,
-                            })
-                    except Exception as e:
-                        logger.error(f"Error processing CSV result: {e}")
-                        continue
+                index_version = await run_in_threadpool(csv_database.refresh)
+                database_results, database_total = await run_in_threadpool(
+                    csv_database_page, job_description, threshold, search_mode, top_k, required, optional,
+                    index_version, offset, page_size, categories=category_filter
+                )
+                if page_size and offset + page_size < database_total:
+                    next_cursor = encode_cursor(offset + page_size, index_version)
+                shards_skipped = csv_shards_skipped(category_filter)
             except Exception as e:
                 logger.error(f"Error searching CSV database: {e}")
         
-        # 4. Rank & Return (separate ranking for each source)
-        uploaded_results.sort(key=lambda x: x["match_score"], reverse=True)
-        for rank, result in enumerate(uploaded_results, start=1):
-            result["rank"] = rank
+        # 3. Talent pool search (uploads from earlier requests; no parsing or encoding besides the JD)
+        pool_status = talent_pool_status() if include_pool else "disabled"
+        if pool_status == "ready":
+            try:
+                pool_results, pool_total = await run_in_threadpool(
+                    csv_database_page, job_description, threshold, search_mode, top_k, required, optional,
+                    await run_in_threadpool(talent_pool.refresh), database=talent_pool
+                )
+            except Exception as e:
+                logger.error(f"Error searching the talent pool: {e}")
+        
+        # Keep this request's uploads for later searches (after searching, so they are not listed twice)
+        await run_in_threadpool(add_to_talent_pool, pooled_uploads)
         
-        database_results.sort(key=lambda x: x["match_score"], reverse=True)
-        for rank, result in enumerate(database_results, start=1):
+        # 4. Rank & Return (separate ranking for each source; uploads are already in score order)
+        for rank, result in enumerate(uploaded_results, start=1):
             result["rank"] = rank
 
         response_payload = {
-            "total_processed": len(uploaded_results) + len(database_results),
-            "total_qualified": len(uploaded_results) + len(database_results),
+            "total_processed": len(uploaded_results) + len(database_results) + len(pool_results),
+            "total_qualified": len(uploaded_results) + len(database_results) + len(pool_results),
             "processing_time_ms": round((time.time() - start_time) * 1000, 1),
             "uploaded_results": uploaded_results,
             "database_results": database_results,
+            # Qualified CSV matches across all pages, and the cursor of the next page (None on the last one)
+            "database_total": database_total,
+            "next_cursor": next_cursor,
+            # Tells the client why database_results may be empty (e.g. "index_building")
+            "database_status": database_status,
+            # True when shards that could hold matches were not searched (listed in shards_skipped)
+            "database_partial": bool(shards_skipped),
+            "shards_skipped": shards_skipped,
+            "pool_results": pool_results,
+            "pool_total": pool_total,
+            "pool_status": pool_status,
         }
-        print("DEBUG FINAL RESPONSE:", response_payload)
+        if database_status in ("index_loading", "index_building"):
+            response_payload["database_progress"] = dict(csv_database.progress)
+        startup_manager.mark_request()
+        if include_timings:
+            response_payload["timings_ms"] = metrics.timings_ms(trace)
+        logger.debug(f"Screening response: {len(uploaded_results)} uploads, {len(database_results)} of "
+                     f"{database_total} CSV matches, {len(pool_results)} pool matches")
 
         return JSONResponse(response_payload)
     
@@ -248,6 +530,252 @@ async def screen_resumes(
         logger.error(f"Error in screen_resumes: {e}")
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
+@app.post("/api/screen-resumes/stream")
+async def screen_resumes_stream(
+    job_description: str = Form(...),
+    files: List[UploadFile] = File(default=[]),
+    threshold: float = Form(70.0),
+    include_csv: bool = Form(True),
+    include_pool: bool = Form(False),
+    required_skills: str = Form(""),
+    optional_skills: str = Form(""),
+    include_text: bool = Form(False),
+    include_timings: bool = Form(False),
+    format: str = Form("ndjson"),
+    top_k: int = Form(10),
+    search_mode: str = Form("top_k"),
+    categories: str = Form("")
+):
+    """
+    Streaming variant of /api/screen-resumes for large upload batches.
+
+    Results are sent as soon as they are known instead of in one body at the
+    end, as NDJSON lines (format=ndjson) or server-sent events (format=sse):
+
+        started    number of uploads, the CSV database and talent pool status
+        database   CSV database matches (sent first; they need no parsing)
+        pool       talent pool matches (include_pool=true only)
+        result     an upload that passed the threshold and skill filters,
+                   with its rank among the uploads scored so far
+        progress   an upload that was unreadable or filtered out
+        done       final upload ranking (filename and score), totals, timings
+        error      processing failed; the stream ends
+
+    Results carry score, skills and a snippet; the full resume text is only
+    included with include_text=true.
+    """
+    if format not in ("ndjson", "sse"):
+        return JSONResponse(status_code=400, content={"detail": "format must be 'ndjson' or 'sse'"})
+    if search_mode not in SEARCH_MODES:
+        return JSONResponse(status_code=400, content={"detail": "search_mode must be 'top_k' or 'threshold'"})
+    if top_k < 1:
+        return JSONResponse(status_code=400, content={"detail": "top_k must be positive"})
+    if not job_description.strip():
+        return JSONResponse(status_code=400, content={"detail": "Job description cannot be empty"})
+    if not startup_manager.is_ready("model"):
+        return warming_up_response("model")
+    
+    metrics.REQUESTS.inc(1, "screen-resumes-stream")
+    required = parse_skill_list(required_skills)
+    optional = parse_skill_list(optional_skills)
+    category_filter = parse_skill_list(categories)
+    sse = format == "sse"
+    
+    # Read uploads before streaming starts; the request body is gone once the response begins
+    uploads = await read_uploads(files)
+    
+    async def events():
+        start_time = time.time()
+        trace = metrics.start_trace()
+        database_status = csv_status() if include_csv else "disabled"
+        pool_status = talent_pool_status() if include_pool else "disabled"
+        yield stream_event("started", {"total_files": len(uploads), "database_status": database_status,
+                                       "pool_status": pool_status}, sse)
+        
+        try:
+            database_results = []
+            database_total = 0
+            shards_skipped = []
+            if database_status == "ready":
+                database_results, database_total = await run_in_threadpool(
+                    csv_database_page, job_description, threshold, search_mode, top_k, required, optional,
+                    await run_in_threadpool(csv_database.refresh), categories=category_filter
+                )
+                shards_skipped = csv_shards_skipped(category_filter)
+            yield stream_event("database", {
+                "database_status": database_status,
+                "database_total": database_total,
+                "database_partial": bool(shards_skipped),
+                "shards_skipped": shards_skipped,
+                "database_results": [compact_result(r, include_text) for r in database_results],
+            }, sse)
+            
+            # Talent pool before the uploads, so this request's files are not matched against themselves
+            pool_results = []
+            pool_total = 0
+            if pool_status == "ready":
+                try:
+                    pool_results, pool_total = await run_in_threadpool(
+                        csv_database_page, job_description, threshold, search_mode, top_k, required, optional,
+                        await run_in_threadpool(talent_pool.refresh), database=talent_pool
+                    )
+                except Exception as e:
+                    logger.error(f"Error searching the talent pool: {e}")
+            if include_pool:
+                yield stream_event("pool", {
+                    "pool_status": pool_status,
+                    "pool_total": pool_total,
+                    "pool_results": [compact_result(r, include_text) for r in pool_results],
+                }, sse)
+            
+            # Score each upload as soon as it is parsed; the JD is embedded once, then an embedding cache hit
+            ranked_scores: List[float] = []  # negated scores of qualified uploads, sorted
+            uploaded_results = []
+            pooled_uploads = []
+            processed_count = 0
+            async for processed in iter_processed(uploads):
+                processed_count += 1
+                progress = {"processed": processed_count, "total": len(uploads), "filename": processed["filename"]}
+                if processed["error"]:
+                    yield stream_event("progress", {**progress, "status": "error", "detail": processed["error"]}, sse)
+                    continue
+                
+                content = uploads[processed["index"]][1]
+                save_upload(processed["filename"], content)
+                pooled_uploads.append((content, processed))
+                [score] = await run_in_threadpool(score_resumes, job_description, [processed["text"]])
+                score = float(score)
+                if format_score(score) < threshold or not matches_skills(processed["skills"], required, optional):
+                    yield stream_event("progress", {**progress, "status": "filtered"}, sse)
+                    continue
+                
+                result = format_upload_result(processed["filename"], processed["text"], score,
+                                              processed["skills"], processed["truncated"])
+                position = bisect.bisect_right(ranked_scores, -result["match_score"])
+                ranked_scores.insert(position, -result["match_score"])
+                result["rank"] = position + 1
+                uploaded_results.append(result)
+                yield stream_event("result", {**progress, "status": "qualified",
+                                              "result": compact_result(result, include_text)}, sse)
+            
+            await run_in_threadpool(add_to_talent_pool, pooled_uploads)
+            
+            uploaded_results.sort(key=lambda x: x["match_score"], reverse=True)
+            done = {
+                "total_processed": len(uploaded_results) + len(database_results) + len(pool_results),
+                "total_qualified": len(uploaded_results) + len(database_results) + len(pool_results),
+                "processing_time_ms": round((time.time() - start_time) * 1000, 1),
+                "ranking": [
+                    {"rank": rank, "filename": r["filename"], "match_score": r["match_score"]}
+                    for rank, r in enumerate(uploaded_results, start=1)
+                ],
+                "database_status": database_status,
+                "pool_status": pool_status,
+            }
+            if include_timings:
+                done["timings_ms"] = metrics.timings_ms(trace)
+            startup_manager.mark_request()
+            yield stream_event("done", done, sse)
+        except Exception as e:
+            logger.error(f"Error in screen_resumes_stream: {e}")
+            yield stream_event("error", {"detail": str(e)}, sse)
+    
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    # No proxy buffering, so events reach the client as they are produced
+    return StreamingResponse(events(), media_type=media_type,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+class BatchScreenRequest(BaseModel):
+    job_descriptions: List[str]
+    top_k: int = 10
+    threshold: float = 70.0
+    search_mode: str = "top_k"
+    required_skills: List[str] = []
+    optional_skills: List[str] = []
+    categories: List[str] = []
+    include_timings: bool = False
+
+@app.post("/api/screen-batch")
+def screen_batch(request: BatchScreenRequest):
+    """
+    Score many job descriptions against the CSV database in one call.
+
+    All JDs are encoded in a single generate_embeddings call and searched with
+    one multi-query FAISS search. JDs found in the query cache skip both and
+    only the misses are encoded and searched. Runs in FastAPI's threadpool,
+    so the blocking encode/search does not stall the event loop.
+    """
+    start_time = time.time()
+    trace = metrics.start_trace()
+    metrics.REQUESTS.inc(1, "screen-batch")
+    
+    job_descriptions = [jd for jd in request.job_descriptions if jd.strip()]
+    if not job_descriptions:
+        return JSONResponse(status_code=400, content={"detail": "At least one non-empty job description is required"})
+    if request.search_mode not in SEARCH_MODES:
+        return JSONResponse(status_code=400, content={"detail": "search_mode must be 'top_k' or 'threshold'"})
+    if request.top_k < 1:
+        return JSONResponse(status_code=400, content={"detail": "top_k must be positive"})
+    if not startup_manager.is_ready("model"):
+        return warming_up_response("model")
+    database_status = csv_status()
+    if database_status != "ready":
+        if database_status == "unavailable":
+            return JSONResponse(status_code=503, content={"detail": "CSV database is not available", "status": database_status})
+        return warming_up_response("csv_index", database_status)
+    
+    try:
+        query_cache = csv_database.query_cache
+        index_version = csv_database.refresh()
+        limit, min_score = search_limits(request.search_mode, request.top_k, request.threshold)
+        keys = [query_cache.make_key(jd, limit, min_score, request.required_skills, request.optional_skills, index_version,
+                                     request.categories)
+                for jd in job_descriptions]
+        rankings = [query_cache.get(key) for key in keys]
+        
+        # Encode and search only the JDs missing from the cache, in one batch
+        missing = [job_index for job_index, ranking in enumerate(rankings) if ranking is None]
+        if missing:
+            jd_embeddings = generate_embeddings([job_descriptions[job_index] for job_index in missing])
+            missed_rankings = csv_database.rank_batch(jd_embeddings, limit, min_score=min_score,
+                                                      required_skills=request.required_skills,
+                                                      optional_skills=request.optional_skills,
+                                                      categories=request.categories)
+            for job_index, ranking in zip(missing, missed_rankings):
+                rankings[job_index] = ranking
+                query_cache.put(keys[job_index], ranking)
+        
+        results = []
+        for job_index, ranking in enumerate(rankings):
+            database_results, database_total = csv_results_page(ranking, request.threshold)
+            results.append({
+                "job_index": job_index,
+                "job_description": job_descriptions[job_index][:200],
+                "database_results": database_results,
+                "database_total": database_total,
+            })
+        
+        shards_skipped = csv_shards_skipped(request.categories)
+        response_payload = {
+            "total_jobs": len(job_descriptions),
+            "processing_time_ms": round((time.time() - start_time) * 1000, 1),
+            "results": results,
+            "database_partial": bool(shards_skipped),
+            "shards_skipped": shards_skipped,
+        }
+        if request.include_timings:
+            response_payload["timings_ms"] = metrics.timings_ms(trace)
+        startup_manager.mark_request()
+        return JSONResponse(response_payload)
+    except Exception as e:
+        logger.error(f"Error in screen_batch: {e}")
+        return JSONResponse(status_code=500, content={"detail": str(e)})
+
+@app.get("/metrics")
+async def get_metrics():
+    """Stage latency histograms and pipeline counters in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/download/{filename}")
 async def download_resume(filename: str):
     """Download a resume file."""
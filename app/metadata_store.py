@@ -0,0 +1,354 @@
+"""
+Compact, memory-mapped metadata store for the CSV resume index.
+
+A store is a directory of flat column files:
+
+    header.json      row count and column widths
+    ids.bin          fixed-width, NUL-padded UTF-8 resume IDs (at most id_width bytes)
+    categories.bin   fixed-width, NUL-padded UTF-8 categories (at most category_width bytes)
+    hashes.bin       hex content hash of each row (detects changed CSV rows)
+    skills.bin       bitset of extracted skills per row (vocabulary in header)
+    offsets.bin      int64 end offset of each row's text in text.bin
+    text.bin         concatenated UTF-8 resume texts
+    deleted.bin      int64 row numbers removed by updates/deletes
+
+The header also records the index label stride: each row owns FAISS labels
+row * label_stride ... row * label_stride + label_stride - 1, one per text
+chunk (stride 1 when whole resumes are embedded as one vector).
+
+IDs and categories longer than their column are rejected rather than
+truncated, since a truncated ID no longer identifies its row.
+
+Files are memory-mapped when the store is opened, so opening is O(1) and only
+the rows a search actually returns are decoded into Python objects. Rows are
+never rewritten: an update appends a new row and marks the old one deleted.
+"""
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+HEADER_FILE = "header.json"
+IDS_FILE = "ids.bin"
+CATEGORIES_FILE = "categories.bin"
+HASHES_FILE = "hashes.bin"
+SKILLS_FILE = "skills.bin"
+DELETED_FILE = "deleted.bin"
+OFFSETS_FILE = "offsets.bin"
+TEXT_FILE = "text.bin"
+
+DEFAULT_ID_WIDTH = 32
+DEFAULT_CATEGORY_WIDTH = 64
+HASH_WIDTH = 32
+PREVIEW_CHARS = 500
+STORE_VERSION = 3
+
+
+def content_hash(record: Dict) -> str:
+    """Hash of the fields that affect a row's embedding and metadata."""
+    payload = f"{record.get('category', 'Unknown')}\x00{record.get('full_text', '')}"
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=HASH_WIDTH // 2).hexdigest()
+
+
+def _fixed_width(value: str, width: int, column: str) -> bytes:
+    """
+    Encode a string for a fixed-width column.
+
+    Raises:
+        ValueError: If the UTF-8 encoding is longer than `width` bytes. Truncating
+            would make distinct IDs collide (upsert/delete would hit the wrong
+            row) and never match the CSV value again (sync would re-add it).
+    """
+    encoded = str(value).encode("utf-8")
+    if len(encoded) > width:
+        raise ValueError(f"{column} {value!r} is {len(encoded)} bytes long; the store holds at most {width}")
+    return encoded
+
+
+def _map(path: str, dtype, count: int, width: Optional[int] = None) -> np.ndarray:
+    """Memory-map `count` items (or `count` rows of `width` items) of a column file."""
+    shape = (count,) if width is None else (count, width)
+    if count == 0 or width == 0:
+        # np.memmap rejects empty files
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+def _skill_bytes(vocabulary: List[str]) -> int:
+    return (len(vocabulary) + 7) // 8
+
+
+class MetadataStore:
+    """Read-only, memory-mapped view over a metadata store directory."""
+
+    def __init__(self, path: str):
+        """
+        Open an existing store.
+
+        Args:
+            path: Store directory written by MetadataWriter
+        """
+        self.path = path
+        with open(os.path.join(path, HEADER_FILE)) as f:
+            self.header = json.load(f)
+
+        count = self.header["count"]
+        self.ids = _map(os.path.join(path, IDS_FILE), f"S{self.header['id_width']}", count)
+        self.categories = _map(os.path.join(path, CATEGORIES_FILE), f"S{self.header['category_width']}", count)
+        # Older stores lack the hash/skills columns (CSVResumeDatabase upgrades them on load)
+        self.version = self.header.get("version", 1)
+        self.hashes = _map(os.path.join(path, HASHES_FILE), f"S{HASH_WIDTH}", count) if self.version >= 2 else None
+        self.skills_vocabulary: List[str] = self.header.get("skills", [])
+        self.label_stride: int = self.header.get("label_stride", 1)
+        self.skill_bits = _map(os.path.join(path, SKILLS_FILE), np.uint8, count if self.version >= 3 else 0,
+                               _skill_bytes(self.skills_vocabulary))
+        self.offsets = _map(os.path.join(path, OFFSETS_FILE), np.int64, count)
+        self.text_blob = _map(os.path.join(path, TEXT_FILE), np.uint8, int(self.offsets[-1]) if count else 0)
+        self.deleted = _map(os.path.join(path, DELETED_FILE), np.int64, self.header.get("deleted", 0))
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, HEADER_FILE))
+
+    def __len__(self) -> int:
+        """Number of rows, including deleted ones (row numbers are stable)."""
+        return self.header["count"]
+
+    @property
+    def live_count(self) -> int:
+        return len(self) - len(self.deleted)
+
+    def live_mask(self) -> np.ndarray:
+        """Boolean array, True for rows that have not been deleted."""
+        mask = np.ones(len(self), dtype=bool)
+        mask[self.deleted] = False
+        return mask
+
+    def id_rows(self) -> Dict[str, int]:
+        """Map each live resume ID to its row (decodes every ID; used by mutations)."""
+        mask = self.live_mask()
+        return {
+            resume_id.decode("utf-8", errors="ignore"): row
+            for row, resume_id in enumerate(self.ids)
+            if mask[row]
+        }
+
+    def get_id(self, row: int) -> str:
+        return self.ids[row].decode("utf-8", errors="ignore")
+
+    def get_category(self, row: int) -> str:
+        return self.categories[row].decode("utf-8", errors="ignore")
+
+    def get_hash(self, row: int) -> str:
+        return self.hashes[row].decode("ascii")
+
+    def get_skills(self, row: int) -> List[str]:
+        """Decode the precomputed skills of one row (sorted, like SkillExtractor.extract)."""
+        bits = np.unpackbits(self.skill_bits[row])[:len(self.skills_vocabulary)]
+        return [self.skills_vocabulary[i] for i in np.flatnonzero(bits)]
+
+    def get_text(self, row: int) -> str:
+        start = int(self.offsets[row - 1]) if row > 0 else 0
+        end = int(self.offsets[row])
+        return self.text_blob[start:end].tobytes().decode("utf-8", errors="ignore")
+
+    def __getitem__(self, row: int) -> Dict:
+        """Materialize one row in the same shape as the legacy metadata dicts."""
+        if row < 0 or row >= len(self):
+            raise IndexError(row)
+        resume_id = self.get_id(row)
+        full_text = self.get_text(row)
+        return {
+            "id": resume_id,
+            "filename": f"resume_{resume_id}.csv",
+            "category": self.get_category(row),
+            "text": full_text[:PREVIEW_CHARS] + "..." if len(full_text) > PREVIEW_CHARS else full_text,  # Preview
+            "full_text": full_text,
+            "skills": self.get_skills(row) if self.version >= 3 else None,
+        }
+
+
+class MetadataWriter:
+    """Append-only writer for a metadata store, with truncation for checkpoint resume."""
+
+    def __init__(self, path: str, resume_rows: int = 0, skills_vocabulary: Optional[List[str]] = None,
+                 id_width: int = DEFAULT_ID_WIDTH, category_width: int = DEFAULT_CATEGORY_WIDTH,
+                 label_stride: int = 1):
+        """
+        Open a store for writing.
+
+        Args:
+            path: Store directory (created if missing)
+            resume_rows: Keep this many existing rows and append after them
+                (0 starts a fresh store). Pass len(store) to append to a live store.
+            skills_vocabulary: Skill names for the skills bitset of a fresh store
+                (an existing store keeps the vocabulary in its header)
+            id_width: Bytes per ID
+            category_width: Bytes per category
+            label_stride: FAISS labels per row of a fresh store (see module docstring)
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        header = {}
+        if resume_rows and os.path.exists(os.path.join(path, HEADER_FILE)):
+            with open(os.path.join(path, HEADER_FILE)) as f:
+                header = json.load(f)
+            id_width, category_width = header["id_width"], header["category_width"]
+            skills_vocabulary = header.get("skills", [])
+            label_stride = header.get("label_stride", 1)
+        else:
+            resume_rows = 0
+
+        self.id_width = id_width
+        self.category_width = category_width
+        self.label_stride = label_stride
+        self.count = resume_rows
+        self.deleted_count = header.get("deleted", 0) if resume_rows else 0
+        self.skills_vocabulary = list(skills_vocabulary or [])
+        self._skill_positions = {skill: i for i, skill in enumerate(self.skills_vocabulary)}
+        self._skill_width = _skill_bytes(self.skills_vocabulary)
+
+        mode = "r+b" if resume_rows else "wb"
+        self._ids = open(os.path.join(path, IDS_FILE), mode)
+        self._categories = open(os.path.join(path, CATEGORIES_FILE), mode)
+        self._hashes = open(os.path.join(path, HASHES_FILE), mode)
+        self._skills = open(os.path.join(path, SKILLS_FILE), mode)
+        self._offsets = open(os.path.join(path, OFFSETS_FILE), mode)
+        self._text = open(os.path.join(path, TEXT_FILE), mode)
+        self._deleted = open(os.path.join(path, DELETED_FILE), mode)
+
+        # Drop anything written after the checkpoint
+        text_end = 0
+        if resume_rows:
+            self._offsets.seek((resume_rows - 1) * 8)
+            text_end = int(np.frombuffer(self._offsets.read(8), dtype=np.int64)[0])
+        for handle, size in ((self._ids, resume_rows * id_width),
+                             (self._categories, resume_rows * category_width),
+                             (self._hashes, resume_rows * HASH_WIDTH),
+                             (self._skills, resume_rows * self._skill_width),
+                             (self._offsets, resume_rows * 8),
+                             (self._text, text_end),
+                             (self._deleted, self.deleted_count * 8)):
+            handle.truncate(size)
+            handle.seek(size)
+        self._text_end = text_end
+
+    def append(self, records: Iterable[Dict]):
+        """
+        Append rows given as dicts with id, category, full_text and skills keys.
+
+        Raises:
+            ValueError: If an ID or category does not fit its column width; no
+                row of the batch is written then.
+        """
+        ids = []
+        categories = []
+        hashes = []
+        skill_rows = []
+        offsets = []
+        texts = []
+        text_end = self._text_end
+        for record in records:
+            ids.append(_fixed_width(record.get("id", ""), self.id_width, "ID"))
+            categories.append(_fixed_width(record.get("category", "Unknown"), self.category_width, "Category"))
+            encoded = str(record.get("full_text", "")).encode("utf-8")
+            text_end += len(encoded)
+            hashes.append(content_hash(record).encode("ascii"))
+            skill_rows.append([self._skill_positions[s] for s in record.get("skills", ())
+                               if s in self._skill_positions])
+            offsets.append(text_end)
+            texts.append(encoded)
+
+        if not offsets:
+            return
+        self._text_end = text_end
+        self._ids.write(np.array(ids, dtype=f"S{self.id_width}").tobytes())
+        self._categories.write(np.array(categories, dtype=f"S{self.category_width}").tobytes())
+        self._hashes.write(np.array(hashes, dtype=f"S{HASH_WIDTH}").tobytes())
+        if self._skill_width:
+            bits = np.zeros((len(skill_rows), len(self.skills_vocabulary)), dtype=bool)
+            for i, positions in enumerate(skill_rows):
+                bits[i, positions] = True
+            self._skills.write(np.packbits(bits, axis=1).tobytes())
+        self._offsets.write(np.array(offsets, dtype=np.int64).tobytes())
+        self._text.write(b"".join(texts))
+        self.count += len(offsets)
+
+    def validate(self, record: Dict):
+        """
+        Check that a record's ID and category fit their columns.
+
+        Raises:
+            ValueError: If either is too long (see append)
+        """
+        _fixed_width(record.get("id", ""), self.id_width, "ID")
+        _fixed_width(record.get("category", "Unknown"), self.category_width, "Category")
+
+    def mark_deleted(self, rows: Iterable[int]):
+        """Record rows as deleted; they stay on disk until the next full rebuild."""
+        rows = np.asarray(list(rows), dtype=np.int64)
+        self._deleted.write(rows.tobytes())
+        self.deleted_count += len(rows)
+
+    def flush(self) -> int:
+        """Flush all columns to disk, update the header and return the row count."""
+        for handle in self._handles():
+            handle.flush()
+            os.fsync(handle.fileno())
+        header = {
+            "version": STORE_VERSION,
+            "count": self.count,
+            "deleted": self.deleted_count,
+            "id_width": self.id_width,
+            "category_width": self.category_width,
+            "skills": self.skills_vocabulary,
+            "label_stride": self.label_stride,
+        }
+        header_path = os.path.join(self.path, HEADER_FILE)
+        with open(header_path + ".tmp", "w") as f:
+            json.dump(header, f)
+        os.replace(header_path + ".tmp", header_path)
+        return self.count
+
+    def close(self) -> int:
+        count = self.flush()
+        for handle in self._handles():
+            handle.close()
+        return count
+
+    def discard(self):
+        """Close without updating the header, so rows appended since the last flush stay unpublished."""
+        for handle in self._handles():
+            handle.close()
+
+    def _handles(self):
+        return (self._ids, self._categories, self._hashes, self._skills, self._offsets, self._text, self._deleted)
+
+
+def write_store(path: str, records: Iterable[Dict], skills_vocabulary: Optional[List[str]] = None,
+                batch_size: int = 1000, label_stride: int = 1):
+    """Write a complete store from an iterable of records (used for migrations)."""
+    writer = MetadataWriter(path, skills_vocabulary=skills_vocabulary, label_stride=label_stride)
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            writer.append(batch)
+            batch = []
+    writer.append(batch)
+    writer.close()
+
+
+def replace_store(src: str, dst: str):
+    """Publish a finished store directory at `dst`, replacing any previous store."""
+    if os.path.exists(dst):
+        old = dst + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(dst, old)
+        os.replace(src, dst)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(src, dst)
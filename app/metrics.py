@@ -0,0 +1,145 @@
+"""
+Stage-level latency histograms and counters, exported in the Prometheus text
+format on /metrics.
+
+Pipeline functions are wrapped with @timed("<stage>"). Each call is observed
+in the resume_stage_duration_seconds histogram and, when a request trace is
+active (see start_trace), added to that request's timing breakdown.
+
+Ingestion runs in worker processes, whose metrics would never be scraped, so
+process_resume returns its trace with the result and the server records it
+with record_trace().
+"""
+import contextvars
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Upper bounds in seconds, from sub-millisecond FAISS searches to long PDF parses
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Per-request stage totals {stage: seconds}; None outside a traced request
+_trace: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("trace", default=None)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}")
+        return "\n".join(lines)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> (per-bucket counts incl. +Inf, sum)
+        self._values: Dict[Tuple[str, ...], Tuple[list, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            counts, total = self._values.get(labels) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[bisect_left(self.buckets, value)] += 1
+            self._values[labels] = (counts, total + value)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total:g}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return "\n".join(lines)
+
+
+STAGE_SECONDS = Histogram("resume_stage_duration_seconds", "Time spent in each pipeline stage.", ["stage"])
+FILES = Counter("resume_files_total", "Uploaded resume files processed, by outcome.", ["status"])
+BYTES = Counter("resume_file_bytes_total", "Bytes of uploaded resume files processed.")
+TOKENS = Counter("resume_embedding_tokens_total", "Whitespace-separated tokens in texts sent to the encoder.")
+CACHE_LOOKUPS = Counter("resume_embedding_cache_lookups_total", "Embedding cache lookups, by result.", ["result"])
+PDF_CACHE_LOOKUPS = Counter("resume_pdf_text_cache_lookups_total", "PDF text cache lookups, by result.", ["result"])
+QUERY_CACHE_LOOKUPS = Counter("resume_query_cache_lookups_total", "CSV screening query cache lookups, by result.", ["result"])
+REQUESTS = Counter("resume_requests_total", "Screening requests, by endpoint.", ["endpoint"])
+EMBED_BATCH_SIZES = Histogram("resume_embedding_batch_size", "Texts per micro-batch encoded by the embedding scheduler.",
+                              buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+
+REGISTRY = [STAGE_SECONDS, FILES, BYTES, TOKENS, CACHE_LOOKUPS, PDF_CACHE_LOOKUPS, QUERY_CACHE_LOOKUPS, REQUESTS, EMBED_BATCH_SIZES]
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record one stage duration in the histogram and the active request trace."""
+    STAGE_SECONDS.observe(seconds, stage)
+    trace = _trace.get()
+    if trace is not None:
+        trace[stage] = trace.get(stage, 0.0) + seconds
+
+
+def timed(stage: str) -> Callable:
+    """Decorator that records every call of the wrapped function as `stage`."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe_stage(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def start_trace() -> Dict[str, float]:
+    """Start collecting stage timings for the current request (or worker task)."""
+    trace: Dict[str, float] = {}
+    _trace.set(trace)
+    return trace
+
+
+def record_trace(trace: Dict[str, float]):
+    """Record stage timings measured in another process."""
+    for stage, seconds in trace.items():
+        observe_stage(stage, seconds)
+
+
+def timings_ms(trace: Dict[str, float]) -> Dict[str, float]:
+    """Trace in milliseconds, for JSON responses. Stages that ran in parallel are summed."""
+    return {stage: round(seconds * 1000, 1) for stage, seconds in trace.items()}
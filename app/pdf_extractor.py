@@ -0,0 +1,250 @@
+"""
+PDF text extraction. Kept free of the embedding stack (torch,
+sentence-transformers) so ingestion worker processes stay lightweight.
+
+Extraction is bounded by the budgets in app/config.py: files larger than
+PDF_MAX_BYTES are rejected, and reading stops early after PDF_MAX_PAGES
+pages, PDF_MAX_CHARS characters or PDF_TIME_BUDGET_S seconds, so one huge
+or pathological upload cannot hold a worker for minutes. With a time budget,
+a timer signal interrupts the page being read at the deadline, so a single
+page that takes minutes to parse cannot overrun it either, and the worker is
+free for the next file at once. pypdf is pure Python, so long documents are
+split into page ranges (extract_pages) that the ingestion pool extracts in
+parallel (see app/ingest.py). Extracted text is cached by file content hash,
+so re-uploading a resume skips parsing.
+"""
+import hashlib
+import io
+import signal
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from pypdf import PdfReader
+
+from app import config
+from app.metrics import timed
+
+
+def size_error(pdf_file: bytes, filename: str) -> Optional[str]:
+    """Return an error message when the file exceeds PDF_MAX_BYTES, else None."""
+    if config.PDF_MAX_BYTES and len(pdf_file) > config.PDF_MAX_BYTES:
+        return (f"[Error extracting text from {filename}: file is {len(pdf_file) / 1e6:.1f} MB, "
+                f"limit is {config.PDF_MAX_BYTES / 1e6:.1f} MB]")
+    return None
+
+
+def count_pages(pdf_file: bytes) -> int:
+    """Number of pages in a PDF (0 when it cannot be read)."""
+    try:
+        return len(PdfReader(io.BytesIO(pdf_file)).pages)
+    except Exception:
+        return 0
+
+
+def page_ranges(page_count: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """Split pages [0, page_count) into consecutive (start, stop) ranges."""
+    return [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+
+
+class _PageTimeout(BaseException):
+    """Raised inside a page's extraction at the deadline (a BaseException, so pypdf cannot swallow it)."""
+
+
+def _page_text(page, deadline: Optional[float]) -> Optional[str]:
+    """
+    Extract one page, giving up at the deadline.
+
+    The page is read in the calling thread. In a process's main thread on
+    POSIX, which is where ingestion workers run their tasks, a SIGALRM timer
+    interrupts it at the deadline, so no work is left running afterwards.
+    Elsewhere (Windows, other threads) the page is read to the end and the
+    deadline is only checked between pages.
+
+    Returns:
+        The page text, or None when the deadline passed first
+    """
+    interruptible = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if deadline is None or not interruptible:
+        return page.extract_text()
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        return None
+
+    def interrupt(signum, frame):
+        raise _PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, interrupt)
+    signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        try:
+            return page.extract_text()
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except _PageTimeout:
+        return None
+    finally:
+        signal.signal(signal.SIGALRM, previous)
+
+
+@timed("pdf_extract")
+def extract_pages(pdf_file: bytes, filename: str, start: int = 0, stop: Optional[int] = None,
+                  max_chars: int = 0, deadline: Optional[float] = None) -> Tuple[str, Optional[str]]:
+    """
+    Extract the text of pages [start, stop), stopping early when a budget runs out.
+
+    Args:
+        pdf_file: PDF file bytes
+        filename: Original filename for error reporting
+        start: First page to read
+        stop: Page to stop before (None = last page)
+        max_chars: Stop once this many characters were read (0 = no limit)
+        deadline: time.time() at which reading stops, even in the middle of a page
+
+    Returns:
+        (text, reason) where reason says which budget cut the text short
+        (None when every requested page was read). On failure the text is
+        an "[Error ...]" message.
+    """
+    try:
+        pdf_reader = PdfReader(io.BytesIO(pdf_file))
+        pages = pdf_reader.pages
+        stop = len(pages) if stop is None else min(stop, len(pages))
+        text_parts = []
+        chars = 0
+        reason = None
+
+        for number in range(start, stop):
+            if deadline is not None and time.time() > deadline:
+                reason = f"time budget of {config.PDF_TIME_BUDGET_S}s reached at page {number + 1}"
+                break
+            text = _page_text(pages[number], deadline)
+            if text is None:
+                reason = f"time budget of {config.PDF_TIME_BUDGET_S}s reached at page {number + 1}"
+                break
+            if text:
+                text_parts.append(text)
+                chars += len(text) + 1
+            if max_chars and chars >= max_chars:
+                if number + 1 < stop:
+                    reason = f"character limit of {max_chars} reached at page {number + 1}"
+                break
+
+        if reason is None and stop < len(pages) and stop == config.PDF_MAX_PAGES:
+            reason = f"page limit of {stop} pages reached"
+        return "\n".join(text_parts), reason
+    except Exception as e:
+        return f"[Error extracting text from {filename}: {str(e)}]", None
+
+
+def join_pages(parts: List[Tuple[str, Optional[str]]], filename: str) -> Tuple[str, Optional[str]]:
+    """
+    Combine the results of extract_pages calls over consecutive page ranges.
+
+    Text is kept up to the first range that was cut short, so the result is
+    always a contiguous prefix of the document, then trimmed to PDF_MAX_CHARS.
+
+    Args:
+        parts: (text, reason) pairs in page order
+        filename: Original filename for warnings
+
+    Returns:
+        (text, reason) like extract_pages; text is an "[Error ...]" or
+        "[Warning ...]" message when nothing usable was extracted
+    """
+    texts = []
+    reason = None
+    for text, part_reason in parts:
+        if text.startswith("[Error"):
+            return text, None
+        texts.append(text)
+        if part_reason:
+            reason = part_reason
+            break
+
+    extracted_text = "\n".join(text for text in texts if text)
+    if not extracted_text.strip():
+        return f"[Warning: No text could be extracted from {filename}]", None
+
+    if config.PDF_MAX_CHARS and len(extracted_text) > config.PDF_MAX_CHARS:
+        extracted_text = extracted_text[:config.PDF_MAX_CHARS]
+        reason = reason or f"character limit of {config.PDF_MAX_CHARS} reached"
+    return extracted_text, reason
+
+
+def budget_deadline() -> Optional[float]:
+    """Wall-clock deadline for a file whose extraction starts now (None = no time budget)."""
+    return time.time() + config.PDF_TIME_BUDGET_S if config.PDF_TIME_BUDGET_S else None
+
+
+def extract_document(pdf_file: bytes, filename: str) -> Tuple[str, Optional[str]]:
+    """
+    Extract a whole PDF within the configured budgets.
+
+    Args:
+        pdf_file: PDF file bytes
+        filename: Original filename for error reporting
+
+    Returns:
+        (text, reason) where reason says which budget cut the text short
+    """
+    error = size_error(pdf_file, filename)
+    if error:
+        return error, None
+
+    part = extract_pages(pdf_file, filename, 0, config.PDF_MAX_PAGES or None, config.PDF_MAX_CHARS, budget_deadline())
+    return join_pages([part], filename)
+
+
+def extract_text_from_pdf(pdf_file: bytes, filename: str) -> str:
+    """
+    Extract text content from a PDF file, within the configured budgets.
+    
+    Args:
+        pdf_file: PDF file bytes
+        filename: Original filename for error reporting
+        
+    Returns:
+        Extracted text as string
+    """
+    return extract_document(pdf_file, filename)[0]
+
+
+class PdfTextCache:
+    """In-memory LRU of extracted text, keyed by a hash of the file content."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(pdf_file: bytes) -> str:
+        """Hash the file bytes together with the budgets that shaped the extracted text."""
+        limits = f"{config.PDF_MAX_PAGES}:{config.PDF_MAX_CHARS}".encode()
+        return hashlib.sha256(limits + b"\x00" + pdf_file).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Return (text, truncation reason) for a cached file, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, text: str, reason: Optional[str] = None):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (text, reason)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global instance used by the ingestion stage (in the server process)
+pdf_text_cache = PdfTextCache(config.PDF_TEXT_CACHE_SIZE)
@@ -0,0 +1,81 @@
+"""
+Cache of whole CSV screening queries.
+
+Recruiters re-run the same job description with a different threshold, page
+through its results or simply refresh the page. Caching each query's ranking
+(scores and metadata rows, see CSVResumeDatabase.rank_batch) skips the JD
+embedding and the FAISS search. Keys are the normalized JD text, top_k, the
+score cutoff of threshold-mode searches, the skill and category filters and
+the index version of CSVResumeDatabase. In top-k mode the threshold is
+applied after the lookup, so one entry serves every threshold and every
+page. Entries expire after a TTL, the least recently used are evicted first,
+and the database clears the cache whenever it builds, reloads or updates its
+index.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from app.embedding_cache import normalize_text
+from app.metrics import QUERY_CACHE_LOOKUPS
+
+
+class QueryResultCache:
+    """Thread-safe LRU cache with a time-to-live."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Most queries kept (0 disables the cache)
+            ttl_seconds: Seconds an entry stays valid (0 = until evicted or invalidated)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(job_description: str, top_k: int, min_score: Optional[float], required_skills: List[str],
+                 optional_skills: List[str], index_version: int, categories: Optional[List[str]] = None) -> Tuple:
+        """Key of one query; skill and category filters are order- and case-insensitive."""
+        return (
+            normalize_text(job_description),
+            top_k,
+            min_score,
+            tuple(sorted(skill.lower() for skill in required_skills or [])),
+            tuple(sorted(skill.lower() for skill in optional_skills or [])),
+            index_version,
+            tuple(sorted(category.strip().lower() for category in categories or [])),
+        )
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Cached value, or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        QUERY_CACHE_LOOKUPS.inc(1, "hit" if entry is not None else "miss")
+        return entry[1] if entry is not None else None
+
+    def put(self, key: Tuple, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry (called when the index changes)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
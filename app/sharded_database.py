@@ -0,0 +1,618 @@
+"""
+Sharded CSV resume database: one CSVResumeDatabase per partition of the corpus.
+
+With a single index over the whole CSV, every search scans the whole corpus
+and every rebuild re-embeds it. ShardedResumeDatabase partitions the CSV by
+its Category column or by a hash of the resume ID (config.CSV_SHARDS). Each
+shard gets its own CSV slice, FAISS index and metadata store:
+
+    resume_shards/
+        shards.json           partitioning; per shard: number, categories, slice digest
+        <shard>/resume.csv    the shard's rows of the source CSV
+        <shard>/index.faiss
+        <shard>/metadata/
+
+CSVResumeDatabase builds, checkpoints, syncs and reloads each shard on its
+own. Rebuilding a shard or syncing a changed slice therefore costs time in
+proportion to that shard. Queries run on every relevant shard in parallel
+threads (FAISS releases the GIL while it searches), and the per-shard
+rankings are merged with a heap. A category filter skips shards that hold
+none of the requested categories.
+
+The class has CSVResumeDatabase's search interface (rank_batch,
+fetch_results, query_cache, refresh, ...), so the API can use either one.
+Ranked rows are global: the shard number in the high bits, and the row in
+the shard's metadata store in the low bits.
+"""
+import hashlib
+import heapq
+import json
+import os
+import re
+import shutil
+import threading
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app import config
+from app.csv_loader import CSVResumeDatabase
+from app.file_lock import FileLock
+from app.metadata_store import replace_store
+from app.metrics import timed
+from app.query_cache import QueryResultCache
+
+MANIFEST_FILE = "shards.json"
+SHARD_CSV = "resume.csv"
+
+# Global row = shard number << ROW_BITS | row in the shard's metadata store
+ROW_BITS = 40
+ROW_MASK = (1 << ROW_BITS) - 1
+
+
+def partition_spec(value: str) -> str:
+    """
+    Validate a CSV_SHARDS setting.
+
+    Returns:
+        "category", or "hash:<n>" for a number of hash shards
+    """
+    value = str(value).strip().lower()
+    if value == "category":
+        return value
+    if value.isdigit() and int(value) > 0:
+        return f"hash:{int(value)}"
+    raise ValueError(f"CSV_SHARDS must be 'category' or a number of hash shards, got '{value}'")
+
+
+def shard_name(category: str) -> str:
+    """Directory name of a category shard."""
+    return re.sub(r"[^a-z0-9_-]+", "_", category.strip().lower()).strip("_") or "_"
+
+
+class ShardedResumeDatabase:
+    """Resume corpus split over several CSVResumeDatabase shards, searched in parallel."""
+
+    def __init__(self, csv_path: str = "Resume.csv", shard_dir: str = "resume_shards",
+                 partition: Optional[str] = None, index_type: Optional[str] = None):
+        """
+        Initialize the sharded database.
+
+        Args:
+            csv_path: Path to the CSV file containing resumes
+            shard_dir: Directory holding the shards and their manifest
+            partition: "category", or a number of hash shards (default: config.CSV_SHARDS,
+                else "category"). Loading shards written with another partitioning re-splits the CSV.
+            index_type: FAISS index type for new shard builds (default: config.FAISS_INDEX_TYPE)
+        """
+        self.csv_path = csv_path
+        self.shard_dir = shard_dir
+        self.partition = partition_spec(partition or config.CSV_SHARDS or "category")
+        self.index_type = index_type
+        self.shards: Dict[str, CSVResumeDatabase] = {}
+        self._numbers: Dict[str, int] = {}
+        self._by_number: Dict[int, CSVResumeDatabase] = {}
+        self._categories: Dict[str, Set[str]] = {}  # lower-cased categories each shard holds
+        self._phase = "idle"
+        self.index_version = 0
+        self._shard_versions = None
+        self.query_cache = QueryResultCache(config.QUERY_CACHE_SIZE, config.QUERY_CACHE_TTL_S)
+        self._lock = threading.RLock()
+        # Splitting, adding or removing shards; each shard also has its own lock
+        self._file_lock = FileLock(shard_dir + ".lock")
+        self._manifest_stamp = None
+        self._executor = ThreadPoolExecutor(max_workers=config.CSV_SHARD_THREADS or None,
+                                            thread_name_prefix="shard-search")
+
+    def close(self):
+        """Stop the shard search threads (call once the database is no longer searched)."""
+        self._executor.shutdown(wait=True)
+
+    @property
+    def ready(self) -> bool:
+        """True once every shard is loaded (or built) and at least one of them is non-empty."""
+        return self._phase == "done" and any(shard.ready for shard in list(self.shards.values()))
+
+    @property
+    def progress(self) -> Dict:
+        """Build/load progress summed over the shards, in CSVResumeDatabase's format."""
+        shards = list(self.shards.values())
+        return {
+            "phase": self._phase,
+            "rows_processed": sum(shard.progress["rows_processed"] for shard in shards),
+            "resumes_indexed": sum(shard.progress["resumes_indexed"] for shard in shards),
+            "shards": len(shards),
+        }
+
+    def build_index(self):
+        """Split the CSV into shards if needed, then load every shard, building the missing ones."""
+        if not self._file_lock.acquire(blocking=False):
+            print("Another process is building the shards; waiting for it...")
+            self._phase = "waiting"
+            self._file_lock.acquire()
+        try:
+            manifest = self._read_manifest()
+            if manifest is None or manifest["partition"] != self.partition:
+                if not os.path.exists(self.csv_path):
+                    print(f"Warning: CSV file '{self.csv_path}' not found. Creating empty index.")
+                    return
+                print(f"Splitting {self.csv_path} into shards ({self.partition})...")
+                self._phase = "building"
+                manifest, _, _ = self._split(manifest)
+            self._open_shards(manifest)
+            for name, shard in sorted(self.shards.items()):
+                self._phase = "loading" if os.path.exists(shard.index_path) else "building"
+                print(f"Shard {name}:")
+                shard.build_index()
+            print(f"✅ {len(self.shards)} shards ready with {self.progress['resumes_indexed']} resumes")
+        finally:
+            self._phase = "done"
+            self._update_version()
+            self._file_lock.release()
+
+    def _shard_paths(self, name: str) -> Tuple[str, str, str]:
+        """CSV slice, index and metadata paths of a shard."""
+        directory = os.path.join(self.shard_dir, name)
+        return (os.path.join(directory, SHARD_CSV), os.path.join(directory, "index.faiss"),
+                os.path.join(directory, "metadata"))
+
+    def _partition_keys(self, ids: pd.Series, categories: pd.Series) -> List[str]:
+        """Shard name of each row."""
+        if self.partition == "category":
+            return [shard_name(category) for category in categories]
+        shards = int(self.partition.split(":")[1])
+        # crc32, not hash(): string hashes differ between processes
+        width = len(str(shards - 1))
+        return [f"hash_{zlib.crc32(resume_id.encode()) % shards:0{width}d}" for resume_id in ids]
+
+    def _split(self, old: Optional[Dict]) -> Tuple[Dict, Set[str], Set[str]]:
+        """
+        Partition the source CSV into per-shard slices (call with the file lock held).
+
+        Each slice is written next to the live one and only replaces it when
+        its content changed, so unchanged shards keep their files and need
+        neither a sync nor a rebuild.
+
+        Args:
+            old: Current manifest, or None
+
+        Returns:
+            The new manifest, the shards whose slice is new or changed, and
+            the shards that no longer have any rows (their files are removed)
+        """
+        if old is not None and old["partition"] != self.partition:
+            print(f"Shards were partitioned by {old['partition']}; re-splitting by {self.partition}")
+            for name in old["shards"]:
+                shutil.rmtree(os.path.join(self.shard_dir, name), ignore_errors=True)
+            old = None
+        old_shards = old["shards"] if old is not None else {}
+        next_number = old["next_number"] if old is not None else 0
+
+        handles = {}
+        digests = {}
+        categories = defaultdict(set)
+        try:
+            for chunk in pd.read_csv(self.csv_path, chunksize=config.CSV_CHUNK_ROWS):
+                # Shard slices need the ID column: the row position is only an ID in the full CSV
+                if "ID" not in chunk.columns:
+                    chunk.insert(0, "ID", chunk.index)
+                ids = chunk["ID"].astype(str)
+                chunk_categories = chunk["Category"].astype(str) if "Category" in chunk.columns \
+                    else pd.Series("Unknown", index=chunk.index)
+                keys = self._partition_keys(ids, chunk_categories)
+                for name, part in chunk.groupby(keys, sort=False):
+                    categories[name].update(chunk_categories[part.index].str.lower())
+                    if name not in handles:
+                        csv_path = self._shard_paths(name)[0]
+                        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+                        handles[name] = open(csv_path + ".partial", "w", encoding="utf-8", newline="")
+                        digests[name] = hashlib.blake2b(digest_size=16)
+                    text = part.to_csv(index=False, header=handles[name].tell() == 0)
+                    handles[name].write(text)
+                    digests[name].update(text.encode("utf-8"))
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+        shards = {}
+        changed = set()
+        for name in sorted(handles):
+            csv_path = self._shard_paths(name)[0]
+            digest = digests[name].hexdigest()
+            previous = old_shards.get(name)
+            if previous is not None and previous["digest"] == digest and os.path.exists(csv_path):
+                os.remove(csv_path + ".partial")
+            else:
+                os.replace(csv_path + ".partial", csv_path)
+                changed.add(name)
+            if previous is not None:
+                number = previous["number"]
+            else:
+                number, next_number = next_number, next_number + 1
+            shards[name] = {"number": number, "categories": sorted(categories[name]), "digest": digest}
+
+        removed = set(old_shards) - set(shards)
+        for name in removed:
+            shutil.rmtree(os.path.join(self.shard_dir, name), ignore_errors=True)
+
+        manifest = {"partition": self.partition, "next_number": next_number, "shards": shards}
+        self._write_manifest(manifest)
+        print(f"Split into {len(shards)} shards: {len(changed)} new or changed, {len(removed)} removed")
+        return manifest, changed, removed
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.shard_dir, MANIFEST_FILE)
+
+    def _read_manifest(self) -> Optional[Dict]:
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, manifest: Dict):
+        os.makedirs(self.shard_dir, exist_ok=True)
+        path = self._manifest_path()
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(path + ".tmp", path)
+        self._manifest_stamp = self._file_stamp()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Inode, modification time and size of the manifest (None if it is missing)."""
+        try:
+            stat = os.stat(self._manifest_path())
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _open_shards(self, manifest: Dict):
+        """Match the open shards to the manifest: keep loaded ones, create new ones, drop removed ones."""
+        shards = {}
+        for name in manifest["shards"]:
+            shard = self.shards.get(name)
+            if shard is None:
+                csv_path, index_path, metadata_path = self._shard_paths(name)
+                shard = CSVResumeDatabase(csv_path=csv_path, index_path=index_path, metadata_path=metadata_path,
+                                          index_type=self.index_type)
+            shards[name] = shard
+        with self._lock:
+            self.shards = shards
+            self._numbers = {name: info["number"] for name, info in manifest["shards"].items()}
+            self._by_number = {self._numbers[name]: shard for name, shard in shards.items()}
+            self._categories = {name: set(info["categories"]) for name, info in manifest["shards"].items()}
+        self._manifest_stamp = self._file_stamp()
+
+    def _reload_if_changed(self, blocking: bool = False):
+        """Pick up shards another process added or removed (it rewrote the manifest)."""
+        if self._manifest_stamp is None or self._file_stamp() in (self._manifest_stamp, None):
+            return
+        if not self._file_lock.acquire(blocking=blocking):
+            return
+        try:
+            manifest = self._read_manifest()
+            if manifest is not None and self._file_stamp() != self._manifest_stamp:
+                print("Shard manifest changed on disk; reloading shards...")
+                self._open_shards(manifest)
+                for shard in self.shards.values():
+                    if shard.index is None:
+                        shard.build_index()
+                self._update_version()
+        finally:
+            self._file_lock.release()
+
+    def _update_version(self):
+        """Bump index_version (and clear the query cache) when the shard set or any shard changed."""
+        with self._lock:
+            versions = tuple(sorted((name, shard.index_version) for name, shard in self.shards.items()))
+            if versions != self._shard_versions:
+                self._shard_versions = versions
+                self.index_version += 1
+                self.query_cache.clear()
+
+    def refresh(self) -> int:
+        """
+        Pick up shards and shard files another process changed since they were loaded.
+
+        Returns:
+            The current index version (changes whenever any shard changes)
+        """
+        self._reload_if_changed()
+        for shard in list(self.shards.values()):
+            shard.refresh()
+        self._update_version()
+        return self.index_version
+
+    def _select_shards(self, categories: Optional[List[str]]) -> List[Tuple[int, CSVResumeDatabase, Optional[List[str]]]]:
+        """
+        Shards a query has to search, with the category filter each of them still needs.
+
+        Category shards holding only requested categories are searched
+        unfiltered; shards holding none of them are skipped, and so are
+        empty shards and shards whose index is not loaded (see skipped_shards).
+        """
+        return [(number, shard, shard_categories)
+                for _, number, shard, shard_categories in self._relevant_shards(categories) if shard.ready]
+
+    def skipped_shards(self, categories: Optional[List[str]] = None) -> List[str]:
+        """
+        Shards a query with these categories should search but cannot, because their index is not loaded.
+
+        Their resumes are missing from the results, which are then partial;
+        callers report this to clients instead of passing the results off as complete.
+        """
+        return [name for name, _, shard, _ in self._relevant_shards(categories) if shard.index is None]
+
+    def _relevant_shards(self, categories: Optional[List[str]]) -> List[Tuple[str, int, CSVResumeDatabase, Optional[List[str]]]]:
+        """Every shard that may hold resumes in `categories` (all shards without a filter), with its remaining filter."""
+        wanted = {category.strip().lower() for category in categories or [] if category.strip()}
+        with self._lock:
+            shards = [(name, self._numbers[name], shard) for name, shard in self.shards.items()]
+        relevant = []
+        for name, number, shard in shards:
+            if not wanted:
+                relevant.append((name, number, shard, None))
+            elif self.partition == "category":
+                held = self._categories.get(name, set())
+                if held & wanted:
+                    relevant.append((name, number, shard, None if held <= wanted else sorted(wanted)))
+            else:
+                relevant.append((name, number, shard, sorted(wanted)))
+        return relevant
+
+    def search(self, query_vector: np.ndarray, top_k: int = 5, **filters) -> List[Dict]:
+        """Like CSVResumeDatabase.search, over every relevant shard."""
+        if query_vector.ndim == 1:
+            query_vector = query_vector.reshape(1, -1)
+        return self.search_batch(query_vector[:1], top_k, **filters)[0]
+
+    def search_batch(self, query_vectors: np.ndarray, top_k: int = 5, **filters) -> List[List[Dict]]:
+        """Like CSVResumeDatabase.search_batch, over every relevant shard."""
+        return [self.fetch_results(scores, rows) for scores, rows in self.rank_batch(query_vectors, top_k, **filters)]
+
+    @timed("vector_search")
+    def rank_batch(self, query_vectors: np.ndarray, top_k: int = 5, min_score: Optional[float] = None,
+                   nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                   required_skills: Optional[List[str]] = None,
+                   optional_skills: Optional[List[str]] = None,
+                   categories: Optional[List[str]] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Rank resumes on every relevant shard in parallel and merge the rankings.
+
+        Each shard returns its own best top_k (above min_score in threshold
+        mode). The global top_k is among them, so the merge is exact with
+        respect to the shard searches. Arguments are as in
+        CSVResumeDatabase.rank_batch; categories also select the shards.
+
+        Returns:
+            One (scores, global rows) pair of arrays per query, best first
+        """
+        self._reload_if_changed()
+        query_vectors = np.array(query_vectors, dtype='float32', ndmin=2)
+        targets = self._select_shards(categories)
+        args = (top_k, min_score, nprobe, ef_search, required_skills, optional_skills)
+        if len(targets) == 1:
+            number, shard, shard_categories = targets[0]
+            rankings = [shard._rank_batch(query_vectors, *args, shard_categories)]
+        else:
+            futures = [self._executor.submit(shard._rank_batch, query_vectors, *args, shard_categories)
+                       for _, shard, shard_categories in targets]
+            rankings = [future.result() for future in futures]
+        numbers = [number for number, _, _ in targets]
+        return [self._merge([(number, ranking[query]) for number, ranking in zip(numbers, rankings)], top_k)
+                for query in range(len(query_vectors))]
+
+    @staticmethod
+    def _merge(rankings: List[Tuple[int, Tuple[np.ndarray, np.ndarray]]], limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Merge per-shard rankings (each best first) into the best `limit` global rows with a heap."""
+        streams = [
+            zip((-scores).tolist(), ((number << ROW_BITS) | rows.astype(np.int64)).tolist())
+            for number, (scores, rows) in rankings if len(rows)
+        ]
+        merged = list(islice(heapq.merge(*streams), limit))
+        if not merged:
+            return np.zeros(0, dtype='float32'), np.zeros(0, dtype='int64')
+        negated, rows = zip(*merged)
+        return -np.array(negated, dtype='float32'), np.array(rows, dtype='int64')
+
+    def fetch_results(self, scores: np.ndarray, rows: np.ndarray) -> List[Dict]:
+        """
+        Read ranked global rows into result dictionaries, like CSVResumeDatabase.fetch_results.
+
+        Rows of shards that were removed since the ranking was made are skipped.
+        """
+        results = []
+        rows = np.asarray(rows, dtype=np.int64)
+        for score, number, row in zip(scores, (rows >> ROW_BITS).tolist(), (rows & ROW_MASK).tolist()):
+            shard = self._by_number.get(number)
+            if shard is not None:
+                results.extend(shard.fetch_results([score], [row]))
+        return results
+
+    def upsert(self, records: List[Dict]) -> Dict[str, int]:
+        """
+        Insert new resumes or replace existing ones, matched on ID, in the shards they belong to.
+
+        A resume whose category changed moves to its new category's shard
+        (counted as updated). A shard that does not exist yet is built from
+        the records; the next sync replaces it with the CSV's rows.
+
+        Args:
+            records: Dicts with "id", "category" and "full_text" keys
+
+        Returns:
+            Counts of added, updated and unchanged records
+        """
+        with self._file_lock:
+            self._reload_if_changed(blocking=True)
+            records = list({str(r["id"]): dict(r, id=str(r["id"])) for r in records}.values())
+            keys = self._partition_keys(pd.Series([r["id"] for r in records], dtype=str),
+                                        pd.Series([str(r.get("category", "Unknown")) for r in records], dtype=str))
+            groups = defaultdict(list)
+            for key, record in zip(keys, records):
+                groups[key].append(record)
+
+            counts = {"added": 0, "updated": 0, "unchanged": 0}
+            moved = 0
+            if self.partition == "category":
+                # Remove resumes from the shard of their old category
+                for name, shard in list(self.shards.items()):
+                    if shard.index is None:
+                        continue
+                    id_rows = shard.metadata.id_rows()
+                    stale = [r["id"] for key, r in zip(keys, records) if key != name and r["id"] in id_rows]
+                    if stale:
+                        moved += shard.delete(stale)
+
+            for name, group in groups.items():
+                if name in self.shards:
+                    for key, value in self.shards[name].upsert(group).items():
+                        counts[key] += value
+                else:
+                    self._create_shard(name, group)
+                    counts["added"] += len(group)
+            counts["added"] -= moved
+            counts["updated"] += moved
+            self._update_version()
+            return counts
+
+    def _create_shard(self, name: str, records: List[Dict]):
+        """Add a shard holding `records` (call with the file lock held)."""
+        csv_path = self._shard_paths(name)[0]
+        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        frame = pd.DataFrame({
+            "ID": [r["id"] for r in records],
+            "Resume_str": [r["full_text"] for r in records],
+            "Category": [str(r.get("category", "Unknown")) for r in records],
+        })
+        text = frame.to_csv(index=False)
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+
+        manifest = self._read_manifest() or {"partition": self.partition, "next_number": 0, "shards": {}}
+        manifest["shards"][name] = {
+            "number": manifest["next_number"],
+            "categories": sorted({category.lower() for category in frame["Category"]}),
+            "digest": hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest(),
+        }
+        manifest["next_number"] += 1
+        self._write_manifest(manifest)
+        self._open_shards(manifest)
+        self.shards[name].build_index()
+
+    def delete(self, ids: List[str]) -> int:
+        """
+        Remove resumes by ID from whichever shards hold them.
+
+        Returns:
+            Number of resumes deleted (unknown IDs are ignored)
+        """
+        with self._file_lock:
+            self._reload_if_changed(blocking=True)
+            deleted = sum(shard.delete(ids) for shard in self.shards.values() if shard.index is not None)
+            self._update_version()
+            return deleted
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Re-split the CSV and sync only the shards whose slice changed.
+
+        Splitting reads the CSV once but embeds nothing. Shards whose slice
+        is unchanged are not touched. New shards are built, and shards that
+        have no rows any more are removed.
+
+        Returns:
+            Counts of added, updated, deleted and unchanged resumes
+        """
+        with self._file_lock:
+            self._reload_if_changed(blocking=True)
+            counts = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+            manifest, changed, removed = self._split(self._read_manifest())
+            for name in removed:
+                shard = self.shards.get(name)
+                if shard is not None and shard.index is not None:
+                    counts["deleted"] += shard.metadata.live_count
+
+            self._open_shards(manifest)
+            for name, shard in sorted(self.shards.items()):
+                if name not in changed:
+                    counts["unchanged"] += shard.metadata.live_count if shard.index is not None else 0
+                    continue
+                print(f"Syncing shard {name}...")
+                if shard.index is None and os.path.exists(shard.index_path):
+                    shard.build_index()
+                for key, value in shard.sync().items():
+                    counts[key] += value
+            self._update_version()
+            print(f"✅ Sync complete: {counts}")
+            return counts
+
+    def rebuild(self, name: str):
+        """
+        Rebuild one shard from its CSV slice, leaving the others untouched.
+
+        Useful after changing the index type or embedding settings: the
+        cost is that of the shard, not of the whole corpus. The new index
+        is built next to the live one and swapped in under the shard's file
+        lock, so the shard keeps serving its old index until then, and a
+        failed build leaves it as it was.
+        """
+        with self._file_lock:
+            self._reload_if_changed(blocking=True)
+            shard = self.shards.get(name)
+            if shard is None:
+                raise ValueError(f"Unknown shard '{name}'")
+            build = CSVResumeDatabase(csv_path=shard.csv_path, index_path=shard.index_path + ".rebuild",
+                                      metadata_path=shard.metadata_path + ".rebuild", index_type=self.index_type)
+            # A finished but unpublished build of an earlier run would be loaded instead of rebuilt
+            self._discard_build(build)
+            try:
+                build.build_index()
+                if build.index is None:
+                    raise ValueError(f"Rebuilding shard '{name}' produced no index; keeping the old one")
+                with shard._file_lock, shard._lock:
+                    os.replace(build.index_path, shard.index_path)
+                    replace_store(build.metadata_path, shard.metadata_path)
+                    shard._load_index()
+                    shard._index_changed()
+            finally:
+                self._discard_build(build)
+            self._update_version()
+
+    @staticmethod
+    def _discard_build(build: CSVResumeDatabase):
+        """Remove the index, metadata and lock files of a shard rebuild (checkpoints are kept)."""
+        for path in (build.index_path, build.index_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(build.metadata_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build, sync or rebuild a sharded CSV resume index.")
+    parser.add_argument("command", choices=["build", "sync", "rebuild"],
+                        help="build: split the CSV and build missing shards; sync: re-split and sync changed "
+                             "shards; rebuild: rebuild the shards given with --shard")
+    parser.add_argument("--csv", default="Resume.csv")
+    parser.add_argument("--dir", default="resume_shards", help="Shard directory")
+    parser.add_argument("--partition", default=None, help="'category' or a number of hash shards (default: CSV_SHARDS, else category)")
+    parser.add_argument("--shard", action="append", default=[], help="Shard to rebuild (repeatable)")
+    args = parser.parse_args()
+
+    database = ShardedResumeDatabase(csv_path=args.csv, shard_dir=args.dir, partition=args.partition)
+    try:
+        database.build_index()
+        if args.command == "sync":
+            database.sync()
+        elif args.command == "rebuild":
+            for name in args.shard or sorted(database.shards):
+                database.rebuild(name)
+    finally:
+        database.close()
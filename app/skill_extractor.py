@@ -2,119 +2,144 @@
 THE EYES. This file scans resumes to find skills like 'Python', 'Tally', or 'Leadership'.
 """
 
-import re
-from typing import List, Set
+import threading
+from typing import List, Optional, Set
 
 import spacy
 
+from app import config
+from app.metrics import timed
+from app.skill_taxonomy import SkillTaxonomy
 
-class SkillExtractor:
-    def __init__(self):
-        """Initialize spaCy and compile regex patterns for known skills."""
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            # Fallback: run without spaCy if the model is missing
-            print("Warning: spaCy model not found. Using Regex only.")
-            self.nlp = None
-
-        # Comprehensive list of technical skills
-        self.skill_patterns: Set[str] = {
-            "Python",
-            "Java",
-            "JavaScript",
-            "TypeScript",
-            "C++",
-            "C#",
-            "Go",
-            "Rust",
-            "HTML",
-            "CSS",
-            "React",
-            "Angular",
-            "Vue.js",
-            "Next.js",
-            "Node.js",
-            "Django",
-            "Flask",
-            "FastAPI",
-            "Spring",
-            "ASP.NET",
-            "SQL",
-            "MySQL",
-            "PostgreSQL",
-            "MongoDB",
-            "Redis",
-            "Oracle",
-            "AWS",
-            "Azure",
-            "GCP",
-            "Docker",
-            "Kubernetes",
-            "Jenkins",
-            "Git",
-            "Machine Learning",
-            "Deep Learning",
-            "TensorFlow",
-            "PyTorch",
-            "Pandas",
-            "NumPy",
-            "Linux",
-            "Agile",
-            "Scrum",
-            "DevOps",
-            "CI/CD",
-            "REST API",
-            "GraphQL",
-        }
-
-        # Pre-compile a single regex for fast matching
-        self.skill_regex = re.compile(
-            r"\b(?:"
-            + "|".join(re.escape(skill) for skill in self.skill_patterns)
-            + r")\b",
-            re.IGNORECASE,
-        )
 
+def unused_pipes(nlp) -> List[str]:
+    """Pipeline components that named-entity recognition does not need."""
+    keep = {"ner"}
+    for name, pipe in nlp.pipeline:
+        # A shared tok2vec layer feeding the NER must stay on
+        if "ner" in getattr(pipe, "listening_components", []):
+            keep.add(name)
+    return [name for name in nlp.pipe_names if name not in keep]
+
+
+class SkillExtractor:
+    def __init__(self, taxonomy_path: Optional[str] = None):
+        """
+        Load the skill taxonomy. spaCy is loaded on first use (see load).
+
+        Args:
+            taxonomy_path: Taxonomy JSON file (default: config.SKILL_TAXONOMY_PATH,
+                or the bundled app/skill_taxonomy.json)
+        """
+        self._nlp = None
+        self._nlp_loaded = False
+        self._nlp_lock = threading.Lock()
+
+        # Canonical skills with their synonyms, matched with a token trie
+        self.taxonomy = SkillTaxonomy.load(taxonomy_path or config.SKILL_TAXONOMY_PATH)
+        self.skill_patterns: Set[str] = set(self.taxonomy.skills)
+
+    def load(self):
+        """Load the spaCy model now (called during startup so no request pays for it)."""
+        with self._nlp_lock:
+            if not self._nlp_loaded:
+                try:
+                    self._nlp = spacy.load(config.SPACY_MODEL)
+                    # Only doc.ents is used: switch off the tagger, parser, lemmatizer etc.
+                    for name in unused_pipes(self._nlp):
+                        self._nlp.disable_pipe(name)
+                except OSError:
+                    # Fallback: run without spaCy if the model is missing
+                    print("Warning: spaCy model not found. Using taxonomy matching only.")
+                    self._nlp = None
+                self._nlp_loaded = True
+        return self
+
+    @property
+    def nlp(self):
+        if not self._nlp_loaded:
+            self.load()
+        return self._nlp
+
+    @timed("skill_extract")
     def extract(self, text: str) -> List[str]:
         """Extract a sorted list of unique skills from arbitrary text."""
         if not text or not text.strip():
             return []
 
-        found_skills: Set[str] = set()
-
-        # 1. Regex Match (fast, deterministic)
-        matches = self.skill_regex.findall(text)
-        for match in matches:
-            found_skills.add(self._normalize_skill(match))
+        # 1. Taxonomy match (fast, deterministic)
+        found_skills = self.taxonomy.match(text)
 
         # 2. spaCy NER (contextual, best-effort)
-        if self.nlp:
+        nlp = self.nlp
+        if nlp:
             try:
-                doc = self.nlp(text)
-                tech_keywords = ["experience", "proficient", "using", "developer"]
-                for ent in doc.ents:
-                    if ent.label_ in ["ORG", "PRODUCT"]:
-                        window_start = max(0, ent.start_char - 30)
-                        window_end = min(len(text), ent.end_char + 30)
-                        context = text[window_start:window_end].lower()
-                        if any(k in context for k in tech_keywords):
-                            norm = self._normalize_skill(ent.text)
-                            if norm in self.skill_patterns:
-                                found_skills.add(norm)
+                found_skills |= self._entity_skills(nlp(text[:config.SPACY_MAX_CHARS]), text)
             except Exception:
                 # NER is best-effort only; ignore errors
                 pass
 
         return sorted(found_skills)
 
+    @timed("skill_extract")
+    def extract_many(self, texts: List[str], batch_size: Optional[int] = None,
+                     n_process: Optional[int] = None) -> List[List[str]]:
+        """
+        Extract skills from many texts at once.
+
+        Same results as calling extract() on each text, but spaCy processes the
+        texts in batches with nlp.pipe, optionally in several processes.
+
+        Args:
+            texts: Texts to tag
+            batch_size: Texts per spaCy batch (default: config.SPACY_BATCH_SIZE)
+            n_process: spaCy worker processes (default: config.SPACY_N_PROCESS).
+                Use 1 inside pool workers, which cannot start processes of their own.
+
+        Returns:
+            Sorted skill lists, one per text
+        """
+        found = [self.taxonomy.match(text) if text and text.strip() else set() for text in texts]
+
+        nlp = self.nlp
+        if nlp:
+            try:
+                positions = [i for i, text in enumerate(texts) if text and text.strip()]
+                docs = nlp.pipe(
+                    (texts[i][:config.SPACY_MAX_CHARS] for i in positions),
+                    batch_size=batch_size or config.SPACY_BATCH_SIZE,
+                    n_process=n_process or config.SPACY_N_PROCESS,
+                )
+                for i, doc in zip(positions, docs):
+                    found[i] |= self._entity_skills(doc, texts[i])
+            except Exception:
+                # NER is best-effort only; ignore errors
+                pass
+
+        return [sorted(skills) for skills in found]
+
+    def _entity_skills(self, doc, text: str) -> Set[str]:
+        """Known skills named by ORG/PRODUCT entities in a technical context."""
+        skills: Set[str] = set()
+        tech_keywords = ["experience", "proficient", "using", "developer"]
+        for ent in doc.ents:
+            if ent.label_ in ["ORG", "PRODUCT"]:
+                window_start = max(0, ent.start_char - 30)
+                window_end = min(len(text), ent.end_char + 30)
+                context = text[window_start:window_end].lower()
+                if any(k in context for k in tech_keywords):
+                    norm = self.taxonomy.canonical(ent.text)
+                    if norm:
+                        skills.add(norm)
+        return skills
+
+    def vocabulary(self) -> List[str]:
+        """Every skill name extract() can return, in a stable (sorted) order."""
+        return sorted(self.taxonomy.skills)
+
     def _normalize_skill(self, skill: str) -> str:
-        """Normalize variations like 'react.js' -> 'React'."""
-        skill = skill.strip().replace(".js", "").replace(".JS", "")
-        for pattern in self.skill_patterns:
-            if pattern.lower() == skill.lower():
-                return pattern
-        return skill.title()
+        """Normalize variations like 'react.js' -> 'React' (a dict lookup in the taxonomy)."""
+        return self.taxonomy.canonical(skill) or skill.strip().title()
 
 
 # Convenience global instance used by the rest of the app
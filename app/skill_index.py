@@ -0,0 +1,84 @@
+"""
+Inverted index from skill to resume rows, built from the skills bitset column
+of a MetadataStore.
+
+Used to restrict vector search to resumes that mention the requested skills
+before FAISS ranks them, so selective filters still return a full top-k.
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.metadata_store import MetadataStore
+from app.skill_taxonomy import SkillTaxonomy
+
+
+class SkillIndex:
+    """Skill -> sorted array of live metadata rows."""
+
+    def __init__(self, store: MetadataStore, taxonomy: Optional[SkillTaxonomy] = None, chunk_rows: int = 100000):
+        """
+        Build the postings lists.
+
+        Args:
+            store: Metadata store with a skills bitset column
+            taxonomy: Maps user-supplied synonyms ("k8s") to the canonical
+                skill names stored in the bitset ("Kubernetes")
+            chunk_rows: Rows unpacked at a time (bounds temporary memory)
+        """
+        self.store = store
+        self.taxonomy = taxonomy
+        vocabulary = store.skills_vocabulary
+        live = store.live_mask()
+        parts: List[List[np.ndarray]] = [[] for _ in vocabulary]
+
+        for start in range(0, len(store.skill_bits), chunk_rows):
+            bits = np.unpackbits(store.skill_bits[start:start + chunk_rows], axis=1)[:, :len(vocabulary)]
+            bits &= live[start:start + len(bits), None]
+            for j in np.flatnonzero(bits.any(axis=0)):
+                parts[j].append(np.flatnonzero(bits[:, j]).astype(np.int64) + start)
+
+        self.postings: Dict[str, np.ndarray] = {
+            skill: np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+            for skill, chunks in zip(vocabulary, parts)
+        }
+        # Case-insensitive lookup of user-supplied skill names
+        self._canonical = {skill.lower(): skill for skill in vocabulary}
+
+    def rows_with(self, skill: str) -> np.ndarray:
+        """Rows whose resume mentions `skill` or a synonym of it (empty for unknown skills)."""
+        if self.taxonomy is not None:
+            skill = self.taxonomy.canonical(skill) or skill
+        canonical = self._canonical.get(skill.strip().lower())
+        if canonical is None:
+            return np.zeros(0, dtype=np.int64)
+        return self.postings[canonical]
+
+    def filter_rows(self, required: Iterable[str] = (), optional: Iterable[str] = ()) -> Optional[np.ndarray]:
+        """
+        Rows matching every required skill and at least one optional skill.
+
+        Args:
+            required: Skills that must all be present (AND)
+            optional: Skills of which at least one must be present (OR)
+
+        Returns:
+            Sorted row array, or None when no filter was given
+        """
+        required = [s for s in required if s.strip()]
+        optional = [s for s in optional if s.strip()]
+        if not required and not optional:
+            return None
+
+        rows = None
+        # Intersect the shortest postings first
+        for postings in sorted((self.rows_with(s) for s in required), key=len):
+            rows = postings if rows is None else np.intersect1d(rows, postings, assume_unique=True)
+            if len(rows) == 0:
+                return rows
+
+        if optional:
+            any_rows = np.unique(np.concatenate([self.rows_with(s) for s in optional]))
+            rows = any_rows if rows is None else np.intersect1d(rows, any_rows, assume_unique=True)
+
+        return rows
@@ -0,0 +1,112 @@
+"""
+Skill taxonomy and matcher.
+
+The taxonomy is a JSON file mapping each canonical skill name to its
+synonyms:
+
+    {"Kubernetes": ["k8s", "kube"], "React": ["react.js", "reactjs"], ...}
+
+Text is split into lowercase tokens (keeping "c++", "c#", "node.js" and
+"asp.net" whole) and matched against a token trie of every canonical name and
+synonym, taking the longest phrase at each position. Matching costs one dict
+lookup per token whatever the taxonomy size, unlike one regex alternation of
+every skill, and turning a match into its canonical name is a dict lookup
+instead of a scan over all skills.
+"""
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# Bundled taxonomy, used when config.SKILL_TAXONOMY_PATH is not set
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent / "skill_taxonomy.json"
+
+# Runs of letters/digits, keeping inner ".", "+" and "#" (node.js, c++, c#) and a
+# leading "." (.net); everything else separates tokens
+TOKEN_RE = re.compile(r"\.?[a-z0-9](?:[a-z0-9+#.]*[a-z0-9+#])?")
+
+# Trie node key marking the end of a phrase; its value is the canonical name
+_END = ""
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase match tokens of a text or skill name."""
+    return TOKEN_RE.findall(text.lower())
+
+
+class SkillTaxonomy:
+    """Canonical skills and synonyms, with a token-trie matcher."""
+
+    def __init__(self, skills: Dict[str, Iterable[str]]):
+        """
+        Build the lookup tables.
+
+        Args:
+            skills: Canonical skill name -> synonyms. When two skills claim the
+                same surface form, the first one keeps it.
+        """
+        self.skills: List[str] = list(skills)
+        self._canonical: Dict[str, str] = {}
+        self._trie: Dict = {}
+        self.max_phrase_tokens = 0
+
+        for name, synonyms in skills.items():
+            for surface in [name, *synonyms]:
+                tokens = tokenize(surface)
+                if not tokens:
+                    continue
+                key = " ".join(tokens)
+                if key in self._canonical:
+                    continue
+                self._canonical[key] = name
+
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node[_END] = name
+                self.max_phrase_tokens = max(self.max_phrase_tokens, len(tokens))
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "SkillTaxonomy":
+        """Load a taxonomy JSON file (the bundled one when path is empty)."""
+        with open(path or DEFAULT_TAXONOMY_PATH, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def canonical(self, surface: str) -> Optional[str]:
+        """Canonical name of a skill or synonym ("k8s" -> "Kubernetes"), or None if unknown."""
+        return self._canonical.get(" ".join(tokenize(surface)))
+
+    def match(self, text: str) -> Set[str]:
+        """Canonical names of every skill mentioned in a text."""
+        found: Set[str] = set()
+        tokens = tokenize(text)
+        trie = self._trie
+        i = 0
+        while i < len(tokens):
+            node = trie.get(tokens[i])
+            if node is None:
+                i += 1
+                continue
+
+            # Longest phrase starting at this token
+            name = node.get(_END)
+            length = 1
+            j = i + 1
+            while j < len(tokens):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    name = node[_END]
+                    length = j - i
+
+            if name is None:
+                i += 1
+            else:
+                found.add(name)
+                i += length
+        return found
@@ -0,0 +1,133 @@
+"""
+Concurrent, non-blocking startup.
+
+Each slow component (encoder, spaCy, ingestion workers, CSV index) is loaded
+on its own background thread when the app starts, so the server accepts
+connections immediately. The StartupManager tracks every component's state
+for /readyz, and lets endpoints tell callers that something is still warming
+up instead of silently returning partial results.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class Component:
+    """Load state of one startup component."""
+
+    def __init__(self, name: str, required: bool, progress: Optional[Callable[[], Dict]] = None):
+        self.name = name
+        self.required = required
+        self.progress = progress
+        self.state = PENDING
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        now = time.time()
+        status = {"state": self.state, "required": self.required}
+        if self.started_at is not None:
+            status["elapsed_s"] = round((self.finished_at or now) - self.started_at, 2)
+        if self.progress is not None:
+            status["progress"] = self.progress()
+        if self.error:
+            status["error"] = self.error
+        return status
+
+
+class StartupManager:
+    """Runs component loaders concurrently and reports their readiness."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.first_request_at: Optional[float] = None
+        self.components: Dict[str, Component] = {}
+        self._loaders: Dict[str, Callable[[], object]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], object], required: bool = True,
+                 progress: Optional[Callable[[], Dict]] = None):
+        """
+        Add a component to load when start() is called.
+
+        Args:
+            name: Component name shown by /readyz
+            loader: Blocking function that loads the component
+            required: Whether the app is not ready until this component is
+            progress: Optional callable returning a progress dict for /readyz
+        """
+        self.components[name] = Component(name, required, progress)
+        self._loaders[name] = loader
+
+    def start(self) -> List[Future]:
+        """
+        Load every registered component in the background.
+
+        The executor has one thread per component, so no loader waits in a
+        queue behind slower ones.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max(len(self._loaders), 1), thread_name_prefix="startup")
+        return [self._executor.submit(self._run, self.components[name], loader)
+                for name, loader in self._loaders.items()]
+
+    @staticmethod
+    def _run(component: Component, loader: Callable[[], object]):
+        component.state = LOADING
+        component.started_at = time.time()
+        try:
+            loader()
+            component.state = READY
+            logger.info(f"✅ {component.name} ready in {time.time() - component.started_at:.1f}s")
+        except Exception as e:
+            component.state = FAILED
+            component.error = str(e)
+            logger.warning(f"⚠️ {component.name} failed to load: {e}")
+        finally:
+            component.finished_at = time.time()
+
+    def state(self, name: str) -> Optional[str]:
+        component = self.components.get(name)
+        return component.state if component else None
+
+    def is_ready(self, name: str) -> bool:
+        return self.state(name) == READY
+
+    def ready(self) -> bool:
+        """True once every required component has loaded."""
+        return all(c.state == READY for c in self.components.values() if c.required)
+
+    def mark_request(self):
+        """Record the first served request, for the time-to-first-request figure."""
+        with self._lock:
+            if self.first_request_at is None:
+                self.first_request_at = time.time()
+                logger.info(f"First request served {self.first_request_at - self.started_at:.1f}s after startup")
+
+    def snapshot(self) -> Dict:
+        """Readiness report for /readyz."""
+        ready_times = [c.finished_at for c in self.components.values() if c.required and c.finished_at]
+        report = {
+            "ready": self.ready(),
+            "uptime_s": round(time.time() - self.started_at, 2),
+            "components": {name: c.to_dict() for name, c in self.components.items()},
+        }
+        if self.ready() and ready_times:
+            report["ready_after_s"] = round(max(ready_times) - self.started_at, 2)
+        if self.first_request_at is not None:
+            report["first_request_after_s"] = round(self.first_request_at - self.started_at, 2)
+        return report
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,226 @@
+"""
+Talent pool: uploaded resumes kept in a persistent, searchable index.
+
+Uploaded PDFs used to be scored against one job description and dropped, so
+screening the same candidates for the next job meant uploading, parsing and
+embedding them again. Every parsed upload is now added to a second FAISS
+index and metadata store (the CSV database machinery, see csv_loader.py),
+and later job descriptions search it like the CSV database: one embedded
+query, one FAISS search, no re-parsing or re-encoding.
+
+Resumes are keyed by a hash of the file bytes, so re-uploading a file (under
+any name) is recognised and neither stored nor embedded twice. The original
+filenames are kept in a JSON-lines sidecar next to the metadata store, keyed
+by that hash; the store's category column holds UPLOAD_CATEGORY.
+
+Adding uploads stays off the request path: add() only checks the hashes
+against an in-memory set and queues the new files. A background thread
+embeds and writes the queue every config.TALENT_POOL_FLUSH_S seconds, so a
+busy server rewrites the pool's FAISS file once per interval rather than
+once per request.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import faiss
+
+from app import config
+from app.csv_loader import CSVResumeDatabase
+from app.faiss_index import create_index
+from app.metadata_store import MetadataStore, MetadataWriter
+from app.skill_extractor import skill_extractor
+from app.utils import generate_embeddings, load_model
+
+
+def file_hash(content: bytes) -> str:
+    """Pool ID of an uploaded file: a 32-character hex digest of its bytes."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+# Category of every pooled upload
+UPLOAD_CATEGORY = "Upload"
+
+
+class TalentPool(CSVResumeDatabase):
+    """Persistent index of uploaded resumes, searched like the CSV database."""
+
+    def __init__(self, index_path: str = "talent_pool.faiss", metadata_path: str = "talent_pool_metadata",
+                 flush_interval: Optional[float] = None):
+        """
+        Initialize the pool (load it with build_index).
+
+        Args:
+            index_path: Path of the pool's FAISS index
+            metadata_path: Directory of the pool's metadata store
+            flush_interval: Seconds between background writes of queued uploads
+                (default: config.TALENT_POOL_FLUSH_S; 0 = write them in add())
+        """
+        # Exact search, and the only index type that supports adding and removing one resume at a time
+        super().__init__(csv_path="", index_path=index_path, metadata_path=metadata_path, index_type="flat")
+        # Upload filenames by pool ID: appended to the sidecar, read back incrementally
+        self.filenames_path = self.metadata_path + ".filenames.jsonl"
+        self._filenames: Dict[str, str] = {}
+        self._filenames_offset = 0
+        # Pool IDs of the loaded store (rebuilt when another process's update is loaded)
+        self._known: Set[str] = set()
+        self._known_store = None
+        # Uploads waiting for the background writer, by pool ID
+        self._pending: Dict[str, Dict] = {}
+        self._pending_lock = threading.Lock()
+        self.flush_interval = config.TALENT_POOL_FLUSH_S if flush_interval is None else flush_interval
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+    def build_index(self):
+        """Load the pool from disk, creating an empty one on first use."""
+        with self._file_lock:
+            if not (os.path.exists(self.index_path) and MetadataStore.exists(self.metadata_path)):
+                self._create_empty()
+            super().build_index()
+
+    def add(self, uploads: List[Tuple[bytes, Dict]]) -> Dict[str, int]:
+        """
+        Queue parsed uploads for the pool, skipping files it already holds or has queued.
+
+        Only hashes the files and looks them up in memory; the background
+        writer embeds and stores them (see flush).
+
+        Args:
+            uploads: (file bytes, processed upload) pairs, the latter with
+                filename, text and skills keys (see app.ingest.process_uploads)
+
+        Returns:
+            Counts of added (queued) files and of the others: already pooled,
+            queued, or repeated within `uploads` ("unchanged")
+        """
+        records = {}
+        for content, processed in uploads:
+            records.setdefault(file_hash(content), {
+                "filename": processed["filename"],
+                "category": UPLOAD_CATEGORY,
+                "full_text": processed["text"],
+                "skills": processed["skills"],
+            })
+
+        known = self._known_ids()
+        with self._pending_lock:
+            new = {resume_id: dict(record, id=resume_id) for resume_id, record in records.items()
+                   if resume_id not in known and resume_id not in self._pending}
+            self._pending.update(new)
+            if new and self.flush_interval > 0 and self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="talent-pool-writer", daemon=True)
+                self._writer.start()
+        if self.flush_interval <= 0:
+            self.flush()
+        return {"added": len(new), "unchanged": len(uploads) - len(new)}
+
+    def flush(self) -> int:
+        """
+        Embed and store the queued uploads: one metadata append and one index write per batch.
+
+        Uploads leave the queue only once they are stored, so if embedding or
+        writing them fails they are retried by the next flush.
+
+        Returns:
+            Number of resumes added
+        """
+        with self._pending_lock:
+            pending = dict(self._pending)
+        if not pending:
+            return 0
+        with self._file_lock, self._lock:
+            self._require_index()
+            # Another worker may have added the same files since they were queued
+            known = self._known_ids()
+            new = [record for resume_id, record in pending.items() if resume_id not in known]
+            # Filenames first: a crash before _apply leaves an unused line, never a nameless resume
+            self._write_filenames(new)
+            self._apply(new, [])
+            known.update(record["id"] for record in new)
+            self._known_store = self.metadata
+        with self._pending_lock:
+            for resume_id in pending:
+                self._pending.pop(resume_id, None)
+        return len(new)
+
+    def close(self):
+        """Stop the background writer and store whatever is still queued (call on shutdown)."""
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join()
+        self.flush()
+
+    def _write_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                added = self.flush()
+                if added:
+                    print(f"Talent pool: {added} resumes stored")
+            except Exception as e:
+                print(f"Error storing uploads in the talent pool: {e}")
+
+    def _known_ids(self) -> Set[str]:
+        """IDs in the loaded store, decoded once per loaded store rather than once per add."""
+        with self._lock:
+            if self._known_store is not self.metadata:
+                self._known = set(self.metadata.id_rows()) if self.index is not None else set()
+                self._known_store = self.metadata
+            return self._known
+
+    def fetch_results(self, scores, rows) -> List[Dict]:
+        """Like CSVResumeDatabase.fetch_results, with the original upload filenames."""
+        results = super().fetch_results(scores, rows)
+        with self._lock:
+            if any(result["id"] not in self._filenames for result in results):
+                # Added since the last read, possibly by another process
+                self._read_filenames()
+            for result in results:
+                result["filename"] = self._filenames.get(result["id"], result["filename"])
+        return results
+
+    def _write_filenames(self, records: List[Dict]):
+        """Append the upload filenames of new pool records to the sidecar."""
+        if not records:
+            return
+        lines = "".join(json.dumps({"id": record["id"], "filename": record["filename"]}) + "\n" for record in records)
+        with open(self.filenames_path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def _read_filenames(self):
+        """Read the sidecar lines appended since the last read."""
+        try:
+            with open(self.filenames_path, "rb") as f:
+                f.seek(self._filenames_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # Only complete lines; a line still being written is read next time
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            entry = json.loads(line)
+            self._filenames.setdefault(entry["id"], entry["filename"])
+        self._filenames_offset += end
+
+    def sync(self) -> Dict[str, int]:
+        """Nothing to do: the pool has no CSV source, uploads are added with add()."""
+        return {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+
+    @staticmethod
+    def _embed(texts: List[str]):
+        # Uploads were just embedded for scoring, so the embedding cache usually has every chunk;
+        # misses are background work and bypass the request scheduler
+        embeddings = generate_embeddings(texts, scheduled=False).astype("float32")
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    def _create_empty(self):
+        """Write an empty index and metadata store."""
+        print(f"Creating an empty talent pool at {self.index_path}...")
+        dimension = load_model().get_sentence_embedding_dimension()
+        label_stride = self._build_label_stride()
+        MetadataWriter(self.metadata_path, skills_vocabulary=skill_extractor.vocabulary(),
+                       label_stride=label_stride).close()
+        faiss.write_index(create_index(self.index_type, dimension, labelled=label_stride > 1), self.index_path)
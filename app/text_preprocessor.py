@@ -7,9 +7,12 @@ import re
 import unicodedata
 from typing import Optional
 
+from app.metrics import timed
+
 
 class TextPreprocessor:
     @staticmethod
+    @timed("preprocess")
     def preprocess(text: Optional[str]) -> str:
         """
         Aggressively clean up raw text by normalizing Unicode artifacts,
@@ -1,76 +1,284 @@
 """
 THE BRAIN. This file uses Sentence-BERT to understand the meaning of resumes.
 """
-import io
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+import threading
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from pypdf import PdfReader
-from sklearn.metrics.pairwise import cosine_similarity
 
+from app import config
+from app.embedding_cache import EmbeddingCache, embedding_cache
+from app.embedding_scheduler import EmbeddingScheduler
+from app.embedding_server import RemoteEncoder
+from app.encoder_backends import load_encoder
+from app.metrics import CACHE_LOOKUPS, TOKENS, timed
 from app.text_preprocessor import TextPreprocessor
+from app.pdf_extractor import extract_text_from_pdf  # noqa: F401 (re-exported)
 
 
-# Global model instance (loaded at startup)
-model: SentenceTransformer = None
+POOLING_MODES = ("max", "mean")
+
+# Global model instance (loaded at startup): a SentenceTransformer or compatible
+# encoder (see app/encoder_backends.py), or a RemoteEncoder with EMBEDDING_SERVER
+model = None
+
+# Shared micro-batching scheduler in front of the model (None when disabled)
+embedding_scheduler: EmbeddingScheduler = None
+
+# Startup loads the model from a background thread while requests may already call it
+_model_lock = threading.Lock()
 
 
 def load_model():
-    """Load the Sentence-Transformer model at startup."""
-    global model
-    if model is None:
-        print("Loading Sentence-Transformer model: all-MiniLM-L6-v2...")
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("Model loaded successfully!")
+    """Load the Sentence-Transformer model and start the embedding scheduler at startup."""
+    global model, embedding_scheduler
+    with _model_lock:
+        if model is None and config.EMBEDDING_SERVER:
+            print(f"Using the shared embedding process at {config.EMBEDDING_SERVER}...")
+            encoder = RemoteEncoder(config.EMBEDDING_SERVER, config.EMBEDDING_SERVER_AUTHKEY)
+            encoder.get_sentence_embedding_dimension()  # waits until the server has loaded the model
+            model = encoder
+            print("Embedding server ready!")
+        if model is None:
+            print(f"Loading Sentence-Transformer model: {config.EMBEDDING_MODEL} ({config.EMBEDDING_BACKEND} backend)...")
+            model = load_encoder(config.EMBEDDING_MODEL, config.EMBEDDING_BACKEND)
+            print("Model loaded successfully!")
+        if embedding_scheduler is None and config.EMBED_SCHEDULER_BATCH > 0:
+            embedding_scheduler = EmbeddingScheduler(
+                _encode_batch, config.EMBED_SCHEDULER_BATCH, config.EMBED_SCHEDULER_WAIT_MS
+            )
     return model
 
 
-def extract_text_from_pdf(pdf_file: bytes, filename: str) -> str:
+def cache_model_key() -> str:
+    """Model identity for embedding cache keys; quantized/ONNX vectors differ slightly from fp32."""
+    if config.EMBEDDING_BACKEND == "torch":
+        return config.EMBEDDING_MODEL
+    return f"{config.EMBEDDING_MODEL}@{config.EMBEDDING_BACKEND}"
+
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    return model.encode(texts, batch_size=config.EMBED_BATCH_SIZE, show_progress_bar=False, convert_to_numpy=True)
+
+
+def _encode(texts: List[str], scheduled: bool = True) -> np.ndarray:
+    """Encode through the shared scheduler, or directly when it is disabled or `scheduled` is False."""
+    if scheduled and embedding_scheduler is not None and texts:
+        return embedding_scheduler.encode(texts)
+    return _encode_batch(texts)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row, so inner products are cosine similarities."""
+    vectors = np.asarray(vectors, dtype="float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(1e-12)
+
+
+@timed("embed")
+def generate_embeddings(texts: List[str], use_cache: bool = True, normalize: bool = False,
+                        scheduled: bool = True) -> np.ndarray:
     """
-    Extract text content from a PDF file.
+    Generate embeddings for a list of texts using the loaded model.
+    
+    Texts already seen (same normalized content, same model) are served from
+    the embedding cache; only the misses go through the model, via the
+    embedding scheduler so concurrent callers share forward passes.
     
     Args:
-        pdf_file: PDF file bytes
-        filename: Original filename for error reporting
+        texts: List of text strings
+        use_cache: Set to False for one-off bulk encoding (e.g. index builds)
+        normalize: L2-normalize the vectors (cosine similarity is then a dot product)
+        scheduled: Set to False for bulk work (index builds, bulk screening,
+            talent pool writes): the misses then go straight to the model in
+            config.EMBED_BATCH_SIZE batches instead of filling the scheduler's
+            micro-batches ahead of interactive requests
         
     Returns:
-        Extracted text as string
+        Numpy array of embeddings
     """
-    try:
-        pdf_reader = PdfReader(io.BytesIO(pdf_file))
-        text_parts = []
-        
-        for page in pdf_reader.pages:
-            text = page.extract_text()
-            if text:
-                text_parts.append(text)
-        
-        extracted_text = "\n".join(text_parts)
-        
-        if not extracted_text.strip():
-            return f"[Warning: No text could be extracted from {filename}]"
-        
-        return extracted_text
-    except Exception as e:
-        return f"[Error extracting text from {filename}: {str(e)}]"
+    if model is None:
+        load_model()
+    
+    if not use_cache or embedding_cache is None or not texts:
+        TOKENS.inc(sum(len(text.split()) for text in texts))
+        embeddings = _encode(texts, scheduled)
+        return normalize_rows(embeddings) if normalize and len(texts) else embeddings
+    
+    keys = [EmbeddingCache.make_key(text, cache_model_key()) for text in texts]
+    vectors = embedding_cache.get_many(keys)
+    
+    # Encode each distinct missing text once
+    missing = {}
+    for i, vector in enumerate(vectors):
+        if vector is None:
+            missing.setdefault(keys[i], i)
+    hits = sum(vector is not None for vector in vectors)
+    CACHE_LOOKUPS.inc(hits, "hit")
+    CACHE_LOOKUPS.inc(len(texts) - hits, "miss")
+    
+    if missing:
+        positions = list(missing.values())
+        TOKENS.inc(sum(len(texts[i].split()) for i in positions))
+        encoded = _encode([texts[i] for i in positions], scheduled)
+        embedding_cache.put_many(list(missing), encoded)
+        by_key = dict(zip(missing, encoded))
+        vectors = [by_key[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+    
+    embeddings = np.vstack(vectors).astype("float32")
+    return normalize_rows(embeddings) if normalize else embeddings
+
+
+def chunking_enabled() -> bool:
+    return config.EMBED_CHUNK_WORDS > 0
+
 
+def chunk_pooling() -> str:
+    """The configured chunk pooling mode, validated."""
+    if config.EMBED_CHUNK_POOLING not in POOLING_MODES:
+        raise ValueError(f"Unknown EMBED_CHUNK_POOLING '{config.EMBED_CHUNK_POOLING}', expected one of {POOLING_MODES}")
+    return config.EMBED_CHUNK_POOLING
 
-def generate_embeddings(texts: List[str]) -> np.ndarray:
+
+def chunk_text(text: str, chunk_words: Optional[int] = None, overlap: Optional[int] = None,
+               max_chunks: Optional[int] = None) -> List[str]:
     """
-    Generate embeddings for a list of texts using the loaded model.
+    Split text into overlapping windows of words.
     
     Args:
-        texts: List of text strings
+        text: Text to split
+        chunk_words: Words per window (default: config.EMBED_CHUNK_WORDS; 0 = no chunking)
+        overlap: Words repeated at the start of the next window (default: config.EMBED_CHUNK_OVERLAP)
+        max_chunks: Most windows returned (default: config.EMBED_MAX_CHUNKS)
         
     Returns:
-        Numpy array of embeddings
+        List of chunks; short texts (and chunk_words=0) give [text]
     """
-    global model
-    if model is None:
-        model = load_model()
+    chunk_words = config.EMBED_CHUNK_WORDS if chunk_words is None else chunk_words
+    overlap = config.EMBED_CHUNK_OVERLAP if overlap is None else overlap
+    max_chunks = max_chunks or config.EMBED_MAX_CHUNKS
+    
+    words = text.split()
+    if chunk_words <= 0 or len(words) <= chunk_words:
+        return [text]
     
-    embeddings = model.encode(texts, show_progress_bar=False, convert_to_numpy=True)
-    return embeddings
+    step = max(1, chunk_words - overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words) or len(chunks) >= max_chunks:
+            break
+    return chunks
+
+
+def chunk_documents(texts: List[str], max_chunks: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Chunk several texts for one batched encode call.
+    
+    Args:
+        texts: Texts to split
+        max_chunks: Most chunks per text (default: config.EMBED_MAX_CHUNKS)
+        
+    Returns:
+        All chunks in order, and the index of the text each chunk came from
+    """
+    chunks = []
+    parents = []
+    for i, text in enumerate(texts):
+        pieces = chunk_text(text, max_chunks=max_chunks)
+        chunks.extend(pieces)
+        parents.extend([i] * len(pieces))
+    return chunks, np.asarray(parents, dtype="int64")
+
+
+def mean_pool(chunk_embeddings: np.ndarray, parents: np.ndarray, n_texts: int) -> np.ndarray:
+    """Average chunk vectors per parent text and L2-normalize the result."""
+    pooled = np.zeros((n_texts, chunk_embeddings.shape[1]), dtype="float32")
+    np.add.at(pooled, parents, normalize_rows(chunk_embeddings))
+    return normalize_rows(pooled)
+
+
+def _pooled_scores(chunk_embeddings: np.ndarray, parents: np.ndarray, n_texts: int,
+                   queries: np.ndarray) -> np.ndarray:
+    """(n_texts, n_queries) similarities from normalized chunk and query vectors, pooled per text."""
+    if chunk_pooling() == "mean":
+        return mean_pool(chunk_embeddings, parents, n_texts) @ queries.T
+    # Chunks of a text are contiguous, so max pooling is one reduceat over their runs
+    starts = np.flatnonzero(np.r_[True, parents[1:] != parents[:-1]])
+    return np.maximum.reduceat(chunk_embeddings @ queries.T, starts, axis=0)
+
+
+def similarity_matrix(query_embeddings: np.ndarray, resume_texts: List[str], use_cache: bool = True,
+                      scheduled: bool = True) -> np.ndarray:
+    """
+    Cosine similarity of every resume to every query (job description) vector.
+
+    Resumes are chunked and pooled like in score_resumes, and all queries are
+    scored with one matrix product, so screening against many job
+    descriptions costs one encode pass over the resumes.
+
+    Args:
+        query_embeddings: (n_queries, dim) job description embeddings
+        resume_texts: Resume texts to encode and score
+        use_cache: Set to False for one-off bulk scoring
+        scheduled: Set to False to bypass the embedding scheduler (see generate_embeddings)
+
+    Returns:
+        (len(resume_texts), n_queries) array of cosine similarities
+    """
+    if not resume_texts:
+        return np.zeros((0, len(query_embeddings)), dtype="float32")
+
+    chunks, parents = chunk_documents(resume_texts)
+    chunk_embeddings = generate_embeddings(chunks, use_cache=use_cache, normalize=True, scheduled=scheduled)
+    return _pooled_scores(chunk_embeddings, parents, len(resume_texts), normalize_rows(query_embeddings))
+
+
+def score_resumes(job_description: str, resume_texts: List[str]) -> np.ndarray:
+    """
+    Cosine similarity of each resume to a job description, in input order.
+
+    The JD and every resume chunk are encoded in one call with normalized
+    outputs, so scoring is a single matrix-vector product. With chunking
+    enabled (config.EMBED_CHUNK_WORDS), a resume scores as its best-matching
+    chunk ("max" pooling) or as the mean of its chunk vectors ("mean").
+
+    Args:
+        job_description: Job description text
+        resume_texts: Resume texts
+
+    Returns:
+        float32 array with one score per resume
+    """
+    if not resume_texts:
+        return np.zeros(0, dtype="float32")
+    chunks, parents = chunk_documents(resume_texts)
+    # The JD is normally a cache hit from the caller
+    embeddings = generate_embeddings([job_description] + chunks, normalize=True)
+    return _pooled_scores(embeddings[1:], parents, len(resume_texts), embeddings[:1])[:, 0]
+
+
+def rank_scores(scores: np.ndarray, top_k: int = 0, min_score: Optional[float] = None,
+                mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Positions of the best scores, best first, selected with array operations.
+
+    Args:
+        scores: One score per candidate
+        top_k: Most positions returned (0 = every qualifying one). They are
+            picked with argpartition, so only the top_k get sorted.
+        min_score: Drop candidates scoring below this
+        mask: Boolean array; False drops a candidate (e.g. a failed skill filter)
+
+    Returns:
+        int64 array of candidate positions by descending score (ties keep input order)
+    """
+    scores = np.asarray(scores)
+    keep = np.ones(len(scores), dtype=bool) if mask is None else np.array(mask, dtype=bool)
+    if min_score is not None:
+        keep &= scores >= min_score
+    candidates = np.flatnonzero(keep)
+    if 0 < top_k < len(candidates):
+        candidates = np.sort(candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
 
 
 def calculate_similarity_scores(
@@ -80,40 +288,22 @@ def calculate_similarity_scores(
 ) -> List[Tuple[str, str, float]]:
     """
     Calculate cosine similarity scores between job description and resumes.
-    
+
+    Kept for callers that want (filename, text, score) tuples; score_resumes
+    and rank_scores work on arrays and positions instead, which do not rely
+    on filenames being unique.
+
     Args:
         job_description: Job description text
         resume_texts: List of resume text contents
         resume_filenames: List of corresponding filenames
-        
+
     Returns:
         List of tuples: (filename, resume_text, similarity_score)
         Sorted by similarity score (descending)
     """
-    if not resume_texts:
-        return []
-    
-    # Generate embeddings
-    all_texts = [job_description] + resume_texts
-    embeddings = generate_embeddings(all_texts)
-    
-    # Separate job description and resume embeddings
-    jd_embedding = embeddings[0:1]  # Shape: (1, embedding_dim)
-    resume_embeddings = embeddings[1:]  # Shape: (n_resumes, embedding_dim)
-    
-    # Calculate cosine similarity
-    similarity_scores = cosine_similarity(jd_embedding, resume_embeddings)[0]
-    
-    # Create list of (filename, text, score) tuples
-    results = [
-        (filename, text, float(score))
-        for filename, text, score in zip(resume_filenames, resume_texts, similarity_scores)
-    ]
-    
-    # Sort by similarity score (descending)
-    results.sort(key=lambda x: x[2], reverse=True)
-    
-    return results
+    scores = score_resumes(job_description, resume_texts)
+    return [(resume_filenames[i], resume_texts[i], float(scores[i])) for i in rank_scores(scores)]
 
 
 def format_score(score: float) -> float:
@@ -128,4 +318,9 @@ def format_score(score: float) -> float:
     """
     # Clamp to [0, 1] range and convert to percentage
     clamped_score = max(0.0, min(1.0, score))
-    return round(clamped_score * 100, 2)
\ No newline at end of file
+    return round(clamped_score * 100, 2)
+
+
+def format_scores(scores: np.ndarray) -> np.ndarray:
+    """format_score for an array of scores."""
+    return np.round(np.clip(scores, 0.0, 1.0) * 100, 2)
\ No newline at end of file
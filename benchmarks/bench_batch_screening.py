@@ -0,0 +1,98 @@
+"""
+Benchmark batch screening against the single-JD path.
+
+Compares, for the same set of job descriptions:
+    single  one generate_embeddings + one CSVResumeDatabase.search per JD
+    batch   one generate_embeddings for all JDs + one search_batch call
+
+Usage:
+    python benchmarks/bench_batch_screening.py [--jds 200] [--corpus 50000]
+
+Uses the real encoder (embedding cache disabled) and a synthetic corpus of
+--corpus random normalized vectors, so it runs without Resume.csv.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["EMBEDDING_CACHE_SIZE"] = "0"  # measure the forward pass, not the cache
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import faiss  # noqa: E402
+import numpy as np  # noqa: E402
+
+from app.csv_loader import CSVResumeDatabase  # noqa: E402
+from app.metadata_store import MetadataStore, write_store  # noqa: E402
+from app.utils import generate_embeddings, load_model  # noqa: E402
+
+ROLES = ["Python developer", "Data scientist", "DevOps engineer", "Frontend engineer", "Accountant",
+         "Sales manager", "HR generalist", "Java backend engineer", "Network administrator", "Teacher"]
+SKILLS = ["AWS", "Docker", "Kubernetes", "SQL", "React", "Pandas", "Excel", "Linux", "Agile", "TensorFlow"]
+
+
+def make_jds(n: int):
+    rng = np.random.default_rng(0)
+    return [
+        f"We are hiring a {ROLES[i % len(ROLES)]} (req #{i}) with experience in "
+        + ", ".join(rng.choice(SKILLS, 3, replace=False))
+        + ". You will collaborate with cross-functional teams and own delivery end to end."
+        for i in range(n)
+    ]
+
+
+def make_database(corpus: int, dim: int, workdir: str) -> CSVResumeDatabase:
+    vectors = np.random.default_rng(1).standard_normal((corpus, dim)).astype("float32")
+    faiss.normalize_L2(vectors)
+    db = CSVResumeDatabase(csv_path="", index_path=os.path.join(workdir, "bench.faiss"),
+                           metadata_path=os.path.join(workdir, "bench_metadata"))
+    db.index = faiss.IndexFlatIP(dim)
+    db.index.add(vectors)
+    write_store(db.metadata_path, [{"id": str(i), "category": "BENCH", "full_text": f"resume {i}"} for i in range(corpus)])
+    db.metadata = MetadataStore(db.metadata_path)
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jds", type=int, default=200)
+    parser.add_argument("--corpus", type=int, default=50000)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    model = load_model()
+    jds = make_jds(args.jds)
+    generate_embeddings(jds[:8])  # warm up
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db = make_database(args.corpus, model.get_sentence_embedding_dimension(), workdir)
+
+        single_encode = single_search = 0.0
+        for jd in jds:
+            start = time.perf_counter()
+            vector = generate_embeddings([jd])[0]
+            single_encode += time.perf_counter() - start
+            start = time.perf_counter()
+            db.search(vector, top_k=args.top_k)
+            single_search += time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectors = generate_embeddings(jds)
+        batch_encode = time.perf_counter() - start
+        start = time.perf_counter()
+        db.search_batch(vectors, top_k=args.top_k)
+        batch_search = time.perf_counter() - start
+
+    print(f"{args.jds} JDs, corpus={args.corpus}, top_k={args.top_k}")
+    print(f"{'path':<8} {'encode s':>9} {'search s':>9} {'total s':>8} {'JDs/sec':>9}")
+    for name, encode, search in (("single", single_encode, single_search), ("batch", batch_encode, batch_search)):
+        total = encode + search
+        print(f"{name:<8} {encode:>9.3f} {search:>9.3f} {total:>8.3f} {args.jds / total:>9.1f}")
+    print(f"speedup: {(single_encode + single_search) / (batch_encode + batch_search):.1f}x "
+          f"(search only: {single_search / batch_search:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark the micro-batching embedding scheduler against direct model.encode calls.
+
+Every client thread sends --requests single-JD encode requests back to back
+(like one /api/screen-resumes call each), with distinct texts so nothing is
+cached. Reported per mode and client count: requests/sec and p50/p99 latency.
+
+    direct     each request calls model.encode itself (the old behaviour)
+    scheduler  requests go through EmbeddingScheduler's shared batches
+
+Usage:
+    python benchmarks/bench_embedding_scheduler.py [--clients 1 50] [--requests 20]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+os.environ["EMBED_SCHEDULER_BATCH"] = "0"  # the benchmark creates its own scheduler
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from app import config  # noqa: E402
+from app.embedding_scheduler import EmbeddingScheduler  # noqa: E402
+from app.utils import load_model  # noqa: E402
+
+WORDS = ("python docker kubernetes sql react pandas aws linux agile terraform spark kafka "
+         "senior engineer team delivery ownership cloud platform data pipelines services").split()
+
+
+def make_text(rng: np.random.Generator) -> str:
+    return "We are hiring: " + " ".join(rng.choice(WORDS, int(rng.integers(20, 120))))
+
+
+def run(encode, clients: int, requests: int):
+    """Run `clients` threads of `requests` calls each; return (requests/sec, p50 ms, p99 ms)."""
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients + 1)
+
+    def client(seed: int):
+        rng = np.random.default_rng(seed)
+        texts = [make_text(rng) for _ in range(requests)]
+        local = []
+        barrier.wait()
+        for text in texts:
+            start = time.perf_counter()
+            encode([text])
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return len(latencies) / elapsed, np.percentile(latencies_ms, 50), np.percentile(latencies_ms, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 50])
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--batch", type=int, default=64, help="Scheduler max batch size")
+    parser.add_argument("--wait-ms", type=float, default=0.0, help="Scheduler max wait")
+    args = parser.parse_args()
+
+    model = load_model()
+
+    def direct(texts):
+        return model.encode(texts, batch_size=config.EMBED_BATCH_SIZE, show_progress_bar=False, convert_to_numpy=True)
+
+    direct(["warm up"] * 8)
+    scheduler = EmbeddingScheduler(direct, args.batch, args.wait_ms)
+
+    print(f"{'mode':>10} {'clients':>8} {'req/sec':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for clients in args.clients:
+        for mode, encode in (("direct", direct), ("scheduler", scheduler.encode)):
+            throughput, p50, p99 = run(encode, clients, args.requests)
+            print(f"{mode:>10} {clients:>8} {throughput:>9.1f} {p50:>8.1f} {p99:>8.1f}")
+    scheduler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark encoder inference backends: sentences/sec and cosine drift versus fp32.
+
+For each backend the same resume texts are encoded; throughput is measured
+after a warm-up batch, and the vectors are compared with the fp32 torch
+vectors (mean / min cosine, and how many of each query's fp32 top-10
+neighbours the backend still returns).
+
+Usage:
+    python benchmarks/bench_encoder_backends.py [--csv Resume.csv] [--n 1000]
+        [--backends torch int8 onnx onnx_int8]
+
+The first ONNX run exports (and quantizes) the model into EMBEDDING_ONNX_DIR.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from app import config  # noqa: E402
+from app.encoder_backends import BACKENDS, cosine_drift, load_encoder  # noqa: E402
+
+
+def load_texts(csv_path: Path, n: int):
+    if not csv_path.exists():
+        sys.exit(f"{csv_path} not found; pass --csv with a resume CSV")
+    frame = pd.read_csv(csv_path, nrows=n)
+    column = "Resume_str" if "Resume_str" in frame.columns else "Resume_html"
+    return [str(text) for text in frame[column].dropna() if str(text).strip()]
+
+
+def top10(vectors: np.ndarray, queries: int) -> np.ndarray:
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = vectors[:queries] @ vectors.T
+    return np.argsort(-scores, axis=1)[:, 1:11]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", type=Path, default=BASE_DIR / "Resume.csv")
+    parser.add_argument("--n", type=int, default=1000, help="Resumes to encode")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--queries", type=int, default=50, help="Texts used as queries for top-10 agreement")
+    args = parser.parse_args()
+
+    texts = load_texts(args.csv, args.n)
+    print(f"{len(texts)} resumes from {args.csv}, model {config.EMBEDDING_MODEL}, batch size {config.EMBED_BATCH_SIZE}")
+
+    reference = None
+    reference_top10 = None
+    print(f"{'backend':>10} {'sent/sec':>9} {'mean cos':>9} {'min cos':>9} {'top10 agree':>12}")
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        encoder = load_encoder(config.EMBEDDING_MODEL, backend)
+        encoder.encode(texts[:config.EMBED_BATCH_SIZE], batch_size=config.EMBED_BATCH_SIZE)  # warm up
+
+        start = time.perf_counter()
+        vectors = encoder.encode(texts, batch_size=config.EMBED_BATCH_SIZE, show_progress_bar=False,
+                                 convert_to_numpy=True)
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference, reference_top10 = vectors, top10(vectors, args.queries)
+        drift = cosine_drift(reference, vectors)
+        neighbours = top10(vectors, args.queries)
+        agreement = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(reference_top10, neighbours)])
+        if backend in args.backends:
+            print(f"{backend:>10} {len(texts) / elapsed:>9.1f} {drift['mean_cosine']:>9.5f} "
+                  f"{drift['min_cosine']:>9.5f} {agreement:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark FAISS index types: recall@10 against the exact flat index and
+p50/p99 single-query search latency, on a synthetic clustered corpus.
+
+Usage:
+    python benchmarks/bench_faiss_index.py [--n 100000] [--queries 500]
+
+Vectors are normalized like the real embeddings, so the numbers carry over to
+the inner-product indexes the app builds. Try --n at your corpus size to pick
+FAISS_INDEX_TYPE, FAISS_NPROBE and FAISS_EF_SEARCH.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.faiss_index import create_index, search_params, train_index  # noqa: E402
+
+K = 10
+
+
+def synthetic_corpus(n: int, dim: int, n_clusters: int, seed: int = 0) -> np.ndarray:
+    """Gaussian clusters around random centers, L2-normalized."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype("float32")
+    vectors = centers[rng.integers(0, n_clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def measure(index, queries, ground_truth, params):
+    """Return recall@K and p50/p99 latency (ms) for one-query-at-a-time search."""
+    latencies = []
+    found = np.empty_like(ground_truth)
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, labels = index.search(queries[i:i + 1], K, params=params)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found[i] = labels[0]
+    recall = np.mean([len(set(found[i]) & set(ground_truth[i])) / K for i in range(len(queries))])
+    return recall, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=100000, help="Corpus size")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--train-size", type=int, default=50000)
+    parser.add_argument("--threads", type=int, default=1, help="FAISS OpenMP threads (1 = per-request latency)")
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(args.threads)
+    corpus = synthetic_corpus(args.n + args.queries, args.dim, n_clusters=max(10, args.n // 1000))
+    corpus, queries = corpus[:args.n], corpus[args.n:]
+    sample = corpus[:args.train_size]
+
+    configs = [
+        ("flat", {}, [{}]),
+        ("ivf_flat", {}, [{"nprobe": p} for p in (4, 16, 64)]),
+        ("ivf_pq", {}, [{"nprobe": p} for p in (4, 16, 64)]),
+        ("hnsw", {}, [{"ef_search": e} for e in (16, 64, 256)]),
+    ]
+
+    ground_truth = None
+    print(f"corpus={args.n} dim={args.dim} queries={args.queries} threads={args.threads}")
+    print(f"{'index':<10} {'setting':<14} {'build s':>8} {'recall@10':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for index_type, build_kwargs, query_settings in configs:
+        start = time.perf_counter()
+        index = create_index(index_type, args.dim, n_train=len(sample), **build_kwargs)
+        train_index(index, sample)
+        index.add(corpus)
+        build_seconds = time.perf_counter() - start
+
+        if ground_truth is None:
+            _, ground_truth = index.search(queries, K)
+
+        for setting in query_settings:
+            params = search_params(index, **setting)
+            recall, p50, p99 = measure(index, queries, ground_truth, params)
+            label = ",".join(f"{k}={v}" for k, v in setting.items()) or "-"
+            print(f"{index_type:<10} {label:<14} {build_seconds:>8.1f} {recall:>10.3f} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark the PDF ingestion pool: files/sec versus worker count.
+
+Usage:
+    python benchmarks/bench_ingest.py [--copies 16] [--workers 1 2 4 8]
+
+Each sample PDF in uploads/ is repeated --copies times so every run has
+enough work to keep all workers busy.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from app.ingest import create_pool, process_resume  # noqa: E402
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cpu_count})
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", type=int, default=16, help="Times each sample PDF is repeated")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    args = parser.parse_args()
+
+    samples = [(p.name, p.read_bytes()) for p in sorted((BASE_DIR / "uploads").glob("*.pdf"))]
+    if not samples:
+        sys.exit("No sample PDFs found in uploads/")
+    uploads = samples * args.copies
+
+    print(f"{len(uploads)} files ({len(samples)} samples x {args.copies})")
+    print(f"{'workers':>8} {'seconds':>9} {'files/sec':>10}")
+    for workers in args.workers:
+        with create_pool(workers) as pool:
+            # Warm up: start every worker and load spaCy before timing
+            list(pool.map(process_resume, [c for _, c in samples] * workers, [n for n, _ in samples] * workers))
+
+            start = time.perf_counter()
+            results = list(pool.map(process_resume, [c for _, c in uploads], [n for n, _ in uploads]))
+            elapsed = time.perf_counter() - start
+
+        failed = sum(1 for r in results if r["error"])
+        note = f"  ({failed} failed)" if failed else ""
+        print(f"{workers:>8} {elapsed:>9.2f} {len(uploads) / elapsed:>10.1f}{note}")
+
+
+if __name__ == "__main__":
+    main()
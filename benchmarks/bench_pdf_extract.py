@@ -0,0 +1,126 @@
+"""
+Benchmark PDF extraction on generated multi-page resumes.
+
+Synthetic PDFs of each --pages size are pushed through the ingestion stage
+(app.ingest.iter_processed) in four configurations:
+
+    whole file   one worker reads the whole file (no page splitting)
+    page split   pages are split into ranges of --pages-per-task and
+                 extracted by all workers in parallel
+    early stop   page split, with PDF_MAX_PAGES=--max-pages
+    cached       a second pass over the same files (content-hash text cache)
+
+Usage:
+    python benchmarks/bench_pdf_extract.py [--pages 2 20 100] [--files 4] [--workers 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import config, ingest  # noqa: E402
+from app.pdf_extractor import pdf_text_cache  # noqa: E402
+
+WORDS = ("python docker kubernetes sql react pandas aws linux agile terraform spark kafka "
+         "senior engineer team delivery ownership cloud platform data pipelines services").split()
+
+
+def make_pdf(pages: int, seed: int, lines_per_page: int = 45) -> bytes:
+    """Build a PDF with `pages` pages of text (no dependency beyond the standard library)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        lines = []
+        for line in range(lines_per_page):
+            words = [WORDS[(seed * 7 + page * 31 + line * 5 + i * 3) % len(WORDS)] for i in range(12)]
+            lines.append(f"({page + 1}.{line + 1} {' '.join(words)}) Tj T*")
+        stream = ("BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(lines) + " ET").encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def configure(**settings):
+    """Apply settings to this process and to workers spawned afterwards."""
+    for name, value in settings.items():
+        os.environ[name] = str(value)
+        setattr(config, name, value)
+
+
+async def run(uploads):
+    results = []
+    async for result in ingest.iter_processed(uploads):
+        results.append(result)
+    return results
+
+
+def timed_pass(uploads, workers: int, fresh_pool: bool = True):
+    """Process the uploads once; return (seconds, results)."""
+    if fresh_pool:
+        ingest.shutdown_pool()
+        ingest._pool = ingest.create_pool(workers)
+        ingest.warm_pool()
+    start = time.perf_counter()
+    results = asyncio.run(run(uploads))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 20, 100], help="Pages per generated PDF")
+    parser.add_argument("--files", type=int, default=4, help="PDFs per size")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pages-per-task", type=int, default=8)
+    parser.add_argument("--max-pages", type=int, default=10, help="PDF_MAX_PAGES for the early-stop run")
+    args = parser.parse_args()
+
+    configure(INGEST_WORKERS=args.workers, PDF_SPLIT_MIN_BYTES=0, PDF_MAX_CHARS=0, PDF_TIME_BUDGET_S=0)
+    print(f"{args.workers} workers, {args.pages_per_task} pages per task")
+    print(f"{'pages':>6} {'mode':>12} {'seconds':>8} {'pages/sec':>10} {'chars/file':>11} {'truncated':>10}")
+    for pages in args.pages:
+        uploads = [(f"resume_{pages}p_{i}.pdf", make_pdf(pages, i)) for i in range(args.files)]
+        modes = (
+            ("whole file", dict(PDF_PAGES_PER_TASK=0, PDF_MAX_PAGES=0), False),
+            ("page split", dict(PDF_PAGES_PER_TASK=args.pages_per_task, PDF_MAX_PAGES=0), False),
+            ("early stop", dict(PDF_PAGES_PER_TASK=args.pages_per_task, PDF_MAX_PAGES=args.max_pages), False),
+            ("cached", dict(PDF_PAGES_PER_TASK=args.pages_per_task, PDF_MAX_PAGES=0), True),
+        )
+        for mode, settings, cached in modes:
+            configure(**settings)
+            pdf_text_cache.max_entries = config.PDF_TEXT_CACHE_SIZE if cached else 0
+            pdf_text_cache._entries.clear()
+            if cached:
+                timed_pass(uploads, args.workers)  # fill the cache
+            elapsed, results = timed_pass(uploads, args.workers, fresh_pool=not cached)
+
+            failed = [r for r in results if r["error"]]
+            if failed:
+                sys.exit(f"{mode}: {failed[0]['error']}")
+            chars = sum(len(r["text"]) for r in results) / len(results)
+            truncated = sum(1 for r in results if r["truncated"])
+            print(f"{pages:>6} {mode:>12} {elapsed:>8.2f} {pages * len(uploads) / elapsed:>10.1f} "
+                  f"{chars:>11.0f} {truncated:>10}")
+    ingest.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark sharded search against one monolithic index.
+
+Compares, for the same synthetic corpus and queries:
+    single     one CSVResumeDatabase over the whole corpus
+    sharded    ShardedResumeDatabase over --shards category shards, searched in parallel threads
+    category   the sharded database restricted to one category (one shard searched)
+
+Usage:
+    python benchmarks/bench_sharded_search.py [--corpus 200000] [--shards 8] [--queries 200]
+
+Uses random normalized vectors instead of the encoder, so it runs without
+Resume.csv or the model.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import faiss  # noqa: E402
+import numpy as np  # noqa: E402
+
+from app.csv_loader import CSVResumeDatabase  # noqa: E402
+from app.metadata_store import MetadataStore, write_store  # noqa: E402
+from app.sharded_database import ShardedResumeDatabase  # noqa: E402
+
+DIM = 384
+
+
+def make_database(vectors: np.ndarray, category: str, index_path: str, metadata_path: str) -> CSVResumeDatabase:
+    db = CSVResumeDatabase(csv_path="", index_path=index_path, metadata_path=metadata_path)
+    db.index = faiss.IndexFlatIP(DIM)
+    db.index.add(vectors)
+    write_store(metadata_path, [{"id": str(i), "category": category, "full_text": f"resume {i}"}
+                                for i in range(len(vectors))])
+    db.metadata = MetadataStore(metadata_path)
+    return db
+
+
+def time_queries(db, queries: np.ndarray, top_k: int, **filters) -> float:
+    """Mean milliseconds per single-query rank_batch call."""
+    start = time.perf_counter()
+    for query in queries:
+        db.rank_batch(query[None], top_k, **filters)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", type=int, default=200000)
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.corpus, DIM)).astype("float32")
+    faiss.normalize_L2(vectors)
+    queries = rng.standard_normal((args.queries, DIM)).astype("float32")
+    faiss.normalize_L2(queries)
+    parts = np.array_split(np.arange(args.corpus), args.shards)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        single = make_database(vectors, "ALL", os.path.join(workdir, "single.faiss"), os.path.join(workdir, "single_meta"))
+
+        sharded = ShardedResumeDatabase(csv_path="", shard_dir=os.path.join(workdir, "shards"), partition="category")
+        names = [f"cat_{i}" for i in range(args.shards)]
+        sharded._open_shards({"shards": {name: {"number": i, "categories": [name]} for i, name in enumerate(names)}})
+        for name, rows in zip(names, parts):
+            shard = sharded.shards[name]
+            built = make_database(vectors[rows], name, shard.index_path + ".bench", shard.metadata_path + "_bench")
+            shard.index, shard.metadata = built.index, built.metadata
+        sharded._phase = "done"
+
+        for db in (single, sharded):
+            time_queries(db, queries[:10], args.top_k)  # warm up
+
+        single_ms = time_queries(single, queries, args.top_k)
+        sharded_ms = time_queries(sharded, queries, args.top_k)
+        category_ms = time_queries(sharded, queries, args.top_k, categories=[names[0]])
+        sharded.close()
+
+    print(f"corpus {args.corpus}, {args.shards} shards, top_k {args.top_k}, {os.cpu_count()} CPUs")
+    print(f"single    {single_ms:8.2f} ms/query")
+    print(f"sharded   {sharded_ms:8.2f} ms/query  ({single_ms / sharded_ms:.1f}x)")
+    print(f"category  {category_ms:8.2f} ms/query  ({single_ms / category_ms:.1f}x, one shard of {len(parts[0])} resumes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark skill matching: token-trie taxonomy matcher versus one regex alternation.
+
+    regex  the previous approach: every skill and synonym in one
+           case-insensitive alternation regex, with each match normalized by a
+           linear scan over all skills
+    trie   SkillTaxonomy.match (token trie, dict normalization)
+
+Both run over resume texts from the CSV corpus, first with the bundled
+taxonomy and then with --synthetic extra made-up skills added (to show how
+each scales to a 10k+ skill taxonomy). Only taxonomy matching is timed; spaCy
+NER is left out. "agree" is the mean Jaccard similarity of the two skill sets
+per resume.
+
+Usage:
+    python benchmarks/bench_skill_extract.py [--csv Resume.csv] [--n 1000] [--synthetic 10000]
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from app.skill_taxonomy import DEFAULT_TAXONOMY_PATH, SkillTaxonomy  # noqa: E402
+
+SYLLABLES = "ka lo mi ra zen tor vex qua dri nol sup pex gri mon tal bex".split()
+
+
+class RegexMatcher:
+    """The previous matcher: one alternation regex plus linear-scan normalization."""
+
+    def __init__(self, skills):
+        self.surfaces = [(surface, name) for name, synonyms in skills.items() for surface in [name, *synonyms]]
+        self.regex = re.compile(
+            r"\b(?:" + "|".join(re.escape(surface) for surface, _ in
+                                sorted(self.surfaces, key=lambda pair: -len(pair[0]))) + r")\b",
+            re.IGNORECASE,
+        )
+
+    def normalize(self, match: str) -> str:
+        for surface, name in self.surfaces:
+            if surface.lower() == match.lower():
+                return name
+        return match.title()
+
+    def match(self, text: str):
+        return {self.normalize(match) for match in self.regex.findall(text)}
+
+
+def load_texts(csv_path: Path, n: int):
+    if not csv_path.exists():
+        sys.exit(f"{csv_path} not found; pass --csv with a resume CSV")
+    frame = pd.read_csv(csv_path, nrows=n)
+    column = "Resume_str" if "Resume_str" in frame.columns else "Resume_html"
+    return [str(text) for text in frame[column].dropna() if str(text).strip()]
+
+
+def synthetic_skills(count: int, seed: int = 0):
+    """Made-up multi-syllable skill names with one synonym each."""
+    rng = np.random.default_rng(seed)
+    skills = {}
+    while len(skills) < count:
+        words = ["".join(rng.choice(SYLLABLES, int(rng.integers(2, 4)))) for _ in range(int(rng.integers(1, 3)))]
+        skills.setdefault(" ".join(words).title(), ["".join(words) + "js"])
+    return skills
+
+
+def run(matcher, texts):
+    start = time.perf_counter()
+    results = [matcher.match(text) for text in texts]
+    return len(texts) / (time.perf_counter() - start), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", type=Path, default=BASE_DIR / "Resume.csv")
+    parser.add_argument("--n", type=int, default=1000, help="Resumes to tag")
+    parser.add_argument("--synthetic", type=int, default=10000, help="Extra made-up skills for the large taxonomy")
+    args = parser.parse_args()
+
+    texts = load_texts(args.csv, args.n)
+    with open(DEFAULT_TAXONOMY_PATH, encoding="utf-8") as f:
+        skills = json.load(f)
+
+    print(f"{len(texts)} resumes from {args.csv}")
+    print(f"{'skills':>7} {'matcher':>8} {'build s':>8} {'docs/sec':>9} {'skills/doc':>11} {'agree':>6}")
+    for taxonomy_skills in (skills, {**skills, **synthetic_skills(args.synthetic)}):
+        start = time.perf_counter()
+        regex = RegexMatcher(taxonomy_skills)
+        regex_build = time.perf_counter() - start
+        start = time.perf_counter()
+        trie = SkillTaxonomy(taxonomy_skills)
+        trie_build = time.perf_counter() - start
+
+        regex_rate, regex_results = run(regex, texts)
+        trie_rate, trie_results = run(trie, texts)
+        agree = np.mean([len(a & b) / len(a | b) if a | b else 1.0 for a, b in zip(regex_results, trie_results)])
+        for name, build, rate, results in (("regex", regex_build, regex_rate, regex_results),
+                                           ("trie", trie_build, trie_rate, trie_results)):
+            per_doc = np.mean([len(r) for r in results])
+            print(f"{len(taxonomy_skills):>7} {name:>8} {build:>8.3f} {rate:>9.1f} {per_doc:>11.1f} {agree:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
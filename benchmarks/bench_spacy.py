@@ -0,0 +1,79 @@
+"""
+Benchmark spaCy skill tagging: docs/sec one document at a time versus batched nlp.pipe.
+
+    full pipeline   the previous path: nlp(text) per document with every
+                    component enabled and no length cap
+    ner only        SkillExtractor.extract per document (unused components
+                    disabled, text capped at SPACY_MAX_CHARS)
+    pipe            SkillExtractor.extract_many over all documents
+    pipe nN         the same with nlp.pipe(n_process=N)
+
+Texts are cleaned with TextPreprocessor first, as in the CSV index build.
+Times include taxonomy matching, which is the same in every mode.
+
+Usage:
+    python benchmarks/bench_spacy.py [--csv Resume.csv] [--n 500] [--n-process 2 4]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import pandas as pd  # noqa: E402
+import spacy  # noqa: E402
+
+from app import config  # noqa: E402
+from app.skill_extractor import SkillExtractor  # noqa: E402
+from app.text_preprocessor import TextPreprocessor  # noqa: E402
+
+
+def load_texts(csv_path: Path, n: int):
+    if not csv_path.exists():
+        sys.exit(f"{csv_path} not found; pass --csv with a resume CSV")
+    frame = pd.read_csv(csv_path, nrows=n)
+    column = "Resume_str" if "Resume_str" in frame.columns else "Resume_html"
+    return [TextPreprocessor.preprocess(str(text)) for text in frame[column].dropna() if str(text).strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", type=Path, default=BASE_DIR / "Resume.csv")
+    parser.add_argument("--n", type=int, default=500, help="Resumes to tag")
+    parser.add_argument("--n-process", type=int, nargs="*", default=[2], help="nlp.pipe process counts to try")
+    args = parser.parse_args()
+
+    texts = load_texts(args.csv, args.n)
+    extractor = SkillExtractor().load()
+    if extractor.nlp is None:
+        sys.exit(f"spaCy model {config.SPACY_MODEL} not found; set SPACY_MODEL or install it")
+    full = spacy.load(config.SPACY_MODEL)
+
+    def full_pipeline():
+        found = []
+        for text in texts:
+            skills = extractor.taxonomy.match(text)
+            skills |= extractor._entity_skills(full(text), text)
+            found.append(sorted(skills))
+        return found
+
+    modes = [
+        ("full pipeline", full_pipeline),
+        ("ner only", lambda: [extractor.extract(text) for text in texts]),
+        ("pipe", lambda: extractor.extract_many(texts, n_process=1)),
+    ] + [(f"pipe n{n}", lambda n=n: extractor.extract_many(texts, n_process=n)) for n in args.n_process]
+
+    print(f"{len(texts)} resumes from {args.csv}, model {config.SPACY_MODEL} "
+          f"(enabled: {', '.join(extractor.nlp.pipe_names)}), batch {config.SPACY_BATCH_SIZE}")
+    print(f"{'mode':>14} {'seconds':>8} {'docs/sec':>9}")
+    for name, run in modes:
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>14} {elapsed:>8.2f} {len(texts) / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
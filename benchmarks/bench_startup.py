@@ -0,0 +1,77 @@
+"""
+Measure cold-start times of the web app.
+
+Starts uvicorn in a subprocess and reports, from process launch:
+    healthz        first 200 from /healthz (server accepting connections)
+    first request  first 200 from /api/screen-resumes
+    ready          first 200 from /readyz (all required components loaded)
+    csv index      CSV database loaded or built (csv_status == "ready")
+
+Usage:
+    python benchmarks/bench_startup.py [--port 8765] [--timeout 600]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def request(url: str, data: dict = None):
+    """Return (status, parsed JSON body) or (None, None) if the server is not up."""
+    body = urllib.parse.urlencode(data).encode() if data else None
+    try:
+        with urllib.request.urlopen(url, data=body, timeout=60) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, ConnectionError):
+        return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=600, help="Give up after this many seconds")
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=str(BASE_DIR), stdout=subprocess.DEVNULL,
+    )
+    marks = {}
+    try:
+        while len(marks) < 4 and time.perf_counter() - start < args.timeout:
+            elapsed = time.perf_counter() - start
+            if "healthz" not in marks and request(base + "/healthz")[0] == 200:
+                marks["healthz"] = elapsed
+            if "healthz" in marks:
+                if "first request" not in marks:
+                    status, _ = request(base + "/api/screen-resumes", {"job_description": "Python developer with SQL"})
+                    if status == 200:
+                        marks["first request"] = time.perf_counter() - start
+                status, report = request(base + "/readyz")
+                if "ready" not in marks and status == 200:
+                    marks["ready"] = time.perf_counter() - start
+                if "csv index" not in marks and report and report.get("csv_status") in ("ready", "unavailable"):
+                    marks["csv index"] = time.perf_counter() - start
+            time.sleep(0.05)
+    finally:
+        server.terminate()
+        server.wait()
+
+    for name in ("healthz", "first request", "ready", "csv index"):
+        value = f"{marks[name]:.2f}s" if name in marks else "timed out"
+        print(f"{name:>14}: {value}")
+
+
+if __name__ == "__main__":
+    main()
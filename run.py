@@ -1,13 +1,60 @@
 """
 Simple script to run the Resume Ranker Pro application.
+
+    python run.py                          development server (one process, auto-reload)
+    python run.py --production             one worker per CPU core, sharing a
+                                           memory-mapped CSV index
+    python run.py --production --shared-encoder
+                                           ... and one encoder process for all workers
 """
+import argparse
+import multiprocessing
+import os
+import secrets
+
 import uvicorn
 
-if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
-    )
 
+def main():
+    parser = argparse.ArgumentParser(description="Run the Resume Ranker Pro web app.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--production", action="store_true",
+                        help="Several worker processes, no auto-reload, memory-mapped FAISS index")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes in production mode (default: one per CPU core)")
+    parser.add_argument("--shared-encoder", action="store_true",
+                        help="Load the sentence encoder once, in a separate process the workers call")
+    args = parser.parse_args()
+
+    if not args.production:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, reload=True)
+        return
+
+    # Read by app/config.py in every worker; explicit environment settings win
+    os.environ.setdefault("FAISS_MMAP", "1")
+    # Each worker has its own PDF ingestion pool, so split the cores between them
+    os.environ.setdefault("INGEST_WORKERS", str(max(1, (os.cpu_count() or 1) // args.workers)))
+
+    encoder_process = None
+    if args.shared_encoder:
+        from app.embedding_server import default_address, serve
+
+        os.environ.setdefault("EMBEDDING_SERVER", default_address())
+        os.environ.setdefault("EMBEDDING_SERVER_AUTHKEY", secrets.token_hex(16))
+        encoder_process = multiprocessing.get_context("spawn").Process(
+            target=serve, args=(os.environ["EMBEDDING_SERVER"], os.environ["EMBEDDING_SERVER_AUTHKEY"]),
+            name="embedding-server", daemon=True,
+        )
+        encoder_process.start()
+
+    try:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        if encoder_process is not None:
+            encoder_process.terminate()
+            encoder_process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Shared fixtures. The tests run without sentence-transformers or torch:
+embeddings come from a deterministic bag-of-words encoder.
+"""
+import hashlib
+
+import faiss
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import config, utils
+
+DIMENSION = 64
+
+RESUMES = [
+    ("1", "INFORMATION-TECHNOLOGY", "Python developer building Docker services and SQL reporting"),
+    ("2", "INFORMATION-TECHNOLOGY", "Kubernetes platform engineer running Python and Go microservices"),
+    ("3", "HR", "HR manager recruiting and onboarding staff, payroll and benefits"),
+    ("4", "HR", "Recruiter sourcing candidates and scheduling interviews"),
+    ("5", "SALES", "Sales manager growing customer accounts and negotiating contracts"),
+    ("6", "SALES", "Account executive with Excel forecasting and customer budget analysis"),
+    ("7", "DESIGNER", "Graphic designer using Photoshop and Illustrator for brand campaigns"),
+    ("8", "DESIGNER", "UX designer running user research and Figma prototyping"),
+]
+
+
+class FakeEncoder:
+    """Stand-in for SentenceTransformer: hashed bag of words, so shared words mean similar vectors."""
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, convert_to_numpy=True,
+               normalize_embeddings=False):
+        vectors = np.full((len(texts), DIMENSION), 1e-3, dtype="float32")
+        for row, text in enumerate(texts):
+            for word in str(text).lower().split():
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % DIMENSION] += 1.0
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+    def get_sentence_embedding_dimension(self):
+        return DIMENSION
+
+
+class RequestOnlyScheduler:
+    """Stand-in for the embedding scheduler that bulk encoding must not use."""
+
+    def encode(self, texts):
+        raise AssertionError(f"{len(texts)} texts of bulk work went through the request scheduler")
+
+
+@pytest.fixture(autouse=True)
+def fake_model(monkeypatch):
+    """Route every embedding through FakeEncoder, bypassing the embedding cache and the batching thread."""
+    monkeypatch.setattr(utils, "model", FakeEncoder())
+    monkeypatch.setattr(utils, "embedding_cache", None)
+    monkeypatch.setattr(utils, "embedding_scheduler", None)
+    monkeypatch.setattr(config, "EMBED_SCHEDULER_BATCH", 0)
+
+
+def write_csv(path, resumes=RESUMES) -> str:
+    pd.DataFrame(resumes, columns=["ID", "Category", "Resume_str"]).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def resume_csv(tmp_path) -> str:
+    return write_csv(tmp_path / "Resume.csv")
+
+
+@pytest.fixture
+def database(tmp_path, resume_csv):
+    """A CSVResumeDatabase built from RESUMES."""
+    from app.csv_loader import CSVResumeDatabase
+
+    db = CSVResumeDatabase(resume_csv, str(tmp_path / "index.faiss"), str(tmp_path / "metadata"))
+    db.build_index()
+    return db
+
+
+def embed(texts):
+    """Normalized query vectors, as the API computes them."""
+    vectors = utils.generate_embeddings(texts).astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
@@ -0,0 +1,147 @@
+import os
+
+import pytest
+
+from app import config, utils
+from app.csv_loader import CSVResumeDatabase
+from app.metadata_store import MetadataStore, MetadataWriter
+
+from conftest import RESUMES, RequestOnlyScheduler, embed, write_csv
+
+
+def top_ids(db, text, top_k=3, **filters):
+    return [result["id"] for result in db.search(embed([text])[0], top_k, **filters)]
+
+
+def test_build_and_search(database):
+    assert database.metadata.live_count == len(RESUMES)
+    assert database.index.ntotal == len(RESUMES)
+    assert top_ids(database, "graphic designer photoshop illustrator brand", 1) == ["7"]
+    assert top_ids(database, "recruiter", 8, categories=["hr"]) == ["4", "3"]
+
+
+def test_skill_filter_accepts_synonyms(database):
+    assert top_ids(database, "engineer", 8, required_skills=["k8s"]) == ["2"]
+    assert top_ids(database, "engineer", 8, required_skills=["Kubernetes"]) == ["2"]
+
+
+def test_upsert_adds_updates_and_skips_unchanged(database):
+    version = database.index_version
+    counts = database.upsert([
+        {"id": "9", "category": "CHEF", "full_text": "Chef cooking pastry in a busy kitchen"},
+        {"id": "3", "category": "HR", "full_text": "Payroll specialist processing salaries"},
+        {"id": "1", "category": RESUMES[0][1], "full_text": RESUMES[0][2]},
+    ])
+    assert counts == {"added": 1, "updated": 1, "unchanged": 1}
+    assert database.index_version > version
+    assert database.metadata.live_count == len(RESUMES) + 1
+    assert database.index.ntotal == database.metadata.live_count
+    assert top_ids(database, "chef cooking pastry kitchen", 1) == ["9"]
+    assert top_ids(database, "payroll specialist processing salaries", 1) == ["3"]
+
+
+def test_changes_are_persisted(database, tmp_path):
+    database.upsert([{"id": "9", "category": "CHEF", "full_text": "Chef cooking pastry"}])
+    database.delete(["5"])
+    reloaded = CSVResumeDatabase(database.csv_path, database.index_path, database.metadata_path)
+    reloaded.build_index()
+    assert set(reloaded.metadata.id_rows()) == {"1", "2", "3", "4", "6", "7", "8", "9"}
+    assert reloaded.index.ntotal == 8
+
+
+def test_delete(database):
+    assert database.delete(["3", "404"]) == 1
+    assert database.metadata.live_count == len(RESUMES) - 1
+    assert "3" not in top_ids(database, "HR manager recruiting onboarding payroll benefits", 8)
+
+
+def test_fetch_results_skips_rows_deleted_after_ranking(database):
+    [(scores, rows)] = database.rank_batch(embed(["HR manager recruiting onboarding payroll"]), 3)
+    ids = [result["id"] for result in database.fetch_results(scores, rows)]
+    database.delete([ids[0]])
+    assert [result["id"] for result in database.fetch_results(scores, rows)] == ids[1:]
+
+
+def test_sync_with_changed_csv(database):
+    resumes = [resume for resume in RESUMES if resume[0] != "4"]
+    resumes[0] = ("1", resumes[0][1], "Rust systems programmer")
+    resumes.append(("10", "CHEF", "Chef cooking pastry"))
+    write_csv(database.csv_path, resumes)
+
+    assert database.sync() == {"added": 1, "updated": 1, "deleted": 1, "unchanged": 6}
+    assert set(database.metadata.id_rows()) == {resume[0] for resume in resumes}
+    assert database.index.ntotal == len(resumes)
+    assert database.sync() == {"added": 0, "updated": 0, "deleted": 0, "unchanged": len(resumes)}
+
+
+def test_crash_before_metadata_publish(database, monkeypatch):
+    """The index is written first; unpublished rows and their vectors are dropped on the next update."""
+    def crash(self):
+        raise RuntimeError("crash")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(MetadataWriter, "close", crash)
+        with pytest.raises(RuntimeError):
+            database.upsert([{"id": "9", "category": "CHEF", "full_text": "Chef cooking pastry"}])
+
+    reloaded = CSVResumeDatabase(database.csv_path, database.index_path, database.metadata_path)
+    reloaded.build_index()
+    assert len(reloaded.metadata) == len(RESUMES)
+    assert reloaded.upsert([{"id": "10", "category": "CHEF", "full_text": "Baker"}])["added"] == 1
+    assert reloaded.index.ntotal == len(reloaded.metadata) == len(RESUMES) + 1
+    assert top_ids(reloaded, "baker", 1) == ["10"]
+
+
+def test_upsert_rejects_over_long_ids(database):
+    with pytest.raises(ValueError):
+        database.upsert([{"id": "x" * 33, "category": "HR", "full_text": "text"}])
+    assert database.metadata.live_count == database.index.ntotal == len(RESUMES)
+
+
+def test_build_skips_rows_too_long_for_the_store(tmp_path):
+    resumes = RESUMES[:2] + [("x" * 33, "HR", "Recruiter"), ("9", "c" * 65, "Chef cooking pastry")] + RESUMES[2:]
+    db = CSVResumeDatabase(write_csv(tmp_path / "Resume.csv", resumes), str(tmp_path / "index.faiss"),
+                           str(tmp_path / "metadata"))
+    db.build_index()
+    assert db.metadata.live_count == db.index.ntotal == len(RESUMES)
+    assert set(db.metadata.id_rows()) == {resume[0] for resume in RESUMES}
+    assert db.sync()["added"] == 0
+
+
+def test_build_bypasses_the_embedding_scheduler(tmp_path, resume_csv, monkeypatch):
+    monkeypatch.setattr(utils, "embedding_scheduler", RequestOnlyScheduler())
+    db = CSVResumeDatabase(resume_csv, str(tmp_path / "index.faiss"), str(tmp_path / "metadata"))
+    db.build_index()
+    assert db.upsert([{"id": "9", "category": "CHEF", "full_text": "Chef cooking pastry"}])["added"] == 1
+    assert db.index.ntotal == len(RESUMES) + 1
+
+
+def test_build_resumes_from_checkpoint(tmp_path, resume_csv, monkeypatch):
+    monkeypatch.setattr(config, "CSV_CHUNK_ROWS", 2)
+    monkeypatch.setattr(config, "CSV_CHECKPOINT_ROWS", 2)
+    encoded = []
+    encode = utils.model.encode
+
+    def failing_encode(texts, **kwargs):
+        if len(encoded) >= 4:
+            raise RuntimeError("interrupted")
+        encoded.extend(texts)
+        return encode(texts, **kwargs)
+
+    paths = (resume_csv, str(tmp_path / "index.faiss"), str(tmp_path / "metadata"))
+    monkeypatch.setattr(utils.model, "encode", failing_encode)
+    with pytest.raises(RuntimeError):
+        CSVResumeDatabase(*paths).build_index()
+    assert os.path.exists(paths[1] + ".checkpoint.json")
+    assert not os.path.exists(paths[1])
+
+    encoded.clear()
+    monkeypatch.setattr(utils.model, "encode", lambda texts, **kwargs: (encoded.extend(texts), encode(texts))[1])
+    db = CSVResumeDatabase(*paths)
+    db.build_index()
+    # Only the rows after the checkpoint were embedded again
+    assert encoded == [text for _, _, text in RESUMES[4:]]
+    assert [db.metadata.get_id(row) for row in range(len(db.metadata))] == [resume[0] for resume in RESUMES]
+    assert db.index.ntotal == len(RESUMES)
+    assert not os.path.exists(paths[1] + ".checkpoint.json")
+    assert MetadataStore.exists(paths[2])
@@ -0,0 +1,88 @@
+import faiss
+import numpy as np
+import pytest
+
+from app import config
+from app.faiss_index import add_vectors, create_index, range_search
+
+DIMENSION = 32
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    """2000 vectors clustered around one direction, and a query close to it."""
+    rng = np.random.default_rng(0)
+    center = rng.standard_normal(DIMENSION).astype("float32")
+    data = (rng.standard_normal((2000, DIMENSION)) * 0.6 + center).astype("float32")
+    faiss.normalize_L2(data)
+    query = (center + 0.1 * rng.standard_normal(DIMENSION)).astype("float32")[None]
+    faiss.normalize_L2(query)
+    return data, query
+
+
+def build(index_type, data, labels, labelled=False):
+    index = create_index(index_type, DIMENSION, n_train=len(data), nlist=8, labelled=labelled)
+    if not index.is_trained:
+        index.train(data)
+    add_vectors(index, data, labels)
+    return index
+
+
+@pytest.mark.parametrize("min_score", [0.3, 0.5, 0.8])
+def test_flat_threshold_search_is_exact(vectors, min_score):
+    data, query = vectors
+    index = build("flat", data, np.arange(len(data)))
+    [(scores, labels)] = range_search(index, query, min_score, len(data))
+
+    expected = np.flatnonzero(data @ query[0] >= min_score)
+    assert sorted(labels.tolist()) == expected.tolist()
+    assert np.all(scores >= min_score)
+    assert np.all(np.diff(scores) <= 0)
+
+
+@pytest.mark.parametrize("min_score", [0.3, 0.5, 0.8])
+def test_hnsw_threshold_search_goes_deep_enough(vectors, min_score):
+    """The graph search is widened to the cap, so it finds (nearly) every vector above the cutoff."""
+    data, query = vectors
+    index = build("hnsw", data, np.arange(len(data)))
+    [(scores, labels)] = range_search(index, query, min_score, len(data), ef_search=16)
+
+    expected = set(np.flatnonzero(data @ query[0] >= min_score).tolist())
+    assert set(labels.tolist()) <= expected
+    assert len(labels) >= 0.95 * len(expected)
+    assert np.all(scores >= min_score)
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_hnsw_threshold_search_with_subset(vectors, monkeypatch):
+    data, query = vectors
+    index = build("hnsw", data, np.arange(len(data)) * 4, labelled=True)
+    subset = np.arange(0, len(data) * 4, 8)
+    rows = np.arange(0, len(data), 2)
+    expected = rows[data[rows] @ query[0] >= 0.5]
+
+    # A small subset is scored exactly
+    [(_, labels)] = range_search(index, query, 0.5, len(data), subset)
+    assert sorted((labels // 4).tolist()) == expected.tolist()
+
+    # A larger one goes through the graph, restricted to the subset
+    monkeypatch.setattr(config, "FAISS_EXACT_SUBSET_ROWS", 100)
+    [(_, labels)] = range_search(index, query, 0.5, len(data), subset)
+    assert set((labels // 4).tolist()) <= set(expected.tolist())
+    assert len(labels) >= 0.95 * len(expected)
+
+
+def test_threshold_search_is_capped(vectors):
+    data, query = vectors
+    for index_type in ("flat", "hnsw"):
+        index = build(index_type, data, np.arange(len(data)))
+        [(scores, labels)] = range_search(index, query, 0.0, 50)
+        assert len(labels) == 50
+        assert np.allclose(scores, np.sort(data @ query[0])[::-1][:50], atol=1e-5)
+
+
+def test_threshold_search_with_empty_subset(vectors):
+    data, query = vectors
+    index = build("hnsw", data, np.arange(len(data)))
+    [(scores, labels)] = range_search(index, query, 0.3, 10, np.zeros(0, dtype="int64"))
+    assert len(scores) == len(labels) == 0
@@ -0,0 +1,26 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+
+from app import ingest
+
+
+class BrokenPool:
+    """Executor whose workers have died."""
+
+    def submit(self, fn, *args, **kwargs):
+        raise BrokenProcessPool("a worker died")
+
+
+def test_skills_are_tagged_in_process_when_the_pool_breaks(monkeypatch):
+    async def parsed(uploads, tag=True):
+        for index, (filename, _) in enumerate(uploads):
+            yield {"filename": filename, "text": "Python developer with Docker and SQL", "skills": [],
+                   "error": None, "truncated": None, "timings": {}, "index": index}
+
+    monkeypatch.setattr(ingest, "iter_processed", parsed)
+    monkeypatch.setattr(ingest, "get_pool", BrokenPool)
+    monkeypatch.setattr(ingest, "_pool", None)
+
+    results = asyncio.run(ingest.process_uploads([("a.pdf", b"%PDF a"), ("b.pdf", b"%PDF b")]))
+    assert [result["error"] for result in results] == [None, None]
+    assert all({"Python", "Docker"} <= set(result["skills"]) for result in results)
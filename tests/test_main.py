@@ -0,0 +1,81 @@
+import base64
+import json
+
+import pytest
+
+from app import main, utils
+
+
+def test_cursor_round_trip():
+    assert main.decode_cursor(main.encode_cursor(20, 7)) == (20, 7)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+    base64.urlsafe_b64encode(json.dumps({"offset": 5}).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps({"offset": "x", "version": 1}).encode()).decode(),
+    main.encode_cursor(-1, 1),
+])
+def test_invalid_cursors(cursor):
+    with pytest.raises(ValueError):
+        main.decode_cursor(cursor)
+
+
+def test_matches_skills_canonicalizes_synonyms():
+    assert main.matches_skills(["Kubernetes", "Python"], ["k8s"], [])
+    assert main.matches_skills(["Kubernetes"], ["KUBERNETES"], [])
+    assert not main.matches_skills(["Python"], ["k8s"], [])
+    assert main.matches_skills(["React"], [], ["react.js", "Go"])
+    assert not main.matches_skills(["Python"], [], ["Go"])
+
+
+def test_pages_share_one_cached_ranking(database, monkeypatch):
+    calls = []
+    encode = utils.model.encode
+    monkeypatch.setattr(utils.model, "encode", lambda texts, **kwargs: (calls.append(texts), encode(texts))[1])
+    monkeypatch.setattr(main, "csv_database", database)
+    args = ("Python developer Docker SQL recruiter", 0, "top_k", 6, [], [], database.index_version)
+
+    first, total = main.csv_database_page(*args, offset=0, page_size=4)
+    second, _ = main.csv_database_page(*args, offset=4, page_size=4)
+    everything, _ = main.csv_database_page(*args)
+
+    assert len(calls) == 1
+    assert total == 6
+    assert [result["rank"] for result in first + second] == list(range(1, 7))
+    assert [result["filename"] for result in first + second] == [result["filename"] for result in everything]
+
+
+def test_stream_searches_the_talent_pool(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.startup import StartupManager
+    from app.talent_pool import TalentPool
+
+    pool = TalentPool(str(tmp_path / "pool.faiss"), str(tmp_path / "pool_metadata"), flush_interval=0)
+    pool.build_index()
+    pool.add([(b"%PDF a", {"filename": "a.pdf", "text": "Python developer with Docker", "skills": ["Python"]})])
+    manager = StartupManager()
+    manager.register("model", lambda: None)
+    [loaded] = manager.start()
+    loaded.result(timeout=10)
+    monkeypatch.setattr(main, "talent_pool", pool)
+    monkeypatch.setattr(main, "startup_manager", manager)
+
+    def stream(**form):
+        response = TestClient(main.app).post("/api/screen-resumes/stream", data={
+            "job_description": "Python developer Docker", "threshold": "0", "include_csv": "false", **form})
+        return {event["event"]: event for event in map(json.loads, response.text.splitlines())}
+
+    try:
+        events = stream(include_pool="true")
+        assert events["started"]["pool_status"] == "ready"
+        assert [result["filename"] for result in events["pool"]["pool_results"]] == ["a.pdf"]
+        assert events["done"]["total_qualified"] == 1
+
+        events = stream()
+        assert "pool" not in events
+        assert events["done"]["pool_status"] == "disabled"
+    finally:
+        pool.close()
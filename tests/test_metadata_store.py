@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from app.metadata_store import (DEFAULT_CATEGORY_WIDTH, DEFAULT_ID_WIDTH, PREVIEW_CHARS, MetadataStore,
+                                MetadataWriter, content_hash, write_store)
+
+
+def records(n, start=0):
+    return [{"id": str(i), "category": "HR" if i % 2 else "SALES", "full_text": f"resume text {i} " * 3,
+             "skills": ["Python"] if i % 3 == 0 else []} for i in range(start, start + n)]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "store")
+    write_store(path, records(5), skills_vocabulary=["Excel", "Python"])
+    store = MetadataStore(path)
+
+    assert len(store) == store.live_count == 5
+    row = store[3]
+    assert row["id"] == "3" and row["category"] == "HR"
+    assert row["full_text"] == "resume text 3 " * 3
+    assert row["skills"] == ["Python"]
+    assert store[1]["skills"] == []
+    assert store.get_hash(3) == content_hash(records(5)[3])
+    with pytest.raises(IndexError):
+        store[5]
+
+
+def test_long_text_preview(tmp_path):
+    path = str(tmp_path / "store")
+    write_store(path, [{"id": "1", "category": "HR", "full_text": "x" * (PREVIEW_CHARS + 10)}])
+    row = MetadataStore(path)[0]
+    assert row["text"] == "x" * PREVIEW_CHARS + "..."
+    assert len(row["full_text"]) == PREVIEW_CHARS + 10
+
+
+def test_append_and_delete(tmp_path):
+    path = str(tmp_path / "store")
+    write_store(path, records(4))
+    writer = MetadataWriter(path, resume_rows=4)
+    writer.append(records(2, start=4))
+    writer.mark_deleted([1, 2])
+    writer.close()
+
+    store = MetadataStore(path)
+    assert len(store) == 6 and store.live_count == 4
+    assert store.live_mask().tolist() == [True, False, False, True, True, True]
+    assert store.id_rows() == {"0": 0, "3": 3, "4": 4, "5": 5}
+
+
+def test_resume_truncates_after_checkpoint(tmp_path):
+    path = str(tmp_path / "store")
+    writer = MetadataWriter(path)
+    writer.append(records(3))
+    writer.flush()
+    writer.append(records(2, start=3))  # never published
+    writer.discard()
+
+    writer = MetadataWriter(path, resume_rows=len(MetadataStore(path)))
+    writer.append(records(1, start=10))
+    writer.close()
+    store = MetadataStore(path)
+    assert [store.get_id(row) for row in range(len(store))] == ["0", "1", "2", "10"]
+    assert store.get_text(3) == "resume text 10 " * 3
+
+
+def test_unpublished_rows_are_invisible(tmp_path):
+    path = str(tmp_path / "store")
+    write_store(path, records(2))
+    writer = MetadataWriter(path, resume_rows=2)
+    writer.append(records(3, start=2))
+    assert len(MetadataStore(path)) == 2
+    writer.close()
+    assert len(MetadataStore(path)) == 5
+
+
+@pytest.mark.parametrize("record", [
+    {"id": "x" * (DEFAULT_ID_WIDTH + 1), "category": "HR", "full_text": "text"},
+    {"id": "é" * (DEFAULT_ID_WIDTH // 2 + 1), "category": "HR", "full_text": "text"},
+    {"id": "1", "category": "c" * (DEFAULT_CATEGORY_WIDTH + 1), "full_text": "text"},
+])
+def test_rejects_values_longer_than_their_column(tmp_path, record):
+    path = str(tmp_path / "store")
+    write_store(path, records(2))
+    writer = MetadataWriter(path, resume_rows=2)
+    with pytest.raises(ValueError):
+        writer.append(records(1, start=2) + [record])
+    with pytest.raises(ValueError):
+        writer.validate(record)
+    writer.append(records(1, start=5))
+    writer.close()
+    # Nothing of the rejected batch was written, and the next batch's text starts where it should
+    store = MetadataStore(path)
+    assert [store.get_id(row) for row in range(len(store))] == ["0", "1", "5"]
+    assert store.get_text(2) == "resume text 5 " * 3
+
+
+def test_values_filling_their_column_are_kept(tmp_path):
+    path = str(tmp_path / "store")
+    long_id = "é" * (DEFAULT_ID_WIDTH // 2)
+    write_store(path, [{"id": long_id, "category": "c" * DEFAULT_CATEGORY_WIDTH, "full_text": "text"}])
+    store = MetadataStore(path)
+    assert store.get_id(0) == long_id
+    assert store.get_category(0) == "c" * DEFAULT_CATEGORY_WIDTH
+
+
+def test_empty_store(tmp_path):
+    path = str(tmp_path / "store")
+    write_store(path, [])
+    store = MetadataStore(path)
+    assert len(store) == 0 and store.live_count == 0
+    assert np.array_equal(store.live_mask(), np.zeros(0, dtype=bool))
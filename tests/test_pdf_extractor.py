@@ -0,0 +1,37 @@
+import threading
+import time
+
+from app.pdf_extractor import _page_text
+
+
+class Page:
+    def __init__(self, seconds, text="page text"):
+        self.seconds = seconds
+        self.text = text
+
+    def extract_text(self):
+        time.sleep(self.seconds)
+        return self.text
+
+
+def test_slow_page_is_interrupted_at_the_deadline():
+    threads = threading.active_count()
+    started = time.time()
+    assert _page_text(Page(5), started + 0.2) is None
+    assert time.time() - started < 1
+    # Nothing is left running in the background
+    assert threading.active_count() == threads
+
+
+def test_page_within_the_deadline():
+    assert _page_text(Page(0), time.time() + 5) == "page text"
+    assert _page_text(Page(0), None) == "page text"
+    assert _page_text(Page(0), time.time() - 1) is None
+
+
+def test_page_outside_the_main_thread_is_read_to_the_end():
+    results = []
+    worker = threading.Thread(target=lambda: results.append(_page_text(Page(0.3), time.time() + 0.1)))
+    worker.start()
+    worker.join()
+    assert results == ["page text"]
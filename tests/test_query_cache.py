@@ -0,0 +1,55 @@
+from app.query_cache import QueryResultCache
+
+from conftest import embed
+
+
+def key(job_description="Python developer", top_k=10, min_score=None, required=(), optional=(), version=1,
+        categories=None):
+    return QueryResultCache.make_key(job_description, top_k, min_score, list(required), list(optional), version,
+                                     categories)
+
+
+def test_key_normalizes_text_and_filters():
+    assert key("  Python   developer ") == key("Python developer")
+    assert key(required=["SQL", "Python"]) == key(required=["python", "sql"])
+    assert key(categories=["HR", " Sales"]) == key(categories=["sales", "hr"])
+    assert key(version=1) != key(version=2)
+    assert key(min_score=0.5) != key(min_score=0.6)
+    assert key(top_k=10) != key(top_k=20)
+
+
+def test_lru_eviction():
+    cache = QueryResultCache(max_entries=2, ttl_seconds=0)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.query_cache.time.monotonic", lambda: now[0])
+    cache = QueryResultCache(max_entries=10, ttl_seconds=60)
+    cache.put("a", 1)
+    now[0] += 59
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_disabled_cache():
+    cache = QueryResultCache(max_entries=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+def test_database_changes_invalidate_the_cache(database):
+    database.query_cache.put("query", "ranking")
+    version = database.refresh()
+    database.upsert([{"id": "9", "category": "CHEF", "full_text": "Chef cooking pastry"}])
+    assert database.index_version > version
+    assert database.query_cache.get("query") is None
+    assert database.search(embed(["chef"])[0], 1)[0]["id"] == "9"
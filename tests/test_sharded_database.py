@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from app.sharded_database import ROW_BITS, ShardedResumeDatabase
+
+from conftest import RESUMES, embed
+
+QUERIES = ["Python developer Docker SQL", "recruiting HR payroll", "customer budget Excel", "designer brand"]
+
+
+@pytest.fixture(params=["category", "3"])
+def sharded(request, tmp_path, resume_csv):
+    db = ShardedResumeDatabase(resume_csv, str(tmp_path / "shards"), partition=request.param)
+    db.build_index()
+    yield db
+    db.close()
+
+
+def ranked(db, **kwargs):
+    return [[(result["id"], round(result["score"], 5)) for result in db.fetch_results(scores, rows)]
+            for scores, rows in db.rank_batch(embed(QUERIES), **kwargs)]
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"top_k": 3},
+    {"top_k": 8},
+    {"top_k": 8, "min_score": 0.3},
+    {"top_k": 5, "categories": ["hr", "Sales"]},
+    {"top_k": 5, "required_skills": ["Python"]},
+])
+def test_merge_matches_one_index(database, sharded, kwargs):
+    for expected, merged in zip(ranked(database, **kwargs), ranked(sharded, **kwargs)):
+        assert [score for _, score in merged] == pytest.approx([score for _, score in expected], abs=1e-5)
+        # Equal scores may come from different shards in either order, so compare IDs above the last score
+        if expected:
+            cutoff = expected[-1][1] + 1e-5
+            assert {i for i, score in merged if score > cutoff} == {i for i, score in expected if score > cutoff}
+
+
+def test_rows_are_global(sharded):
+    [(scores, rows)] = sharded.rank_batch(embed(["resume"]), len(RESUMES))
+    assert len(rows) == len(RESUMES)
+    assert len(set((rows >> ROW_BITS).tolist())) == len(sharded.shards)
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_category_filter_searches_only_matching_shards(tmp_path, resume_csv):
+    db = ShardedResumeDatabase(resume_csv, str(tmp_path / "shards"), partition="category")
+    db.build_index()
+    try:
+        assert db._select_shards(["hr"]) and len(db._select_shards(["hr"])) == 1
+        assert db.rank_batch(embed(["recruiter"]), 5, categories=["nope"])[0][1].size == 0
+        assert db.skipped_shards(["hr"]) == []
+
+        db.shards["hr"].index = None  # e.g. still being rebuilt
+        assert db.skipped_shards(["hr", "sales"]) == ["hr"]
+        assert db.skipped_shards(["sales"]) == []
+        ids = [result["id"] for result in db.search(embed(["recruiter"])[0], 8)]
+        assert not {"3", "4"} & set(ids)
+    finally:
+        db.close()
+
+
+def test_upsert_and_delete_route_to_shards(tmp_path, resume_csv):
+    db = ShardedResumeDatabase(resume_csv, str(tmp_path / "shards"), partition="category")
+    db.build_index()
+    try:
+        db.upsert([{"id": "9", "category": "CHEF", "full_text": "Chef cooking pastry"}])
+        assert "chef" in db.shards
+        assert [result["id"] for result in db.search(embed(["chef cooking pastry"])[0], 1)] == ["9"]
+        assert db.delete(["9", "1"]) == 2
+        ids = {result["id"] for result in db.search(embed(["chef cooking pastry python"])[0], 10)}
+        assert not {"1", "9"} & ids
+    finally:
+        db.close()
@@ -0,0 +1,31 @@
+import threading
+
+from app.startup import FAILED, READY, StartupManager
+
+
+def test_every_component_loads_at_once():
+    manager = StartupManager()
+    # Each loader waits for all the others, so this only finishes if none of them is queued
+    barrier = threading.Barrier(5, timeout=5)
+    for name in ("model", "skill_extractor", "ingest_workers", "csv_index", "talent_pool"):
+        manager.register(name, barrier.wait, required=name == "model")
+    for future in manager.start():
+        future.result(timeout=10)
+    manager.shutdown()
+    assert {component.state for component in manager.components.values()} == {READY}
+    assert manager.ready()
+
+
+def test_failed_optional_component_does_not_block_readiness():
+    def fail():
+        raise RuntimeError("no index")
+
+    manager = StartupManager()
+    manager.register("model", lambda: None)
+    manager.register("csv_index", fail, required=False)
+    for future in manager.start():
+        future.result(timeout=10)
+    manager.shutdown()
+    assert manager.state("csv_index") == FAILED
+    assert manager.snapshot()["components"]["csv_index"]["error"] == "no index"
+    assert manager.ready()
@@ -0,0 +1,105 @@
+import pytest
+
+from app import utils
+from app.talent_pool import UPLOAD_CATEGORY, TalentPool, file_hash
+
+from conftest import RequestOnlyScheduler, embed
+
+
+def upload(filename, text, skills=()):
+    return {"filename": filename, "text": text, "skills": list(skills)}
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = TalentPool(str(tmp_path / "pool.faiss"), str(tmp_path / "pool_metadata"), flush_interval=0)
+    pool.build_index()
+    yield pool
+    pool.close()
+
+
+def pooled(pool, text="python docker developer", top_k=10):
+    [(scores, rows)] = pool.rank_batch(embed([text]), top_k)
+    return pool.fetch_results(scores, rows)
+
+
+def test_duplicate_uploads_are_stored_once(pool):
+    a = (b"%PDF a", upload("a.pdf", "Python developer with Docker", ["Python"]))
+    b = (b"%PDF b", upload("b.pdf", "HR recruiting manager"))
+    renamed = (b"%PDF a", upload("copy of a.pdf", "Python developer with Docker", ["Python"]))
+
+    assert pool.add([a, b, renamed]) == {"added": 2, "unchanged": 1}
+    assert pool.add([renamed]) == {"added": 0, "unchanged": 1}
+    assert pool.metadata.live_count == pool.index.ntotal == 2
+
+    results = pooled(pool)
+    assert {result["filename"] for result in results} == {"a.pdf", "b.pdf"}
+    assert {result["category"] for result in results} == {UPLOAD_CATEGORY}
+    assert results[0]["id"] == file_hash(b"%PDF a")
+    assert results[0]["skills"] == ["Python"]
+
+
+def test_long_filenames_are_kept(pool):
+    filename = "x" * 200 + ".pdf"
+    pool.add([(b"%PDF long", upload(filename, "Python developer"))])
+    assert pooled(pool)[0]["filename"] == filename
+
+
+def test_another_process_sees_the_uploads(pool, tmp_path):
+    pool.add([(b"%PDF a", upload("a.pdf", "Python developer with Docker"))])
+    other = TalentPool(pool.index_path, pool.metadata_path, flush_interval=0)
+    other.build_index()
+    try:
+        assert other.add([(b"%PDF a", upload("again.pdf", "Python developer with Docker"))])["added"] == 0
+        pool.add([(b"%PDF c", upload("c.pdf", "Chef cooking pastry"))])
+        assert [result["filename"] for result in pooled(other, "chef cooking pastry", 1)] == ["c.pdf"]
+    finally:
+        other.close()
+
+
+def test_background_writer(tmp_path):
+    pool = TalentPool(str(tmp_path / "pool.faiss"), str(tmp_path / "pool_metadata"), flush_interval=60)
+    pool.build_index()
+    assert pool.add([(b"%PDF a", upload("a.pdf", "Python developer"))]) == {"added": 1, "unchanged": 0}
+    # Queued, not yet written; a second upload of the same file is still recognised
+    assert pool.metadata.live_count == 0
+    assert pool.add([(b"%PDF a", upload("a.pdf", "Python developer"))]) == {"added": 0, "unchanged": 1}
+    pool.close()
+    assert pool.metadata.live_count == 1
+    assert [result["filename"] for result in pooled(pool)] == ["a.pdf"]
+
+
+def test_failed_flush_keeps_the_uploads_queued(tmp_path, monkeypatch):
+    pool = TalentPool(str(tmp_path / "pool.faiss"), str(tmp_path / "pool_metadata"), flush_interval=60)
+    pool.build_index()
+    embed_texts = TalentPool._embed
+    failures = [RuntimeError("encoder failed")]
+
+    def embed_once_failing(texts):
+        if failures:
+            raise failures.pop()
+        return embed_texts(texts)
+
+    monkeypatch.setattr(TalentPool, "_embed", staticmethod(embed_once_failing))
+    pool.add([(b"%PDF a", upload("a.pdf", "Python developer"))])
+    with pytest.raises(RuntimeError):
+        pool.flush()
+    assert pool.metadata.live_count == 0
+    # Still queued, so still recognised
+    assert pool.add([(b"%PDF a", upload("a.pdf", "Python developer"))])["added"] == 0
+
+    assert pool.flush() == 1
+    assert pool.flush() == 0
+    pool.close()
+    assert pool.metadata.live_count == pool.index.ntotal == 1
+    assert [result["filename"] for result in pooled(pool)] == ["a.pdf"]
+
+
+def test_flush_bypasses_the_embedding_scheduler(pool, monkeypatch):
+    monkeypatch.setattr(utils, "embedding_scheduler", RequestOnlyScheduler())
+    assert pool.add([(b"%PDF a", upload("a.pdf", "Python developer"))])["added"] == 1
+    assert pool.metadata.live_count == 1
+
+
+def test_sync_is_a_no_op(pool):
+    assert pool.sync() == {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}